@@ -0,0 +1,101 @@
+"""
+IngestionPipeline 并发摄入基准测试：多个生产者线程同时摄入文件事件
+
+用法:
+    python benchmarks/bench_ingest_contention.py [--threads 1,2,4,8] [--events 400] [--commit-ms 2]
+
+publish_func 用 sleep 模拟一次同步 SQLite 提交的耗时。对照组 (global-lock) 在整个
+ingest 调用外加一把全局锁，等价于旧实现：所有 watchdog 回调排队等待磁盘 I/O。
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from life_system.core.ingestion_pipeline import IngestionPipeline
+from life_system.utils.console import console
+from life_system.utils.logger import logger
+
+
+def _run(n_threads: int, n_events: int, commit_s: float, global_lock: bool, workdir: Path) -> dict:
+    pipeline = IngestionPipeline(debounce_window=0.0)
+    outer_lock = threading.Lock()
+    published = []
+
+    def publish(event_type, source, payload):
+        time.sleep(commit_s)
+        published.append(payload["path"])
+        return len(published)
+
+    def ingest(path: str):
+        if global_lock:
+            with outer_lock:
+                pipeline.ingest("file.modified", "bench", {"path": path}, publish)
+        else:
+            pipeline.ingest("file.modified", "bench", {"path": path}, publish)
+
+    per_thread = n_events // n_threads
+    paths = []
+    for t in range(n_threads):
+        thread_paths = []
+        for i in range(per_thread):
+            path = workdir / f"{'g' if global_lock else 's'}{n_threads}_{t}_{i}.md"
+            path.write_text(str(i), encoding="utf-8")
+            thread_paths.append(str(path))
+        paths.append(thread_paths)
+
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def producer(thread_paths):
+        local = []
+        for path in thread_paths:
+            started = time.perf_counter()
+            ingest(path)
+            local.append(time.perf_counter() - started)
+        with latencies_lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=producer, args=(p,)) for p in paths]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pipeline.close()
+
+    latencies.sort()
+    return {
+        "mode": "global-lock" if global_lock else "sharded",
+        "threads": n_threads,
+        "published": len(published),
+        "events_per_s": len(published) / elapsed,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", default="1,2,4,8", help="生产者线程数列表，逗号分隔")
+    parser.add_argument("--events", type=int, default=400, help="每轮摄入的事件总数")
+    parser.add_argument("--commit-ms", type=float, default=2.0, help="模拟的单次提交耗时（毫秒）")
+    args = parser.parse_args()
+
+    logger.remove()
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_threads in (int(n) for n in args.threads.split(",")):
+            for global_lock in (True, False):
+                r = _run(n_threads, args.events, args.commit_ms / 1000, global_lock, Path(tmp))
+                console.print(
+                    f"{r['mode']:>11} x{r['threads']}: {r['events_per_s']:8.0f} events/s, "
+                    f"p99 {r['p99_ms']:6.1f} ms ({r['published']} published)"
+                )
+
+
+if __name__ == "__main__":
+    main()
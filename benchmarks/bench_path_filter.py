@@ -0,0 +1,91 @@
+"""
+路径过滤微基准：逐模式循环（旧实现）vs 编译后的 PathFilter
+
+用法:
+    python benchmarks/bench_path_filter.py [--paths 1000000]
+
+两种实现对每条路径的判定结果必须一致，否则脚本以非零状态退出。
+旧实现按原样复刻，但去掉了每次命中的 debug 日志（否则会写入百万行日志文件）。
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from life_system.core.ingestion_pipeline import IngestionPipeline
+from life_system.core.path_filter import PathFilter
+
+
+def legacy_should_filter(path_str: str) -> bool:
+    """重构前 IngestionPipeline._should_filter 的路径判定逻辑"""
+    path = Path(path_str)
+    for pattern in IngestionPipeline.FILTER_PATTERNS:
+        if pattern.startswith('*'):
+            if path.name.endswith(pattern[1:]):
+                return True
+        elif pattern in path.parts:
+            return True
+        elif path.name == pattern:
+            return True
+    if path.name.startswith('.'):
+        if path.name not in ['.env', '.gitignore', '.dockerignore']:
+            return True
+    return False
+
+
+def synthetic_paths(n: int, seed: int = 42) -> list:
+    """模拟一次 npm install / git checkout：大部分事件落在少量被过滤的目录下"""
+    rng = random.Random(seed)
+    root = "/home/user/project"
+    pkgs = [f"pkg{i}" for i in range(200)]
+    dirs = [f"src/module{i}" for i in range(50)] + [f"docs/ch{i}" for i in range(20)]
+    paths = []
+    for i in range(n):
+        r = rng.random()
+        if r < 0.5:
+            paths.append(f"{root}/node_modules/{rng.choice(pkgs)}/lib/index{i % 7}.js")
+        elif r < 0.65:
+            paths.append(f"{root}/.git/objects/{i % 256:02x}/{i:038x}")
+        elif r < 0.75:
+            paths.append(f"{root}/{rng.choice(dirs)}/__pycache__/mod{i % 30}.cpython-311.pyc")
+        elif r < 0.8:
+            paths.append(f"{root}/{rng.choice(dirs)}/.file{i % 10}.swp")
+        else:
+            ext = rng.choice([".md", ".py", ".txt", ".log", ".tmp", "~"])
+            paths.append(f"{root}/{rng.choice(dirs)}/file{i % 500}{ext}")
+    return paths
+
+
+def bench(fn, paths) -> tuple:
+    start = time.perf_counter()
+    verdicts = [fn(p) for p in paths]
+    return time.perf_counter() - start, verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    paths = synthetic_paths(args.paths)
+    compiled = PathFilter(IngestionPipeline.FILTER_PATTERNS)
+
+    legacy_time, legacy_verdicts = bench(legacy_should_filter, paths)
+    compiled_time, compiled_verdicts = bench(compiled.matches, paths)
+
+    mismatches = sum(a != b for a, b in zip(legacy_verdicts, compiled_verdicts))
+    filtered = sum(compiled_verdicts)
+    print(f"paths:    {len(paths):,} ({filtered:,} filtered)")
+    print(f"legacy:   {legacy_time:.2f} s ({legacy_time / len(paths) * 1e6:.2f} us/path)")
+    print(f"compiled: {compiled_time:.2f} s ({compiled_time / len(paths) * 1e6:.2f} us/path)")
+    print(f"speedup:  {legacy_time / compiled_time:.1f}x")
+    if mismatches:
+        print(f"MISMATCH: {mismatches} paths got different verdicts")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+TaskService.process_events 基准测试：对比逐条模式与批处理模式的查询次数
+
+用法:
+    python benchmarks/bench_process_events.py [--events 100] [--pending 20]
+
+每种模式都在独立的临时 SQLite 数据库上运行，数据完全相同。
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from life_system.core.db import Base, create_sqlite_engine
+from life_system.core.models import Event, Task
+from life_system.services.task_service import TaskService
+from life_system.utils.console import console
+
+
+def _seed(session_factory, n_events: int, n_pending: int):
+    """写入 n_events 个文件事件（部分标题重复），以及 n_pending 个已存在的 pending 任务"""
+    db = session_factory()
+    try:
+        for i in range(n_pending):
+            db.add(Task(title=f"[MODIFIED] 审查文件: note_{i}.md", status="pending"))
+        for i in range(n_events):
+            # 约 1/4 的事件指向同一批文件，模拟编辑器/git checkout 的重复报告
+            name = f"note_{i % max(1, n_events * 3 // 4)}.md"
+            db.add(Event(
+                type="file.modified",
+                source="file_watcher",
+                payload={"path": f"/tmp/bench/{name}"},
+                created_at=datetime.now(),
+                processed=False,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run(batch_mode: bool, n_events: int, n_pending: int, workdir: Path) -> dict:
+    db_path = workdir / f"bench_{'batch' if batch_mode else 'single'}.db"
+    engine = create_sqlite_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    _seed(session_factory, n_events, n_pending)
+
+    service = TaskService()
+    service.db_factory = session_factory
+    service.bus.db_factory = session_factory
+
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt))
+
+    start = time.perf_counter()
+    processed = service.process_events(batch_mode=batch_mode)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    return {
+        "mode": "batch" if batch_mode else "one-by-one",
+        "processed": processed,
+        "queries": len(statements),
+        "queries_per_event": len(statements) / n_events,
+        "elapsed_ms": elapsed * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100, help="单批事件数（get_unprocessed 默认 100）")
+    parser.add_argument("--pending", type=int, default=20, help="预先存在的 pending 任务数")
+    args = parser.parse_args()
+
+    console.quiet = True
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [_run(mode, args.events, args.pending, Path(tmp)) for mode in (False, True)]
+    console.quiet = False
+
+    for r in results:
+        console.print(
+            f"{r['mode']:>11}: {r['queries']:4d} queries "
+            f"({r['queries_per_event']:.2f}/event), "
+            f"{r['processed']} processed, {r['elapsed_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+CLI 启动耗时检查：防止重量级依赖重新回到 `life` 的导入路径上
+
+用法:
+    python benchmarks/check_import_time.py [--budget-ms 180] [--runs 5]
+
+在子进程中以 `python -X importtime` 导入 life_system.interfaces.cli，解析每个模块的累计导入耗时：
+- 只应由具体命令加载的模块（SQLAlchemy、prompt_toolkit、textual、gooey、apscheduler、watchdog、
+  numpy/scipy、loguru 等）出现在导入链上即失败
+- 取多次运行中的最小值与预算比较，超出预算即失败；typer 自身约占 80~90 ms
+
+任何一项不满足时，脚本以非零状态退出。
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+TARGET = "life_system.interfaces.cli"
+
+# 只允许在命令内部导入的顶层包
+FORBIDDEN = (
+    "sqlalchemy",
+    "prompt_toolkit",
+    "textual",
+    "gooey",
+    "apscheduler",
+    "watchdog",
+    "numpy",
+    "scipy",
+    "loguru",
+    "life_system.services",
+    "life_system.core.event_bus",
+    "life_system.core.db",
+)
+
+
+def _import_times() -> Dict[str, int]:
+    """在干净的子进程中导入 TARGET，返回 模块名 -> 累计导入耗时（微秒）"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # 表头
+        times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=180.0, help="导入 CLI 模块的累计耗时预算（毫秒）")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数，取最小值以排除冷缓存抖动")
+    args = parser.parse_args()
+
+    failures = []
+    best = None
+    for _ in range(args.runs):
+        times = _import_times()
+        loaded = [name for name in times if any(name == f or name.startswith(f + ".") for f in FORBIDDEN)]
+        if loaded and not failures:
+            failures.append(f"heavy modules imported by {TARGET}: {', '.join(sorted(loaded)[:10])}")
+        if best is None or times[TARGET] < best[TARGET]:
+            best = times
+
+    total_ms = best[TARGET] / 1000
+    print(f"[{'OK' if total_ms <= args.budget_ms else 'FAIL'}] import {TARGET}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, us in sorted(best.items(), key=lambda item: -item[1])[1:6]:
+        print(f"    {us / 1000:7.1f} ms  {name}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import of {TARGET} took {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+摄入路径回归检查：确认被 IngestionPipeline 丢弃的事件不会写入 events 表
+
+用法:
+    python benchmarks/check_ingestion.py
+
+在临时目录和临时数据库上运行，每个检查统计 events 表中实际写入的事件：
+- touch：内容不变的文件只改 mtime，不应产生新事件；防抖窗口内的真实修改只在后沿写入一次，
+  pipeline.ingest / pipeline.trailing 中 outcome=published 的计数与实际写入的事件数一致
+- commit_failure：写后模式下组提交失败的事件不记为已处理，同一变化重试时仍会写入
+- self_events：在按项目根目录布局的临时目录上启动真实的文件监控，数据库、日志、Pipeline 状态、
+  指标快照、相似度索引、归档段照常写入，只有用户笔记可以产生事件
+
+任何一项不满足时，脚本以非零状态退出。
+"""
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from life_system.core.db import Base, create_sqlite_engine
+from life_system.core.event_bus import EventBus
+from life_system.core.metrics import metrics
+from life_system.core.models import Event
+from life_system.core.pipeline_state import PipelineStateStore
+from life_system.utils.console import console
+from life_system.utils.logger import logger
+
+
+def _events(session_factory):
+    db = session_factory()
+    try:
+        return db.execute(select(Event.type, Event.payload).order_by(Event.id)).all()
+    finally:
+        db.close()
+
+
+def check_touch(tmp: Path, session_factory) -> list:
+    """touch 同内容文件不写事件；窗口内的修改只以后沿写入一次"""
+    failures = []
+    metrics.reset()
+    bus = EventBus()
+    bus.db_factory = session_factory
+    note = tmp / "note.md"
+    note.write_text("# same content\n", encoding="utf-8")
+
+    first = bus.publish("file.modified", "file_watcher", {"path": str(note)})
+    stat = note.stat()
+    os.utime(note, (stat.st_atime, stat.st_mtime + 10))
+    touched = bus.publish("file.modified", "file_watcher", {"path": str(note)})
+    if first is None:
+        failures.append("touch: the first modification was not published")
+    if touched is not None:
+        failures.append(f"touch: same-content touch returned event {touched}")
+    if len(_events(session_factory)) != 1:
+        failures.append(f"touch: expected 1 event after touch, found {len(_events(session_factory))}")
+
+    # 窗口内真实修改：ingest 返回 None（等待后沿），关闭时只写入一次
+    note.write_text("# changed content\n", encoding="utf-8")
+    debounced = bus.publish("file.modified", "file_watcher", {"path": str(note)})
+    if debounced is not None:
+        failures.append(f"touch: modification inside the debounce window returned event {debounced}")
+    bus.close()
+    events = _events(session_factory)
+    if len(events) != 2:
+        failures.append(f"touch: expected 2 events (leading + trailing), found {len(events)}")
+    published = sum(c["value"] for c in metrics.snapshot()["counters"]
+                    if c["name"] in ("pipeline.ingest", "pipeline.trailing") and c["labels"]["outcome"] == "published")
+    if published != len(events):
+        failures.append(f"touch: metrics count {published} published events, {len(events)} were written")
+    print(f"[{'FAIL' if failures else 'OK'}] touch: {len(events)} events written")
+    return failures
+
+
+def check_commit_failure(tmp: Path, session_factory) -> list:
+    """组提交失败后，重试同一变化不应被当作重复事件丢弃"""
+    failures = []
+    bus = EventBus(write_behind=True)
+    bus.db_factory = session_factory
+    # 没有建表的数据库：组提交以 "no such table" 失败
+    broken_engine = create_sqlite_engine(f"sqlite:///{tmp / 'broken.db'}")
+    bus._writer.db_factory = sessionmaker(bind=broken_engine)
+    note = tmp / "note.md"
+    note.write_text("# unsaved change\n", encoding="utf-8")
+    try:
+        first = bus.publish("file.modified", "file_watcher", {"path": str(note)})
+        if first is None or first.exception(timeout=5) is None:
+            failures.append("commit_failure: the first group commit was expected to fail")
+
+        bus._writer.db_factory = session_factory
+        time.sleep(bus.pipeline.debounce_window + 0.1)
+        retried = bus.publish("file.modified", "file_watcher", {"path": str(note)})
+        if retried is None:
+            failures.append("commit_failure: the retry of a failed event was dropped")
+        elif retried.exception(timeout=5) is not None:
+            failures.append(f"commit_failure: the retry failed: {retried.exception()}")
+    finally:
+        bus.close()
+        broken_engine.dispose()
+
+    events = _events(session_factory)
+    if len(events) != 1:
+        failures.append(f"commit_failure: expected 1 event after the retry, found {len(events)}")
+    print(f"[{'FAIL' if failures else 'OK'}] commit_failure: {len(events)} events written")
+    return failures
+
+
+def check_self_events(tmp: Path, session_factory) -> list:
+    """监控项目根目录时，LifeOS 自己的写入不应变成事件"""
+    from watchdog.observers import Observer
+    from life_system.collectors.fs_watcher import LifeOSFileHandler
+    from life_system.services.retention_service import RetentionService
+
+    failures = []
+    # 与 FileWatcher 相同的配置：持久化 Pipeline 状态，状态日志位于被监控的目录中
+    bus = EventBus()
+    bus.db_factory = session_factory
+    bus.pipeline._state_store = PipelineStateStore(tmp / "pipeline_state.log")
+    bus.pipeline._state_loaded = False
+    (tmp / "logs").mkdir()
+    sink = logger.add(tmp / "logs" / "life_os.log", level="DEBUG")
+
+    handler = LifeOSFileHandler(bus, str(tmp))
+    observer = Observer()
+    observer.schedule(handler, str(tmp), recursive=True)
+    observer.start()
+    try:
+        (tmp / "note.md").write_text("# a real note\n", encoding="utf-8")
+        archive = RetentionService(tmp / "archive")
+        archive.archive_dir.mkdir()
+        deadline = time.monotonic() + 3.0
+        while time.monotonic() < deadline:
+            metrics.write_snapshot(tmp / "logs" / "metrics.json")
+            (tmp / "similarity_index.json").write_text("{}", encoding="utf-8")
+            archive._append_segment("2026-01", [{"id": 1}])
+            time.sleep(0.2)
+    finally:
+        observer.stop()
+        observer.join()
+        handler.close()
+        bus.close()
+        logger.remove(sink)
+
+    paths = Counter(Path(payload["path"]).relative_to(tmp).as_posix() for _, payload in _events(session_factory))
+    unexpected = {path: n for path, n in paths.items() if path != "note.md"}
+    if unexpected:
+        failures.append(f"self_events: the watcher reported LifeOS's own writes: {dict(unexpected)}")
+    if not paths.get("note.md"):
+        failures.append("self_events: the real note was not reported")
+    print(f"[{'FAIL' if failures else 'OK'}] self_events: {dict(paths)}")
+    return failures
+
+
+CHECKS = [check_touch, check_commit_failure, check_self_events]
+
+
+def main():
+    console.quiet = True
+    failures = []
+    for check in CHECKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_sqlite_engine(f"sqlite:///{Path(tmp) / 'life.db'}")
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            failures.extend(check(Path(tmp), session_factory))
+            engine.dispose()
+    console.quiet = False
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+查询计划检查：确认热点查询命中 core/migrations.py 中的复合/部分索引
+
+用法:
+    python benchmarks/check_query_plans.py
+
+在临时数据库上先以"旧库"方式建表（仅 create_all），写入数据后再执行迁移，
+然后运行各个 Service 的真实查询，捕获 SQL 并逐条 EXPLAIN QUERY PLAN。
+任何一条热点查询没有使用预期索引时，脚本以非零状态退出。
+"""
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import sessionmaker
+
+from life_system.core.db import Base, create_sqlite_engine
+from life_system.core.migrations import explain_query_plan, get_schema_version, run_migrations
+from life_system.core.models import Event, Task, TaskTransition
+from life_system.services.task_service import TaskService
+from life_system.services.transition_service import TransitionService
+from life_system.utils.console import console
+
+# (SQL 片段, 期望出现在查询计划中的索引名)
+EXPECTED_PLANS = [
+    ("FROM events", "ix_events_unprocessed"),
+    ("tasks.title IN", "ix_tasks_status_title"),
+    ("tasks.created_at <", "ix_tasks_status_created_at"),
+    ("ORDER BY tasks.created_at", "ix_tasks_status_created_at"),
+    ("FROM task_transitions", "ix_task_transitions_task_created"),
+    ("tasks_fts MATCH", "VIRTUAL TABLE INDEX"),
+]
+
+
+def _seed(session_factory):
+    db = session_factory()
+    try:
+        now = datetime.now()
+        db.execute(insert(Task), [
+            {"title": f"task {i}", "status": ("pending", "done", "dropped")[i % 3],
+             "created_at": now - timedelta(days=i % 60)}
+            for i in range(3000)
+        ])
+        db.execute(insert(Event), [
+            {"type": "file.modified", "source": "file_watcher",
+             "payload": {"path": f"/tmp/plan/note_{i}.md"}, "processed": i < 2900}
+            for i in range(3000)
+        ])
+        db.execute(insert(TaskTransition), [
+            {"task_id": i % 300, "from_status": "pending", "to_status": "done", "reason": "user_action"}
+            for i in range(3000)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    console.quiet = True
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(f"sqlite:///{Path(tmp) / 'plans.db'}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _seed(session_factory)
+
+        applied = run_migrations(engine)
+        with engine.connect() as conn:
+            version = get_schema_version(conn)
+            conn.exec_driver_sql("ANALYZE")
+
+        captured = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, stmt, params, ctx, many: captured.append((stmt, params)))
+
+        task_service = TaskService()
+        task_service.db_factory = session_factory
+        task_service.bus.db_factory = session_factory
+        transition_service = TransitionService()
+        transition_service.db_factory = session_factory
+
+        task_service.process_events()
+        # 小页面，确保带 (created_at, id) 游标的后续页也被捕获
+        list(task_service.list_tasks("pending", page_size=50))
+        # ReminderService 的查询（直接调用会经 EventBus 发布提醒事件，这里只复现查询）
+        db = session_factory()
+        try:
+            db.query(Task).filter(Task.status == "pending",
+                                  Task.created_at < datetime.now() - timedelta(days=30)).all()
+        finally:
+            db.close()
+        transition_service.get_task_history(42)
+        # 迁移 v5 对已有任务的回填 + 触发器同步（process_events 新建的任务）
+        task_service.search_tasks("task 123", status="pending")
+
+        with engine.connect() as conn:
+            for fragment, index_name in EXPECTED_PLANS:
+                selects = [(s, p) for s, p in captured if s.lstrip().startswith("SELECT") and fragment in s]
+                if not selects:
+                    failures.append(f"no captured query matched '{fragment}'")
+                    continue
+                for statement, params in selects:
+                    plan = " | ".join(explain_query_plan(conn, statement, params))
+                    ok = index_name in plan
+                    print(f"[{'OK' if ok else 'FAIL'}] {index_name:34s} {plan}")
+                    if not ok:
+                        failures.append(f"{index_name} not used: {statement.splitlines()[0]} ... -> {plan}")
+        engine.dispose()
+
+    console.quiet = False
+    print(f"schema version {version} ({applied} migrations applied to the existing database)")
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
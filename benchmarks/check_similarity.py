@@ -0,0 +1,77 @@
+"""
+相似度索引召回检查：SimilarityIndex.find_similar 与逐一比较的 SimilarityEngine 结果一致
+
+用法:
+    python benchmarks/check_similarity.py
+
+在小规模语料上（低于 SimilarityIndex.STOP_GRAM_MIN_TASKS，索引不跳过任何 n-gram），
+每个查询分别用索引和 SimilarityEngine.find_similar_tasks 暴力比较查找相似任务，
+暴力比较找到而索引漏掉的任务（相似度达到阈值）都算作失败：
+- readme：文档中的小例子（"buy milk tomorrow" 应同时找到 "buy milk" 和 "buy milk today"）
+- random：固定随机种子合成的中英文标题语料
+
+任何一项不满足时，脚本以非零状态退出。
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from life_system.engines.similarity_engine import SimilarityEngine
+from life_system.engines.similarity_index import SimilarityIndex
+
+THRESHOLD = 0.6
+
+_WORDS = [
+    "buy", "milk", "today", "tomorrow", "call", "mom", "write", "report", "fix", "bike",
+    "重构", "优化", "lifeOS", "架构", "审查", "文件", "周报", "会议", "整理", "笔记",
+]
+
+
+def _check(name: str, tasks: dict, queries: list) -> list:
+    index = SimilarityIndex()
+    for task_id, title in tasks.items():
+        index.add(task_id, title)
+
+    failures = []
+    for query in queries:
+        expected = SimilarityEngine.find_similar_tasks(query, list(tasks.items()), THRESHOLD)
+        found = {task_id for task_id, _ in index.find_similar(query, THRESHOLD)}
+        missed = [(task_id, round(score, 2)) for task_id, score in expected if task_id not in found]
+        if missed:
+            failures.append(f"{name}: {query!r} missed {missed}")
+    print(f"[{'FAIL' if failures else 'OK'}] {name}: {len(queries)} queries over {len(tasks)} tasks")
+    return failures
+
+
+def check_readme() -> list:
+    tasks = {1: "buy milk", 2: "buy milk today", 3: "call mom", 4: "write report", 5: "fix bike"}
+    return _check("readme", tasks, ["buy milk tomorrow", "call mom today", "fix the bike"])
+
+
+def check_random() -> list:
+    rng = random.Random(42)
+
+    def title() -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4)))
+
+    tasks = {task_id: title() for task_id in range(1, 301)}
+    return _check("random", tasks, [title() for _ in range(200)])
+
+
+CHECKS = [check_readme, check_random]
+
+
+def main():
+    failures = []
+    for check in CHECKS:
+        failures.extend(check())
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
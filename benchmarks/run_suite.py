@@ -0,0 +1,375 @@
+"""
+事件链路基准套件：按固定规模、固定随机种子测量各环节的吞吐与延迟分位
+
+用法:
+    python benchmarks/run_suite.py [--scale small|medium|large] [--only ingest,analyze] [--output result.json]
+    python benchmarks/run_suite.py --scale small --baseline old.json      # 运行后与基线比较
+    python benchmarks/run_suite.py --compare old.json new.json            # 只比较两份结果
+
+规模预设（事件数 / 任务数）：small 1k / 10k，medium 100k / 100k，large 1M / 100k。
+每个用例都在临时目录中的独立 SQLite 文件和合成目录树上运行，不会读写项目自身的 life.db。
+单次同步提交这类逐条 I/O 的用例按 CASE_CAPS 限制次数，结果中的 ops 为实际执行次数。
+
+比较模式下，吞吐下降或 p50 上升超过 --threshold（默认 10%）、p99 上升超过 2 倍阈值的用例
+标记为回归，脚本以非零状态退出。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from life_system.core.db import Base, create_sqlite_engine
+from life_system.core.event_bus import EventBus
+from life_system.core.ingestion_pipeline import IngestionPipeline
+from life_system.core.models import Event, Task
+from life_system.engines.analysis_cache import AnalysisCache
+from life_system.engines.similarity_engine import SimilarityEngine
+from life_system.engines.task_analyzer import TaskAnalyzer
+from life_system.services.task_service import TaskService
+from life_system.utils.console import console
+from life_system.utils.logger import logger
+
+SCALES = {
+    "small": {"events": 1_000, "tasks": 10_000},
+    "medium": {"events": 100_000, "tasks": 100_000},
+    "large": {"events": 1_000_000, "tasks": 100_000},
+}
+
+# 逐条执行代价过高的用例的次数上限
+CASE_CAPS = {
+    "pipeline.ingest_file": 50_000,           # 合成目录树的文件数
+    "event_bus.publish_direct": 20_000,       # 每次一个同步提交
+    "similarity.find_similar_tasks": 10,      # 每次查询都全量比较所有任务
+    "task_service.find_similar_tasks": 500,
+}
+
+SEED = 20240601
+
+_WORDS = [
+    "审查", "整理", "报告", "周会", "预算", "合同", "设计", "需求", "测试", "部署",
+    "report", "review", "budget", "meeting", "design", "deploy", "invoice", "draft", "plan", "notes",
+]
+_PREFIXES = ["[MODIFIED] 审查文件: ", "[CREATED] 新文件: ", "", "", "紧急 ", "明天 "]
+
+
+def _title(rng: random.Random, i: int) -> str:
+    words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 5)))
+    # 两个随机汉字模拟文件名/人名等低频词，使标题之间的 n-gram 分布接近真实数据
+    rare = chr(0x4E00 + rng.randrange(3000)) + chr(0x4E00 + rng.randrange(3000))
+    return f"{rng.choice(_PREFIXES)}{words} {rare} {i % 997}"
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _summarize(latencies: List[float], elapsed: float, ops: Optional[int] = None, **extra) -> Dict:
+    """latencies 为每次调用的耗时（秒）；ops 为处理的条目数（默认等于调用次数）"""
+    latencies.sort()
+    ops = len(latencies) if ops is None else ops
+    return {
+        "ops": ops,
+        "calls": len(latencies),
+        "elapsed_s": round(elapsed, 4),
+        "ops_per_s": round(ops / elapsed, 1) if elapsed else 0.0,
+        "p50_us": round(_percentile(latencies, 0.50) * 1e6, 1),
+        "p90_us": round(_percentile(latencies, 0.90) * 1e6, 1),
+        "p99_us": round(_percentile(latencies, 0.99) * 1e6, 1),
+        "max_us": round(latencies[-1] * 1e6, 1) if latencies else 0.0,
+        **extra,
+    }
+
+
+def _timed(calls, fn: Callable) -> tuple:
+    latencies = []
+    started = time.perf_counter()
+    for args in calls:
+        t = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t)
+    return latencies, time.perf_counter() - started
+
+
+class Workspace:
+    """一个用例运行所需的临时数据库、目录树与服务"""
+
+    def __init__(self, root: Path, scale: Dict[str, int]):
+        self.root = root
+        self.scale = scale
+        self._engines = []
+
+    def session_factory(self, name: str):
+        engine = create_sqlite_engine(f"sqlite:///{self.root / name}")
+        Base.metadata.create_all(bind=engine)
+        self._engines.append(engine)
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def task_service(self, session_factory) -> TaskService:
+        service = TaskService()
+        service.db_factory = session_factory
+        service.bus.db_factory = session_factory
+        service.similarity_index_path = self.root / "similarity_index.json"
+        return service
+
+    def file_tree(self, n_files: int) -> List[str]:
+        """合成目录树：每层 10 个子目录，每个叶子目录 50 个文件"""
+        tree = self.root / "tree"
+        paths = []
+        for i in range(n_files):
+            leaf = tree / f"d{i // 5000 % 10}" / f"d{i // 500 % 10}" / f"d{i // 50 % 10}"
+            if i % 50 == 0:
+                leaf.mkdir(parents=True, exist_ok=True)
+            path = leaf / f"note_{i}.md"
+            path.write_text(f"# note {i}\n", encoding="utf-8")
+            paths.append(str(path))
+        return paths
+
+    def seed_tasks(self, session_factory, n_tasks: int, rng: random.Random) -> List[tuple]:
+        rows = [{"title": _title(rng, i), "status": "pending", "created_at": datetime.now(), "updated_at": datetime.now()}
+                for i in range(n_tasks)]
+        db = session_factory()
+        try:
+            db.execute(insert(Task), rows)
+            db.commit()
+            return [(t.id, t.title) for t in db.query(Task.id, Task.title).order_by(Task.id)]
+        finally:
+            db.close()
+
+    def close(self):
+        for engine in self._engines:
+            engine.dispose()
+
+
+def case_ingest_task(ws: Workspace, rng: random.Random) -> Dict:
+    """IngestionPipeline.ingest：互不重复的非文件事件（过滤、标准化、指纹去重、防抖全路径）"""
+    n = ws.scale["events"]
+    pipeline = IngestionPipeline(debounce_window=0.0)
+    publish = lambda event_type, source, payload: 1
+    calls = [("task.created", "cli", {"title": f"{_title(rng, i)} #{i}"}, publish) for i in range(n)]
+    latencies, elapsed = _timed(calls, pipeline.ingest)
+    pipeline.close()
+    return _summarize(latencies, elapsed)
+
+
+def case_ingest_file(ws: Workspace, rng: random.Random) -> Dict:
+    """IngestionPipeline.ingest：合成目录树中的文件事件，第一轮为新文件，其余各轮物理状态未变"""
+    n = ws.scale["events"]
+    paths = ws.file_tree(min(n, CASE_CAPS["pipeline.ingest_file"]))
+    pipeline = IngestionPipeline(debounce_window=0.0)
+    published = []
+    publish = lambda event_type, source, payload: published.append(1) or len(published)
+    calls = [("file.modified", "file_watcher", {"path": paths[i % len(paths)]}, publish) for i in range(n)]
+    latencies, elapsed = _timed(calls, pipeline.ingest)
+    pipeline.close()
+    return _summarize(latencies, elapsed, files=len(paths), published=len(published))
+
+
+def case_publish_direct(ws: Workspace, rng: random.Random) -> Dict:
+    """EventBus._publish_direct：每个事件一次同步提交"""
+    n = min(ws.scale["events"], CASE_CAPS["event_bus.publish_direct"])
+    bus = EventBus(use_pipeline=False)
+    bus.db_factory = ws.session_factory("publish.db")
+    calls = [("file.modified", "file_watcher", {"path": f"/bench/note_{i}.md"}) for i in range(n)]
+    latencies, elapsed = _timed(calls, bus._publish_direct)
+    return _summarize(latencies, elapsed)
+
+
+def case_process_events(ws: Workspace, rng: random.Random) -> Dict:
+    """TaskService.process_events：积压的文件事件转任务（约 1/4 标题重复），逐批调用直到清空"""
+    n = ws.scale["events"]
+    session_factory = ws.session_factory("process.db")
+    db = session_factory()
+    try:
+        unique = max(1, n * 3 // 4)
+        for start in range(0, n, 50_000):
+            db.execute(insert(Event), [
+                {"type": "file.modified", "source": "file_watcher",
+                 "payload": {"path": f"/bench/note_{i % unique}.md"},
+                 "created_at": datetime.now(), "processed": False}
+                for i in range(start, min(n, start + 50_000))
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+    service = ws.task_service(session_factory)
+    latencies = []
+    converted = 0
+    last_head = None
+    started = time.perf_counter()
+    while True:
+        t = time.perf_counter()
+        converted += service.process_events()
+        latencies.append(time.perf_counter() - t)
+        head = service.bus.get_unprocessed(limit=1)
+        if not head or head[0].id == last_head:
+            break  # 已清空，或本批失败没有进展
+        last_head = head[0].id
+    return _summarize(latencies, time.perf_counter() - started, ops=n, converted=converted)
+
+
+def case_similarity_engine(ws: Workspace, rng: random.Random) -> Dict:
+    """SimilarityEngine.find_similar_tasks：对全部任务逐一计算相似度（基线实现）"""
+    candidates = [(i, _title(rng, i)) for i in range(ws.scale["tasks"])]
+    queries = [(_title(rng, i), candidates) for i in range(CASE_CAPS["similarity.find_similar_tasks"])]
+    latencies, elapsed = _timed(queries, SimilarityEngine.find_similar_tasks)
+    return _summarize(latencies, elapsed, tasks=len(candidates))
+
+
+def case_similarity_index(ws: Workspace, rng: random.Random) -> Dict:
+    """TaskService.find_similar_tasks：n-gram 索引筛候选后重排（索引在计时前建好）"""
+    session_factory = ws.session_factory("similarity.db")
+    tasks = ws.seed_tasks(session_factory, ws.scale["tasks"], rng)
+    service = ws.task_service(session_factory)
+    service.find_similar_tasks("warm up")
+    queries = [(_title(rng, i),) for i in range(CASE_CAPS["task_service.find_similar_tasks"])]
+    latencies, elapsed = _timed(queries, service.find_similar_tasks)
+    return _summarize(latencies, elapsed, tasks=len(tasks))
+
+
+def case_analyze(ws: Workspace, rng: random.Random) -> Dict:
+    """TaskAnalyzer.analyze：标题按文件事件的规律重复出现，经过结果缓存"""
+    n = ws.scale["events"]
+    pool = [_title(rng, i) for i in range(max(1, n // 10))]
+    calls = [(rng.choice(pool),) for _ in range(n)]
+    previous = TaskAnalyzer.cache
+    TaskAnalyzer.cache = AnalysisCache(previous.max_entries if previous else 4096)
+    try:
+        latencies, elapsed = _timed(calls, TaskAnalyzer.analyze)
+        hit_rate = round(TaskAnalyzer.cache.stats()["hit_rate"], 4)
+    finally:
+        TaskAnalyzer.cache = previous
+    return _summarize(latencies, elapsed, cache_hit_rate=hit_rate)
+
+
+CASES = {
+    "pipeline.ingest_task": case_ingest_task,
+    "pipeline.ingest_file": case_ingest_file,
+    "event_bus.publish_direct": case_publish_direct,
+    "task_service.process_events": case_process_events,
+    "similarity.find_similar_tasks": case_similarity_engine,
+    "task_service.find_similar_tasks": case_similarity_index,
+    "analyzer.analyze": case_analyze,
+}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scale_name: str, only: Optional[List[str]] = None) -> Dict:
+    scale = SCALES[scale_name]
+    results = {}
+    for name, case in CASES.items():
+        if only and not any(part in name for part in only):
+            continue
+        with tempfile.TemporaryDirectory(prefix="lifeos-bench-") as tmp:
+            ws = Workspace(Path(tmp), scale)
+            try:
+                results[name] = case(ws, random.Random(SEED))
+            finally:
+                ws.close()
+        r = results[name]
+        print(f"{name:34s} {r['ops']:>9,} ops  {r['ops_per_s']:>11,.0f} ops/s  "
+              f"p50 {r['p50_us']:>9,.1f} us  p99 {r['p99_us']:>10,.1f} us", flush=True)
+    return {
+        "meta": {
+            "scale": scale_name,
+            **scale,
+            "seed": SEED,
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "taken_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(old: Dict, new: Dict, threshold: float) -> List[str]:
+    """逐用例比较两份结果，返回回归描述列表"""
+    if old["meta"]["scale"] != new["meta"]["scale"]:
+        console.print(f"[yellow]scale differs: {old['meta']['scale']} vs {new['meta']['scale']}[/yellow]")
+    regressions = []
+    checks = [
+        # (指标, 越大越好, 允许的相对变化)
+        ("ops_per_s", True, threshold),
+        ("p50_us", False, threshold),
+        ("p99_us", False, threshold * 2),
+    ]
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        a, b = old["results"][name], new["results"][name]
+        cells = []
+        for metric, higher_is_better, allowed in checks:
+            if not a[metric]:
+                continue
+            change = (b[metric] - a[metric]) / a[metric]
+            worse = -change if higher_is_better else change
+            flag = worse > allowed
+            cells.append(f"{metric} {change:+.1%}{' REGRESSION' if flag else ''}")
+            if flag:
+                regressions.append(f"{name}: {metric} {a[metric]} -> {b[metric]} ({change:+.1%})")
+        print(f"[{'FAIL' if any('REGRESSION' in c for c in cells) else 'OK'}] {name:34s} {'  '.join(cells)}")
+    return regressions
+
+
+def _load(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", help="只运行名称包含这些片段的用例，逗号分隔")
+    parser.add_argument("--output", help="结果 JSON 的写入路径")
+    parser.add_argument("--baseline", help="运行后与该结果文件比较")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="只比较两份已有结果")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定回归的相对变化（默认 0.10）")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(_load(args.compare[0]), _load(args.compare[1]), args.threshold)
+    else:
+        logger.remove()
+        console.quiet = True
+        try:
+            result = run_suite(args.scale, args.only.split(",") if args.only else None)
+        finally:
+            console.quiet = False
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=1)
+            print(f"results written to {args.output}")
+        regressions = compare(_load(args.baseline), result, args.threshold) if args.baseline else []
+
+    if regressions:
+        for regression in regressions:
+            print(f"FAIL: {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
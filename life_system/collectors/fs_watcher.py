@@ -1,13 +1,25 @@
+import queue
+import threading
 import time
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from life_system.config.settings import (
+    RECONCILE_ON_START,
+    FS_EVENT_QUEUE_SIZE,
+    FS_EVENT_BATCH_SIZE,
+    FS_EVENT_ENQUEUE_TIMEOUT,
+    FS_EVENT_BATCH_LINGER,
+)
 from life_system.core.event_bus import EventBus
+from life_system.collectors.reconciler import StartupReconciler
 from life_system.utils.console import console
 from life_system.utils.logger import logger
 
+_STOP = object()
+
 class LifeOSFileHandler(FileSystemEventHandler):
     """
     LifeOS 文件系统事件处理器
@@ -16,32 +28,127 @@ class LifeOSFileHandler(FileSystemEventHandler):
     1. 监听文件系统的创建、修改、移动事件
     2. 将这些原生事件转换为 LifeOS 的标准 Event
     3. 通过 EventBus (集成 IngestionPipeline) 发布，实现防抖和去重
+
+    observer 线程只负责把原始事件放入有界队列；过滤、stat、去重和写库都在
+    FileEventWorker 线程中按批进行，同一批内同一路径的事件合并为一个。
+    队列满时 observer 最多等待 enqueue_timeout 秒（背压），仍然放不进去的事件计入
+    overflowed，并在队列排空后调用 on_overflow（FileWatcher 用它触发一次对账扫描补回丢失的变化）。
     """
     
-    def __init__(self, bus: EventBus, watch_dir: str):
+    def __init__(
+        self,
+        bus: EventBus,
+        watch_dir: str,
+        queue_size: int = FS_EVENT_QUEUE_SIZE,
+        batch_size: int = FS_EVENT_BATCH_SIZE,
+        enqueue_timeout: float = FS_EVENT_ENQUEUE_TIMEOUT,
+        linger: float = FS_EVENT_BATCH_LINGER,
+        on_overflow: Optional[Callable[[], None]] = None
+    ):
         self.bus = bus
         self.watch_dir = watch_dir
+        self.batch_size = batch_size
+        self.enqueue_timeout = enqueue_timeout
+        self.linger = linger
+        self.on_overflow = on_overflow
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._overflow_pending = threading.Event()
+        self._stats = {"received": 0, "coalesced": 0, "published": 0, "overflowed": 0, "max_depth": 0}
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="FileEventWorker", daemon=True)
+        self._worker.start()
         
     def _process_event(self, event_type: str, src_path: str, dest_path: str = None):
-        """处理文件事件并发布"""
+        """把原始事件放入队列（在 observer 线程中执行，不做任何 I/O）"""
         # 忽略目录事件（通常我们只关心文件的具体变化，或者让 pipeline 去过滤）
         # 这里先保留，由 Pipeline 统一决定是否过滤目录
-        
-        payload = {
-            "path": src_path,
-            "watch_dir": self.watch_dir
-        }
-        
-        if dest_path:
-            payload["dest_path"] = dest_path
-            
-        # 发布事件
-        logger.debug(f"Detected file system event: {event_type} - {src_path}")
-        self.bus.publish(
-            type=f"file.{event_type}",
-            source="file_watcher",
-            payload=payload
-        )
+        try:
+            self._queue.put((event_type, src_path, dest_path), timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["overflowed"] += 1
+            self._overflow_pending.set()
+            logger.warning(f"File event queue full, dropped: {event_type} - {src_path}")
+            return
+        with self._stats_lock:
+            self._stats["received"] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats["max_depth"]:
+                self._stats["max_depth"] = depth
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            # 收到第一个事件后再等待一小段时间，让编辑器一次保存产生的多个事件落入同一批
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._publish_batch(batch)
+            if self._overflow_pending.is_set() and self._queue.empty() and not stopping:
+                self._overflow_pending.clear()
+                if self.on_overflow:
+                    try:
+                        self.on_overflow()
+                    except Exception as e:
+                        logger.error(f"File event overflow recovery failed: {e}")
+            if stopping:
+                return
+
+    def _publish_batch(self, batch: List[Tuple[str, str, Optional[str]]]):
+        """按路径合并一批事件后依次发布"""
+        coalesced: Dict[Tuple[str, Optional[str]], str] = {}
+        for event_type, src_path, dest_path in batch:
+            key = (src_path, dest_path)
+            previous = coalesced.get(key)
+            # created 之后的 modified 仍然算作一次创建
+            if previous == "created" and event_type == "modified":
+                continue
+            coalesced[key] = event_type
+
+        for (src_path, dest_path), event_type in coalesced.items():
+            payload = {
+                "path": src_path,
+                "watch_dir": self.watch_dir
+            }
+            if dest_path:
+                payload["dest_path"] = dest_path
+
+            # 发布事件
+            logger.debug(f"Detected file system event: {event_type} - {src_path}")
+            try:
+                self.bus.publish(
+                    type=f"file.{event_type}",
+                    source="file_watcher",
+                    payload=payload
+                )
+            except Exception as e:
+                logger.error(f"Failed to publish file event {event_type} - {src_path}: {e}")
+
+        with self._stats_lock:
+            self._stats["coalesced"] += len(batch) - len(coalesced)
+            self._stats["published"] += len(coalesced)
+
+    def stats(self) -> Dict[str, int]:
+        """队列统计：received / coalesced / published / overflowed / max_depth / depth"""
+        with self._stats_lock:
+            return dict(self._stats, depth=self._queue.qsize())
+
+    def close(self, timeout: float = 10.0):
+        """处理完队列中剩余的事件后停止工作线程"""
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
 
     def on_created(self, event):
         self._process_event("created", event.src_path)
@@ -64,7 +171,18 @@ class FileWatcher:
     def __init__(self, path: str):
         self.path = os.path.abspath(path)
         self.observer: Optional[Observer] = None
-        self.bus = EventBus() # 自动使用 IngestionPipeline
+        # 自动使用 IngestionPipeline；常驻进程持久化去重状态，避免重启后重复报告。
+        # 写后队列让 observer 线程不再等待每个事件的 COMMIT
+        self.bus = EventBus(persist_state=True, write_behind=True)
+        self.handler: Optional[LifeOSFileHandler] = None
+        self.reconciler: Optional[StartupReconciler] = None
+        self._reconcile_thread: Optional[threading.Thread] = None
+        # 溢出补偿：同一时刻最多一个对账线程；运行期间再次溢出时，结束后再补扫一轮
+        self._overflow_lock = threading.Lock()
+        self._overflow_reconciler: Optional[StartupReconciler] = None
+        self._overflow_thread: Optional[threading.Thread] = None
+        self._overflow_again = False
+        self._stopping = False
 
     def start(self):
         """启动监控"""
@@ -73,19 +191,76 @@ class FileWatcher:
             logger.error(f"Monitor directory does not exist: {self.path}")
             return
 
-        event_handler = LifeOSFileHandler(self.bus, self.path)
+        self.handler = LifeOSFileHandler(self.bus, self.path, on_overflow=self._recover_overflow)
         self.observer = Observer()
-        self.observer.schedule(event_handler, self.path, recursive=True)
+        self.observer.schedule(self.handler, self.path, recursive=True)
         self.observer.start()
         
         console.print(f"[green]文件监控已启动，正在监听: {self.path}[/green]")
         logger.info(f"File Watcher started on: {self.path}")
 
+        # observer 已经在运行，扫描期间的变化不会漏掉；对账在后台线程中进行，不阻塞启动
+        if RECONCILE_ON_START:
+            self.reconciler = StartupReconciler(self.path, self.bus)
+            self._reconcile_thread = threading.Thread(target=self.reconciler.run, name="StartupReconciler", daemon=True)
+            self._reconcile_thread.start()
+
+    def _recover_overflow(self):
+        """
+        事件队列溢出后重新对账，补回丢弃的变化
+
+        在 FileEventWorker 线程中调用，只启动一次性的后台对账线程，工作线程继续消费队列。
+        """
+        with self._overflow_lock:
+            if self._stopping:
+                return
+            if self._overflow_thread is not None:
+                self._overflow_again = True
+                return
+            self._overflow_thread = threading.Thread(
+                target=self._reconcile_after_overflow, name="OverflowReconciler", daemon=True
+            )
+            self._overflow_thread.start()
+
+    def _reconcile_after_overflow(self):
+        while True:
+            logger.warning(f"File event queue overflowed, reconciling {self.path}")
+            reconciler = StartupReconciler(self.path, self.bus)
+            with self._overflow_lock:
+                if self._stopping:
+                    self._overflow_thread = None
+                    return
+                self._overflow_reconciler = reconciler
+            try:
+                reconciler.run()
+            except Exception as e:
+                logger.error(f"File event overflow recovery failed: {e}")
+            with self._overflow_lock:
+                self._overflow_reconciler = None
+                if not self._overflow_again or self._stopping:
+                    self._overflow_thread = None
+                    self._overflow_again = False
+                    return
+                self._overflow_again = False
+
     def stop(self):
         """停止监控"""
         if self.observer:
+            if self.reconciler:
+                self.reconciler.stop()
+                self._reconcile_thread.join()
+            with self._overflow_lock:
+                self._stopping = True
+                overflow_thread = self._overflow_thread
+                if self._overflow_reconciler:
+                    self._overflow_reconciler.stop()
+            if overflow_thread:
+                overflow_thread.join()
             self.observer.stop()
             self.observer.join()
+            self.handler.close()
+            logger.info(f"File event queue stats: {self.handler.stats()}")
+            self.bus.close()
             console.print("[yellow]文件监控已停止[/yellow]")
             logger.info("File Watcher stopped")
 
@@ -0,0 +1,176 @@
+"""
+启动对账扫描 (Startup Reconciliation)
+
+FileWatcher 只能看到运行期间发生的变化；serve 停机期间被编辑的文件需要在启动时补上。
+对账扫描用线程池并行 os.scandir 遍历监控目录：
+
+- 命中过滤规则的目录（.git、node_modules 等）在进入之前就被剪掉
+- 与 IngestionPipeline 持久化的 (path -> mtime, size, inode) 快照比较，只摄入有差异的文件
+- 按扫描的目录项数限速，百万文件的目录树也不会让守护进程卡住
+- 监控根目录还没有"基线完成"记录时（首次运行，或从只记录了部分文件的旧版本状态升级），
+  快照中没有的文件只记入基线、不生成事件；快照中已有的文件照常比较。扫描完整结束后才写入基线记录
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Set, Tuple
+from life_system.config.settings import RECONCILE_WORKERS, RECONCILE_MAX_ENTRIES_PER_SEC
+from life_system.core.event_bus import EventBus
+from life_system.core.ingestion_pipeline import IngestionPipeline
+from life_system.core.path_filter import PathFilter
+from life_system.core.pipeline_state import same_file_state
+from life_system.utils.logger import logger
+
+
+class _RateLimiter:
+    """按条目数计费的限速器：每消耗 n 个额度，后续调用顺延 n / rate 秒"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._available_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int, stop: threading.Event):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._available_at, now)
+            self._available_at = start + n / self.rate
+        if start > now:
+            stop.wait(start - now)
+
+
+class StartupReconciler:
+    """监控目录与持久化文件状态快照之间的对账"""
+
+    def __init__(
+        self,
+        root: str,
+        bus: EventBus,
+        workers: int = RECONCILE_WORKERS,
+        max_entries_per_sec: float = RECONCILE_MAX_ENTRIES_PER_SEC
+    ):
+        self.root = os.path.abspath(root)
+        self.bus = bus
+        self.workers = workers
+        self._limiter = _RateLimiter(max_entries_per_sec)
+        self._filter = PathFilter(IngestionPipeline.FILTER_PATTERNS)
+        self._stop = threading.Event()
+
+    def stop(self):
+        """中止正在进行的扫描"""
+        self._stop.set()
+
+    def _scan_dir(self, path: str) -> Tuple[str, List[Tuple[str, tuple]], List[str], bool]:
+        """
+        扫描单个目录（在线程池中执行）
+
+        Returns:
+            (path, files, subdirs, ok)：files 为 [(文件路径, (mtime, size, inode))]
+        """
+        files = []
+        subdirs = []
+        entries = 0
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    entries += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._filter.matches(entry.path):
+                                subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            if not self._filter.matches(entry.path):
+                                stat = entry.stat(follow_symlinks=False)
+                                files.append((entry.path, (stat.st_mtime, stat.st_size, stat.st_ino)))
+                    except OSError:
+                        continue  # 扫描期间被删除等
+        except OSError as e:
+            logger.debug(f"Reconcile scan skipped {path}: {e}")
+            return path, files, subdirs, False
+        finally:
+            self._limiter.acquire(entries, self._stop)
+        return path, files, subdirs, True
+
+    def run(self) -> Dict[str, int]:
+        """
+        执行一次对账：摄入快照之后新增/修改的文件
+
+        Returns:
+            统计信息 {"dirs", "files", "created", "modified", "missing", "elapsed_ms", ...}
+        """
+        started = time.perf_counter()
+        pipeline = self.bus.pipeline
+        if pipeline is None:
+            logger.warning("Reconcile skipped: EventBus has no ingestion pipeline")
+            return {}
+
+        snapshot = pipeline.file_state_snapshot()
+        baseline = not pipeline.has_baseline(self.root)
+        stats = {"dirs": 0, "files": 0, "created": 0, "modified": 0, "missing": 0, "failed_dirs": 0}
+        seen_files: Set[str] = set()
+        scanned_dirs: Set[str] = set()
+        baseline_states: Dict[str, tuple] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Reconcile") as pool:
+            pending = {pool.submit(self._scan_dir, self.root)}
+            while pending and not self._stop.is_set():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, files, subdirs, ok = future.result()
+                    stats["dirs"] += 1
+                    if ok:
+                        scanned_dirs.add(path)
+                    else:
+                        stats["failed_dirs"] += 1
+                    if not self._stop.is_set():
+                        pending.update(pool.submit(self._scan_dir, subdir) for subdir in subdirs)
+
+                    for file_path, state in files:
+                        stats["files"] += 1
+                        seen_files.add(file_path)
+                        last_state = snapshot.get(file_path)
+                        if last_state is None:
+                            if baseline:
+                                baseline_states[file_path] = state
+                                continue
+                            self._ingest("created", file_path)
+                            stats["created"] += 1
+                        elif not same_file_state(last_state, state):
+                            self._ingest("modified", file_path)
+                            stats["modified"] += 1
+            for future in pending:
+                future.cancel()
+
+        if baseline_states:
+            pipeline.record_file_states(baseline_states)
+        if not self._stop.is_set():
+            # 只清理所在目录已完整扫描过的路径，无权限/扫描失败的目录下的状态保持不变
+            missing = [
+                path for path in snapshot
+                if path not in seen_files and os.path.dirname(path) in scanned_dirs
+            ]
+            stats["missing"] = pipeline.forget_file_states(missing)
+            if baseline:
+                pipeline.record_baseline(self.root)
+
+        stats["elapsed_ms"] = int((time.perf_counter() - started) * 1000)
+        if self._stop.is_set():
+            logger.info(f"Reconcile of {self.root} interrupted: {stats}")
+        elif baseline:
+            logger.info(
+                f"Reconcile baseline recorded for {self.root}: {len(baseline_states)} new of {stats['files']} files "
+                f"in {stats['elapsed_ms']} ms ({stats['modified']} modified)"
+            )
+        else:
+            logger.info(f"Reconcile of {self.root} finished: {stats}")
+        return stats
+
+    def _ingest(self, event_type: str, path: str):
+        self.bus.publish(
+            type=f"file.{event_type}",
+            source="file_watcher",
+            payload={"path": path, "watch_dir": self.root, "reconciled": True}
+        )
@@ -15,3 +15,93 @@ else:
     from pathlib import Path
     DB_PATH = Path("life.db")
     DB_URL = f"sqlite:///{DB_PATH}"
+
+# SQLite 存储配置 (Storage Profile)
+# serve 进程与每次 CLI 调用都会写 life.db：WAL 让读写互不阻塞，busy_timeout 让写写冲突排队而不是报错
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",        # WAL 下 NORMAL 仍然保证数据库一致，只可能丢失最后几个事务
+    "mmap_size": 256 * 1024 * 1024,  # 256 MB 内存映射读
+    "cache_size": -64 * 1024,        # 负数单位为 KiB，即 64 MB 页缓存
+    "busy_timeout": 5000,            # 毫秒
+}
+# 连接池：serve 进程中 watcher/写入线程、调度器线程池和主线程会并发取连接
+SQLITE_POOL_SIZE = 5
+SQLITE_MAX_OVERFLOW = 10
+
+# Ingestion Pipeline 去重状态的持久化日志（与 DB 同级）
+PIPELINE_STATE_PATH = DB_PATH.parent / "pipeline_state.log"
+PIPELINE_STATE_FLUSH_INTERVAL = 0.2   # 秒，状态记录在内存中攒批后由写入线程追加到日志
+# 事件指纹去重索引：内存上限与存活时间
+PIPELINE_SEEN_MAX_BYTES = 8 * 1024 * 1024   # 上限 8 MB，约 39 万条 64 位指纹；从 16 KB 起按需翻倍
+PIPELINE_SEEN_TTL = 24 * 3600               # 秒
+# 文件内容指纹：mtime/size 变了但内容没变（编辑器原样重写、touch）时不生成事件
+PIPELINE_CONTENT_FINGERPRINT = True
+CONTENT_HASH_CHUNK_SIZE = 1024 * 1024            # 流式计算的块大小
+CONTENT_HASH_FULL_MAX_BYTES = 64 * 1024 * 1024   # 超过该大小的文件只采样头尾
+CONTENT_HASH_SAMPLE_BYTES = 1024 * 1024          # 采样时头、尾各读取的字节数
+CONTENT_HASH_CACHE_SIZE = 65536                  # (inode, mtime, size) -> 指纹 缓存条目数
+
+# FileWatcher 事件队列：observer 线程只入队，FileEventWorker 批量合并后发布
+FS_EVENT_QUEUE_SIZE = 10000
+FS_EVENT_BATCH_SIZE = 500
+FS_EVENT_BATCH_LINGER = 0.05     # 秒，收到第一个事件后等待凑批的时间
+FS_EVENT_ENQUEUE_TIMEOUT = 0.5   # 队列满时 observer 最多等待的秒数，超时后丢弃并计入 overflowed
+
+# FileWatcher 启动对账扫描：补上 serve 停机期间的文件变化
+RECONCILE_ON_START = True
+RECONCILE_WORKERS = 4
+RECONCILE_MAX_ENTRIES_PER_SEC = 20000   # 每秒最多扫描的目录项数，0 表示不限速
+
+# 相似度候选索引快照（与 DB 同级），变更累计到一定数量或超过间隔后保存
+SIMILARITY_INDEX_PATH = DB_PATH.parent / "similarity_index.json"
+SIMILARITY_INDEX_SAVE_EVERY = 200      # 条
+SIMILARITY_INDEX_SAVE_INTERVAL = 60    # 秒
+# 相似度索引只收录这些状态的任务（done/dropped/archived 不参与相似任务查找）
+SIMILARITY_INDEX_STATUSES = ("pending",)
+
+# TaskAnalyzer 的外部关键词词典（每行: 关键词<TAB>分类<TAB>优先级），存在时在首次分析时载入
+ANALYZER_KEYWORDS_PATH = DB_PATH.parent / "keywords.tsv"
+# TaskAnalyzer 结果缓存：内存 LRU 容量；serve 进程额外持久化到 analysis_cache 表
+ANALYSIS_CACHE_SIZE = 4096
+ANALYSIS_CACHE_PERSIST = True
+
+# 每晚全量查重（pending 任务两两比较），阈值与 SimilarityEngine.is_duplicate 一致
+DUPLICATE_SCAN_HOUR = 3
+DUPLICATE_SCAN_THRESHOLD = 0.9
+
+# 事件保留：已处理且超过保留天数的事件每天搬到按月分段的压缩归档（与 DB 同级的 archive 目录）
+EVENT_RETENTION_DAYS = 30
+EVENT_ARCHIVE_DIR = DB_PATH.parent / "archive"
+EVENT_ARCHIVE_CHUNK = 5000     # 每个删除事务搬迁的事件数
+EVENT_RETENTION_HOUR = 4
+
+# 运行指标：serve 定期把进程内的计数器/直方图快照写入该文件，供 `life stats` 读取。
+# 放在 logs 目录下：项目根目录通常就是被监控的目录，logs 整体在 Pipeline 的过滤规则中
+METRICS_SNAPSHOT_PATH = DB_PATH.parent / "logs" / "metrics.json"
+METRICS_SNAPSHOT_INTERVAL = 30   # 秒
+
+# 事件处理 (Event Processing)
+# serve 由事件到达信号驱动处理，轮询只作为兜底（秒）
+EVENT_SAFETY_POLL_INTERVAL = 60
+# drain 模式：持续拉取积压事件，直到队列清空或时间预算耗尽
+EVENT_DRAIN_TIME_BUDGET = 4.0      # 单次 drain 的时间预算（秒），应小于调度间隔
+EVENT_DRAIN_TARGET_LATENCY = 0.25  # 每批的目标处理耗时（秒），据此自适应调整批大小
+EVENT_DRAIN_MIN_BATCH = 50
+EVENT_DRAIN_MAX_BATCH = 5000
+
+# life list / TUI 按 (created_at, id) 键集分页读取任务的每页行数
+TASK_LIST_PAGE_SIZE = 200
+
+# life search 默认返回的最大结果数
+TASK_SEARCH_LIMIT = 20
+
+# TUI：检查数据库是否被其他连接（如 life serve）修改的间隔（秒），
+# 以及光标/滚动位置距已加载末尾不足多少行时预取下一页
+TUI_POLL_INTERVAL = 1.0
+TUI_PREFETCH_ROWS = 50
+
+# 写后队列 (Write-Behind)：文件监控事件的组提交
+EVENT_WRITE_BEHIND_BATCH = 256       # 单次组提交的最大事件数
+EVENT_WRITE_BEHIND_INTERVAL = 0.05   # 最长等待时间（秒）
+EVENT_WRITE_BEHIND_QUEUE = 10000     # 队列容量，满了之后发布方阻塞
@@ -1,8 +1,18 @@
 """Core 模块：系统的核心，包含事件总线和摄入管道"""
-from life_system.core.event_bus import EventBus
-from life_system.core.ingestion_pipeline import IngestionPipeline
-from life_system.core.models import Event, Task, TaskTransition
-from life_system.core.db import Base, init_db, SessionLocal
+from importlib import import_module
+
+# 按需导入：导入 life_system.core 的任意子模块（如 timer_wheel）都会先执行本文件，
+# 这里不能提前拉起 SQLAlchemy 和 EventBus
+_EXPORTS = {
+    "EventBus": "life_system.core.event_bus",
+    "IngestionPipeline": "life_system.core.ingestion_pipeline",
+    "Event": "life_system.core.models",
+    "Task": "life_system.core.models",
+    "TaskTransition": "life_system.core.models",
+    "Base": "life_system.core.db",
+    "init_db": "life_system.core.db",
+    "SessionLocal": "life_system.core.db",
+}
 
 __all__ = [
     "EventBus",
@@ -15,3 +25,9 @@ __all__ = [
     "SessionLocal"
 ]
 
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
@@ -0,0 +1,132 @@
+"""
+文件内容指纹 (Content Hasher)
+
+(mtime, size) 变了不代表内容变了：编辑器原样重写、`touch` 都会改 mtime。
+ContentHasher 为文件计算 64 位内容指纹，供 IngestionPipeline 判断是否为真实变化：
+
+- 非加密哈希：安装了 xxhash 时使用 xxh3_64，否则用 zlib 的 crc32 + adler32 拼成 64 位
+- 通过 mmap 按块流式计算，不把整个文件读入内存
+- 超过 full_hash_max_bytes 的大文件只采样头尾各 sample_bytes（文件大小已在物理状态中比较）
+- (inode, mtime, size) -> 指纹 的 LRU 缓存，物理状态不变的文件不会被重复读取
+"""
+import mmap
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import xxhash
+except ImportError:  # 可选依赖
+    xxhash = None
+
+
+class ContentHasher:
+    """带 stat 键缓存的文件内容指纹计算器"""
+
+    def __init__(
+        self,
+        chunk_size: int = 1024 * 1024,
+        full_hash_max_bytes: int = 64 * 1024 * 1024,
+        sample_bytes: int = 1024 * 1024,
+        cache_size: int = 65536
+    ):
+        """
+        Args:
+            chunk_size: 流式计算的块大小
+            full_hash_max_bytes: 超过该大小的文件只采样头尾
+            sample_bytes: 采样时头、尾各读取的字节数
+            cache_size: 指纹缓存的最大条目数
+        """
+        self.chunk_size = chunk_size
+        self.full_hash_max_bytes = full_hash_max_bytes
+        self.sample_bytes = sample_bytes
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+    def digest(self, path: str, state: tuple) -> Optional[int]:
+        """
+        返回文件内容的 64 位指纹；读取失败时返回 None（调用方应视为"内容已变"）
+
+        Args:
+            path: 文件路径
+            state: 调用方刚取得的物理状态 (mtime, size, inode)
+        """
+        mtime, size, inode = state[:3]
+        key = (inode, mtime, size) if inode else (path, mtime, size)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        try:
+            value = self._hash_file(path, size)
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self._cache[key] = value
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def _hash_file(self, path: str, size: int) -> int:
+        with open(path, "rb") as f:
+            if size == 0:
+                return self._finish(self._new_state())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    state = self._new_state()
+                    length = len(mm)
+                    if length > self.full_hash_max_bytes:
+                        ranges = [(0, self.sample_bytes), (length - self.sample_bytes, length)]
+                    else:
+                        ranges = [(0, length)]
+                    for start, stop in ranges:
+                        for offset in range(start, stop, self.chunk_size):
+                            chunk = view[offset:min(offset + self.chunk_size, stop)]
+                            state = self._update(state, chunk)
+                            with self._lock:
+                                self.bytes_read += len(chunk)
+                            chunk.release()
+                    return self._finish(state)
+                finally:
+                    view.release()
+
+    @staticmethod
+    def _new_state():
+        if xxhash is not None:
+            return xxhash.xxh3_64()
+        return (0, 1)  # crc32, adler32 的初始值
+
+    @staticmethod
+    def _update(state, chunk):
+        if xxhash is not None:
+            state.update(chunk)
+            return state
+        crc, adler = state
+        return zlib.crc32(chunk, crc), zlib.adler32(chunk, adler)
+
+    @staticmethod
+    def _finish(state) -> int:
+        if xxhash is not None:
+            return state.intdigest()
+        crc, adler = state
+        return (crc << 32) | adler
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_read": self.bytes_read,
+            }
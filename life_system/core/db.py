@@ -1,8 +1,40 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from life_system.config.settings import DB_URL
+from life_system.config.settings import DB_URL, SQLITE_PRAGMAS, SQLITE_POOL_SIZE, SQLITE_MAX_OVERFLOW
 
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+def create_sqlite_engine(url: str = DB_URL, pragmas: Optional[Dict[str, Any]] = None) -> Engine:
+    """
+    按存储配置创建 SQLite 引擎
+
+    每个新连接建立时通过 connect 钩子执行 PRAGMA（见 settings.SQLITE_PRAGMAS）。
+    """
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    connect_args = {"check_same_thread": False}
+    if "busy_timeout" in pragmas:
+        # 驱动层的等待时间与 busy_timeout 保持一致（单位：秒）
+        connect_args["timeout"] = pragmas["busy_timeout"] / 1000
+
+    pool_args = {}
+    if url not in ("sqlite://", "sqlite:///:memory:"):
+        # 内存数据库只能使用单连接池，文件数据库使用固定大小的 QueuePool
+        pool_args = {"pool_size": SQLITE_POOL_SIZE, "max_overflow": SQLITE_MAX_OVERFLOW}
+
+    engine = create_engine(url, connect_args=connect_args, **pool_args)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+engine = create_sqlite_engine(DB_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -15,5 +47,39 @@ def get_db():
         db.close()
 
 def init_db():
+    """创建缺失的表，并应用尚未执行的迁移（索引等 create_all 无法补齐的结构）"""
+    from life_system.core import models  # noqa: F401  注册所有模型到 Base.metadata
+    from life_system.core.migrations import run_migrations
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+class DataVersionProbe:
+    """
+    通过 PRAGMA data_version 检测其他连接提交的修改
+
+    data_version 是连接级的计数：只有其他连接（包括其他进程）提交后，本连接读到的值才会变化。
+    探针独占一个连接，每次检查只是一条不访问任何表的 PRAGMA，适合高频轮询。
+    """
+
+    def __init__(self, bind: Engine = engine):
+        self._connection = bind.raw_connection()
+        self._version = self._read()
+
+    def _read(self) -> int:
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("PRAGMA data_version")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def changed(self) -> bool:
+        """自上次检查以来是否有其他连接提交过修改"""
+        version = self._read()
+        if version == self._version:
+            return False
+        self._version = version
+        return True
 
+    def close(self):
+        self._connection.close()
@@ -1,9 +1,13 @@
+from __future__ import annotations
+
 import json
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Union
 from sqlalchemy.orm import Session
 from life_system.core.models import Event
 from life_system.core.db import SessionLocal
+from life_system.core.notifier import notifier
 
 class EventBus:
     """
@@ -12,23 +16,84 @@ class EventBus:
     注意：为了建立"不动点"，建议所有外部输入都通过 IngestionPipeline，
     但为了向后兼容，这里仍然保留直接 publish 的能力。
     """
-    def __init__(self, use_pipeline: bool = True):
+    def __init__(self, use_pipeline: bool = True, persist_state: bool = False, write_behind: bool = False):
+        """
+        Args:
+            use_pipeline: 是否让外部事件经过 IngestionPipeline
+            persist_state: 是否将 Pipeline 的去重状态持久化到磁盘。
+                只应由常驻进程（life serve 的收集器）开启，避免多进程同时写日志。
+            write_behind: 是否启用写后队列。启用后非 durable 事件进入内存队列，
+                由单独的写入线程组提交，publish 返回 Future 而不是事件ID。
+        """
         self.db_factory = SessionLocal
         self.use_pipeline = use_pipeline
         self._pipeline = None
+        self._writer = None
+
+        if write_behind:
+            from life_system.config.settings import (
+                EVENT_WRITE_BEHIND_BATCH,
+                EVENT_WRITE_BEHIND_INTERVAL,
+                EVENT_WRITE_BEHIND_QUEUE,
+            )
+            from life_system.core.event_writer import EventWriter
+            self._writer = EventWriter(
+                self.db_factory,
+                max_batch=EVENT_WRITE_BEHIND_BATCH,
+                flush_interval=EVENT_WRITE_BEHIND_INTERVAL,
+                max_queue=EVENT_WRITE_BEHIND_QUEUE,
+                on_commit=lambda event_ids: self._notify_committed()
+            )
         
         if use_pipeline:
             # 延迟导入，避免循环依赖
             from life_system.core.ingestion_pipeline import IngestionPipeline
-            self._pipeline = IngestionPipeline(debounce_window=1.0)
+            state_store = None
+            if persist_state:
+                from life_system.config.settings import PIPELINE_STATE_PATH
+                from life_system.core.pipeline_state import PipelineStateStore
+                state_store = PipelineStateStore(PIPELINE_STATE_PATH)
+            from life_system.config.settings import (
+                PIPELINE_CONTENT_FINGERPRINT,
+                CONTENT_HASH_CHUNK_SIZE,
+                CONTENT_HASH_FULL_MAX_BYTES,
+                CONTENT_HASH_SAMPLE_BYTES,
+                CONTENT_HASH_CACHE_SIZE,
+            )
+            content_hasher = None
+            if PIPELINE_CONTENT_FINGERPRINT:
+                from life_system.core.content_hasher import ContentHasher
+                content_hasher = ContentHasher(
+                    chunk_size=CONTENT_HASH_CHUNK_SIZE,
+                    full_hash_max_bytes=CONTENT_HASH_FULL_MAX_BYTES,
+                    sample_bytes=CONTENT_HASH_SAMPLE_BYTES,
+                    cache_size=CONTENT_HASH_CACHE_SIZE
+                )
+            self._pipeline = IngestionPipeline(
+                debounce_window=1.0, state_store=state_store, content_hasher=content_hasher
+            )
+
+    @property
+    def pipeline(self):
+        """当前使用的 IngestionPipeline（未启用时为 None）"""
+        return self._pipeline
+
+    def close(self):
+        """发布 Pipeline 中待发布的后沿事件、提交写后队列中的剩余事件，并释放持有的资源"""
+        # 先关闭 Pipeline：它的后沿事件可能还要经由写后队列提交
+        if self._pipeline:
+            self._pipeline.close()
+        if self._writer:
+            self._writer.close()
 
     def publish(
         self, 
         type: str, 
         source: str, 
         payload: Dict[str, Any],
-        bypass_pipeline: bool = False
-    ) -> int:
+        bypass_pipeline: bool = False,
+        durable: Optional[bool] = None
+    ) -> Union[int, Future[int], None]:
         """
         发布一个新事件到数据库
         
@@ -37,24 +102,27 @@ class EventBus:
             source: 事件来源
             payload: 事件数据
             bypass_pipeline: 是否绕过 Ingestion Pipeline（内部事件使用）
+            durable: 是否同步提交。None 表示按来源决定：CLI 事件同步提交，
+                其余事件在启用写后队列时异步组提交。
         
         Returns:
-            事件ID
+            事件ID；异步提交时为最终得到事件ID的 Future；被过滤/去重时为 None
         """
+        if durable is None:
+            durable = source == "cli"
+        publish_func = self._publish_direct if durable or not self._writer else self._writer.submit
+
         # 如果启用了 pipeline 且不绕过，先通过 pipeline
         if self.use_pipeline and self._pipeline and not bypass_pipeline:
             # 对于内部事件（如 task.analyze），可能需要绕过 pipeline
             # 但对于外部事件（如 file.created），应该通过 pipeline
             if not type.startswith('task.') or source in ['cli', 'file_watcher', 'scheduler']:
-                # 传递 _publish_direct 函数，避免循环调用
-                event_id = self._pipeline.ingest(type, source, payload, self._publish_direct)
-                if event_id is not None:
-                    return event_id
-                # 如果 pipeline 返回 None（被过滤/去重），直接返回 None
-                # 这表示事件被过滤或去重，不应该发布
-        
+                # 传递底层发布函数（而不是 publish），避免循环调用。
+                # 返回 None 表示被过滤/去重/防抖（后沿由 Pipeline 自行发布），不能再直接发布
+                return self._pipeline.ingest(type, source, payload, publish_func)
+
         # 直接发布到数据库（绕过 pipeline 或 pipeline 未启用）
-        return self._publish_direct(type, source, payload)
+        return publish_func(type, source, payload)
     
     def _publish_direct(self, type: str, source: str, payload: Dict[str, Any]) -> int:
         """直接发布事件到数据库（内部方法）"""
@@ -68,17 +136,37 @@ class EventBus:
                 processed=False
             )
             db.add(event)
+            # flush 后主键已分配，无需 commit 后再 refresh 一次
+            db.flush()
+            event_id = event.id
             db.commit()
-            db.refresh(event)
-            return event.id
         finally:
             db.close()
+        self._notify_committed()
+        return event_id
+
+    @staticmethod
+    def _notify_committed():
+        """事件已落库：唤醒本进程的处理循环；不在 serve 进程中时，再唤醒 serve"""
+        notifier.notify()
+        if not notifier.listening:
+            notifier.signal_serve()
 
-    def get_unprocessed(self, limit: int = 100) -> List[Event]:
-        """获取未处理的事件"""
+    def get_unprocessed(self, limit: int = 100, after_id: Optional[int] = None) -> List[Event]:
+        """
+        获取未处理的事件（按 id 升序）
+
+        Args:
+            limit: 最多返回的事件数
+            after_id: 键集分页游标，只返回 id 大于该值的事件。
+                连续拉取时传入上一批最后一个事件的 id，避免每次从头扫描。
+        """
         db = self.db_factory()
         try:
-            return db.query(Event).filter(Event.processed == False).limit(limit).all()
+            query = db.query(Event).filter(Event.processed == False)
+            if after_id is not None:
+                query = query.filter(Event.id > after_id)
+            return query.order_by(Event.id).limit(limit).all()
         finally:
             db.close()
 
@@ -0,0 +1,126 @@
+"""
+事件写入器 (Event Writer)：写后队列 + 组提交
+
+调用方把事件放入有界内存队列后立即返回一个 Future；
+单独的写入线程每攒够 max_batch 个事件或每隔 flush_interval 秒，
+在一个事务里提交整批事件（一次 COMMIT / fsync），然后为每个 Future 填入事件 ID。
+
+队列满时 submit 会阻塞调用方，形成天然的背压。
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from life_system.core.models import Event
+from life_system.utils.logger import logger
+
+_STOP = object()
+
+
+class EventWriter:
+    """单写入线程的组提交队列"""
+
+    def __init__(
+        self,
+        db_factory: Callable,
+        max_batch: int = 256,
+        flush_interval: float = 0.05,
+        max_queue: int = 10000,
+        on_commit: Optional[Callable[[List[int]], None]] = None
+    ):
+        """
+        Args:
+            db_factory: Session 工厂
+            max_batch: 单次组提交的最大事件数
+            flush_interval: 从收到第一个事件起，最多等待多久就提交（秒）
+            max_queue: 队列容量，满了之后 submit 阻塞
+            on_commit: 每次组提交成功后以新事件ID列表回调（在写入线程中执行）
+        """
+        self.db_factory = db_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.on_commit = on_commit
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="EventWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, type: str, source: str, payload: Dict[str, Any]) -> "Future[int]":
+        """将事件放入写后队列，返回最终会得到事件 ID 的 Future"""
+        if self._closed:
+            raise RuntimeError("EventWriter is closed")
+        future: "Future[int]" = Future()
+        self._queue.put((type, source, payload, datetime.now(), future))
+        return future
+
+    def flush(self):
+        """阻塞直到当前队列中的事件全部提交"""
+        self._queue.join()
+
+    def close(self, timeout: float = 5.0):
+        """提交剩余事件并停止写入线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _commit(self, batch: List[Tuple]):
+        """在一个事务中写入整批事件"""
+        db = self.db_factory()
+        try:
+            events = [
+                Event(type=type, source=source, payload=payload, created_at=created_at, processed=False)
+                for type, source, payload, created_at, _ in batch
+            ]
+            db.add_all(events)
+            db.flush()
+            event_ids = [event.id for event in events]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Group commit of {len(batch)} events failed: {e}")
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            db.close()
+
+        for (*_, future), event_id in zip(batch, event_ids):
+            future.set_result(event_id)
+        logger.debug(f"Group-committed {len(event_ids)} events")
+        if self.on_commit:
+            try:
+                self.on_commit(event_ids)
+            except Exception as e:
+                logger.error(f"EventWriter on_commit callback failed: {e}")
@@ -0,0 +1,256 @@
+"""
+有界指纹去重索引 (Fingerprint Store)
+
+用定长 64 位指纹代替 32 字符的 MD5 字符串，存放在数组实现的开放寻址哈希表中
+（线性探测），每个槽位 16 字节（8 字节指纹 + 8 字节写入时间）。
+
+表从 INITIAL_SLOTS 个槽位开始，按需翻倍，直到 max_bytes 决定的上限；只做去重的短命进程
+（CLI、TUI、基准）不会为用不到的容量预先分配内存。
+
+淘汰策略：
+- TTL：超过 ttl 秒的条目在查询时视为不存在，并在下一次重建时回收
+- 容量：表已达上限且存活条目达到负载上限时，按写入时间淘汰最旧的约 1/8
+  （分位点由抽样估计）
+
+扩容和淘汰都要重建整张表。重建是渐进的：新表分配后，旧表留在原处，之后每次 add/contains
+顺带迁移 MIGRATE_STEP 个旧槽位，查询同时查看新旧两张表；单次操作的开销有界，
+调用方持锁期间不会出现 O(容量) 的停顿。
+"""
+import random
+import time
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+from life_system.utils.logger import logger
+
+
+class FingerprintStore:
+    """定长 64 位指纹的有界去重索引"""
+
+    SLOT_BYTES = 16      # 8 字节指纹 + 8 字节写入时间
+    MAX_LOAD = 0.75      # 负载因子上限，超过后线性探测退化明显
+    EVICT_FRACTION = 8   # 容量淘汰时回收 1/EVICT_FRACTION 的条目
+    INITIAL_SLOTS = 1024  # 初始槽位数（16 KB）
+    MIGRATE_STEP = 32    # 每次操作迁移的旧表槽位数；须保证迁移先于新表填满完成
+    EVICT_SAMPLES = 256  # 估计淘汰分位点时抽样的条目数
+    _EMPTY = 0           # 指纹 0 保留为空槽标记
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: Optional[float] = 24 * 3600):
+        """
+        Args:
+            max_bytes: 内存上限（字节），决定最大槽位数量（向下取 2 的幂）
+            ttl: 条目的存活时间（秒），None 表示只按容量淘汰
+        """
+        slots = max(16, max_bytes // self.SLOT_BYTES)
+        self.ttl = ttl
+        self._max_capacity = 1 << (slots.bit_length() - 1)
+        self._reset_tables()
+
+        # 统计计数器
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.ttl_evictions = 0
+        self.capacity_evictions = 0
+
+    def _reset_tables(self):
+        self._set_table(min(self.INITIAL_SLOTS, self._max_capacity))
+        self._count = 0
+        # 渐进重建中的旧表；None 表示没有进行中的重建
+        self._old_keys: Optional[array] = None
+        self._old_stamps: Optional[array] = None
+        self._old_count = 0     # 旧表中尚未迁移的条目数
+        self._migrate_pos = 0
+        self._evict_before = float("-inf")  # 写入时间不晚于该值的旧条目在迁移时淘汰
+
+    def _set_table(self, capacity: int):
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._max_items = int(capacity * self.MAX_LOAD)
+        self._keys = array("Q", bytes(8 * capacity))
+        self._stamps = array("d", bytes(8 * capacity))
+
+    @staticmethod
+    def _normalize(fingerprint: int) -> int:
+        fingerprint &= 0xFFFFFFFFFFFFFFFF
+        return fingerprint or 1
+
+    def _expired(self, stamp: float, now: float) -> bool:
+        return self.ttl is not None and now - stamp > self.ttl
+
+    @staticmethod
+    def _find_slot(keys: array, mask: int, fingerprint: int) -> int:
+        """返回指纹所在槽位，或探测链上的第一个空槽"""
+        i = fingerprint & mask
+        while True:
+            key = keys[i]
+            if key == fingerprint or key == FingerprintStore._EMPTY:
+                return i
+            i = (i + 1) & mask
+
+    def _old_stamp(self, fingerprint: int) -> Optional[float]:
+        """旧表中尚未淘汰的条目的写入时间"""
+        keys = self._old_keys
+        i = self._find_slot(keys, len(keys) - 1, fingerprint)
+        if keys[i] == fingerprint and self._old_stamps[i] > self._evict_before:
+            return self._old_stamps[i]
+        return None
+
+    def contains(self, fingerprint: int, now: Optional[float] = None) -> bool:
+        """查询指纹是否存在且未过期"""
+        fingerprint = self._normalize(fingerprint)
+        now = time.time() if now is None else now
+        self._migrate(now)
+        i = self._find_slot(self._keys, self._mask, fingerprint)
+        if self._keys[i] == fingerprint:
+            stamp = self._stamps[i]
+        elif self._old_keys is not None:
+            stamp = self._old_stamp(fingerprint)
+        else:
+            stamp = None
+        if stamp is not None and not self._expired(stamp, now):
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return self.contains(fingerprint)
+
+    def add(self, fingerprint: int, seen_at: Optional[float] = None):
+        """写入指纹（已存在则刷新写入时间）"""
+        fingerprint = self._normalize(fingerprint)
+        seen_at = time.time() if seen_at is None else seen_at
+        self._migrate(seen_at)
+        i = self._find_slot(self._keys, self._mask, fingerprint)
+        if self._keys[i] == self._EMPTY:
+            # 只看新表自身的负载：重建刚开始时旧表仍是满的，淘汰随迁移逐步发生
+            if self._count >= self._max_items:
+                self._start_rebuild(seen_at)
+                i = self._find_slot(self._keys, self._mask, fingerprint)
+            self._keys[i] = fingerprint
+            self._count += 1
+            self.inserts += 1
+        self._stamps[i] = seen_at
+
+    def _start_rebuild(self, now: float):
+        """分配新表并开始渐进迁移：未到上限时翻倍扩容，否则同容量重建并淘汰最旧的一部分"""
+        if self._old_keys is not None:
+            # 迁移正常情况下早已完成；只有淘汰得太少、新表又填满时才会走到这里
+            self._migrate(now, self._capacity)
+        if self._count < self._max_items:
+            return
+        if self._capacity < self._max_capacity:
+            capacity = self._capacity * 2
+            self._evict_before = float("-inf")
+        else:
+            capacity = self._capacity
+            self._evict_before = self._eviction_cutoff()
+        self._old_keys, self._old_stamps = self._keys, self._stamps
+        self._old_count = self._count
+        self._migrate_pos = 0
+        self._set_table(capacity)
+        self._count = 0
+        logger.debug(f"Fingerprint store rebuilding: {self._old_count} entries into {capacity} slots")
+
+    def _eviction_cutoff(self) -> float:
+        """抽样估计写入时间的 1/EVICT_FRACTION 分位点（负载已过 MAX_LOAD，随机探测很快命中）"""
+        keys, stamps, mask = self._keys, self._stamps, self._mask
+        samples = []
+        while len(samples) < self.EVICT_SAMPLES:
+            i = random.getrandbits(64) & mask
+            if keys[i] != self._EMPTY:
+                samples.append(stamps[i])
+        samples.sort()
+        # 取样本中实际存在的写入时间，按 "不晚于" 淘汰，保证每次重建至少回收一部分
+        return samples[len(samples) // self.EVICT_FRACTION]
+
+    def _migrate(self, now: float, steps: Optional[int] = None):
+        """把旧表的下 steps 个槽位迁入新表，丢弃过期和早于淘汰分位点的条目"""
+        old_keys = self._old_keys
+        if old_keys is None:
+            return
+        old_stamps = self._old_stamps
+        keys, stamps, mask = self._keys, self._stamps, self._mask
+        end = min(len(old_keys), self._migrate_pos + (steps or self.MIGRATE_STEP))
+        for j in range(self._migrate_pos, end):
+            key = old_keys[j]
+            if key == self._EMPTY:
+                continue
+            self._old_count -= 1
+            stamp = old_stamps[j]
+            if self._expired(stamp, now):
+                self.ttl_evictions += 1
+                continue
+            if stamp <= self._evict_before:
+                self.capacity_evictions += 1
+                continue
+            i = self._find_slot(keys, mask, key)
+            if keys[i] == self._EMPTY:
+                keys[i] = key
+                stamps[i] = stamp
+                self._count += 1
+            elif stamps[i] < stamp:
+                stamps[i] = stamp
+        self._migrate_pos = end
+        if end == len(old_keys):
+            self._old_keys = self._old_stamps = None
+            self._old_count = 0
+            logger.debug(f"Fingerprint store rebuilt: {self._count} live entries in {self._capacity} slots")
+
+    def copy(self) -> "FingerprintStore":
+        """数组拷贝（C 层 memcpy）得到的独立副本，供调用方在锁外遍历 items()"""
+        clone = FingerprintStore.__new__(FingerprintStore)
+        clone.__dict__.update(self.__dict__)
+        clone._keys, clone._stamps = self._keys[:], self._stamps[:]
+        if self._old_keys is not None:
+            clone._old_keys, clone._old_stamps = self._old_keys[:], self._old_stamps[:]
+        return clone
+
+    def items(self) -> Iterator[Tuple[int, float]]:
+        """遍历所有未过期的 (fingerprint, seen_at)；O(容量)，持锁时先 copy()"""
+        now = time.time()
+        keys, stamps = self._keys, self._stamps
+        for i in range(self._capacity):
+            if keys[i] != self._EMPTY and not self._expired(stamps[i], now):
+                yield keys[i], stamps[i]
+        old_keys, old_stamps = self._old_keys, self._old_stamps
+        if old_keys is None:
+            return
+        for j in range(self._migrate_pos, len(old_keys)):
+            key = old_keys[j]
+            if key == self._EMPTY or keys[self._find_slot(keys, self._mask, key)] == key:
+                continue
+            if old_stamps[j] > self._evict_before and not self._expired(old_stamps[j], now):
+                yield key, old_stamps[j]
+
+    def clear(self):
+        self._reset_tables()
+
+    def __len__(self) -> int:
+        return self._count + self._old_count
+
+    @property
+    def memory_bytes(self) -> int:
+        """当前占用的槽位内存（重建期间包含旧表）"""
+        old = len(self._old_keys) if self._old_keys is not None else 0
+        return (self._capacity + old) * self.SLOT_BYTES
+
+    def stats(self) -> Dict[str, float]:
+        """
+        统计信息
+
+        指纹只保留 64 位，无法逐个识别误判；estimated_false_positive_rate 是一个
+        新事件与任一已存指纹碰撞的概率估计 (count / 2^64)。
+        """
+        return {
+            "entries": len(self),
+            "capacity": self._max_items,
+            "max_capacity": int(self._max_capacity * self.MAX_LOAD),
+            "memory_bytes": self.memory_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserts": self.inserts,
+            "ttl_evictions": self.ttl_evictions,
+            "capacity_evictions": self.capacity_evictions,
+            "estimated_false_positive_rate": len(self) / 2 ** 64,
+        }
@@ -1,13 +1,40 @@
 import json
 from collections import defaultdict
-from threading import Lock
-from typing import Dict, Any, Optional, Set
-from datetime import datetime, timedelta
+from concurrent.futures import Future
+from threading import Condition, Event, Lock, Thread
+from typing import Callable, Dict, Any, Iterable, Optional, Set
+from datetime import datetime
 from pathlib import Path
 import hashlib
 import os
+import time
+from life_system.config.settings import PIPELINE_SEEN_MAX_BYTES, PIPELINE_SEEN_TTL, PIPELINE_STATE_FLUSH_INTERVAL
+from life_system.core.content_hasher import ContentHasher
+from life_system.core.fingerprint_store import FingerprintStore
+from life_system.core.metrics import metrics
+from life_system.core.path_filter import PathFilter
+from life_system.core.pipeline_state import PipelineStateStore, same_file_state
+from life_system.core.timer_wheel import TimerWheel
 from life_system.utils.logger import logger
 
+
+class _Shard:
+    """
+    一组 event_key 共享的锁与发布顺序
+
+    lock 保护该分片内的廉价判定（文件状态、防抖缓存、在途指纹）；
+    发布在锁外进行，但按判定时领取的票号依次执行，同一路径的事件顺序不变。
+    """
+    __slots__ = ("lock", "turn", "next_ticket", "serving", "inflight")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.turn = Condition(Lock())
+        self.next_ticket = 0
+        self.serving = 0
+        self.inflight: Set[int] = set()  # 已判定发布、尚未完成的事件指纹
+
+
 class IngestionPipeline:
     """
     事件摄入管道：系统的"不动点"
@@ -15,10 +42,19 @@ class IngestionPipeline:
     所有 Collector 都应该通过这个管道发布事件，而不是直接调用 EventBus。
     
     持久化去重机制：
-    为了防止重启后重新生成事件，Pipeline 现在在内存中维护了一个
-    (path -> (mtime, size)) 的状态映射。
-    注意：目前的持久化仅限于进程生命周期。如果需要重启后依然去重，
-    需要将 _file_state_cache 序列化到磁盘（MVP暂不实现，靠 Service 层的 Pending 检查兜底）。
+    为了防止重启后重新生成事件，Pipeline 在内存中维护了一个
+    (path -> (mtime, size)) 的状态映射，以及已发布事件的哈希集合。
+    传入 state_store 时，这两份状态会追加写入磁盘日志（见 PipelineStateStore），
+    并在第一次摄入事件时懒加载，重启后依然去重。
+
+    并发模型：
+    判定（过滤、物理状态、去重、防抖）在按路径/事件键分片的锁内完成；
+    发布（同步 SQLite 提交或写后队列入队）在任何锁之外进行，同一分片内按判定顺序依次发布。
+
+    防抖机制：
+    同一个 event_key 的第一个事件立即发布（前沿）；窗口内的后续事件只更新缓存中的
+    最新 payload，并把窗口顺延。窗口结束时由后台 ticker 线程发布最新的 payload（后沿），
+    保证最终状态一定会被发布。到期检查由时间轮 (TimerWheel) 完成，均摊 O(1)。
     """
     
     # 需要过滤的文件/目录模式
@@ -37,30 +73,94 @@ class IngestionPipeline:
         'node_modules', '.npm',
         # 其他
         '.env.local', '.env.*.local',
-        # 显式忽略数据库文件，防止死循环
-        'life.db', 'life.db-journal', '*.lock'
+        # 显式忽略 LifeOS 自己写入的文件（数据库、日志、状态、快照、归档），防止死循环
+        'life.db', 'life.db-journal', 'life.db-wal', 'life.db-shm', '*.lock', 'life_serve.wake', 'similarity_index.json',
+        'metrics.json', 'events-*.jsonl.zst', 'events-*.jsonl.gz',
+        'logs', 'pipeline_state.log*'
     }
     
-    def __init__(self, debounce_window: float = 1.0):
+    # 锁分片数量
+    SHARDS = 16
+
+    def __init__(
+        self,
+        debounce_window: float = 1.0,
+        state_store: Optional[PipelineStateStore] = None,
+        seen_max_bytes: int = PIPELINE_SEEN_MAX_BYTES,
+        seen_ttl: Optional[float] = PIPELINE_SEEN_TTL,
+        content_hasher: Optional[ContentHasher] = None
+    ):
         """
         初始化摄入管道
         
         Args:
             debounce_window: 防抖时间窗口（秒），默认1秒
+            state_store: 去重状态的持久化存储，None 表示仅在进程内去重
+            seen_max_bytes: 事件指纹索引的内存上限（字节）
+            seen_ttl: 事件指纹的存活时间（秒），None 表示只按容量淘汰
+            content_hasher: 文件内容指纹计算器；提供时物理状态变了但内容未变的文件事件被丢弃
         """
         self.debounce_window = debounce_window
-        self._event_cache: Dict[str, tuple] = {}  # key: event_key, value: (timestamp, event_data)
-        self._seen_hashes: Set[str] = set()  # 已处理的事件哈希（用于去重）
-        self._file_state_cache: Dict[str, tuple] = {} # key: path, value: (mtime, size)
-        self._lock = Lock()  # 线程安全
+        # key: event_key, value: (最近一次事件的 monotonic 时间, 最新 payload, 待发布的后沿事件或 None)
+        # 待发布的后沿事件为 (event_type, source, event_hash, publish_func)
+        self._event_cache: Dict[str, tuple] = {}
+        # 防抖窗口的到期调度；ticker 线程在第一次需要后沿发布时才启动
+        self._timers = TimerWheel(tick=min(0.05, debounce_window / 4) or 0.05, now=time.monotonic())
+        self._ticker: Optional[Thread] = None
+        self._ticker_stop = Event()
+        # 时间轮从空变为非空时唤醒 ticker；空闲时 ticker 停在这里，不做任何周期性唤醒
+        self._ticker_wake = Event()
+        # 已处理事件的 64 位指纹（用于去重），有界且带 TTL
+        self._seen_hashes = FingerprintStore(max_bytes=seen_max_bytes, ttl=seen_ttl)
+        self._file_state_cache: Dict[str, tuple] = {} # key: path, value: (mtime, size, inode[, digest])
+        self._content_hasher = content_hasher
+        self._shards = [_Shard() for _ in range(self.SHARDS)]
+        self._seen_lock = Lock()   # FingerprintStore 本身不是线程安全的
+        self._store_lock = Lock()  # 持久化日志的追加与压缩（只在状态写入线程和关闭/重置时持有）
+        self._timer_lock = Lock()  # 时间轮
+        self._lock = Lock()        # 懒加载与 ticker 启动
+        self._path_filter = PathFilter(self.FILTER_PATTERNS)
+        self._state_store = state_store
+        self._state_loaded = state_store is None
+        # 摄入线程只把状态记录放进 state_store 的内存缓冲；追加日志与压缩在写入线程中进行，不占用分片锁
+        self._state_writer: Optional[Thread] = None
+        self._state_dirty = Event()
+        self._state_stop = Event()
+        # 已完成全量基线扫描的监控根目录（持久化时随状态日志载入）
+        self._baseline_roots: Set[str] = set()
+
+    def _ensure_state_loaded(self):
+        """懒加载持久化的去重状态（加载完成前其他摄入线程在此等待）"""
+        if self._state_loaded:
+            return
+        with self._lock:
+            if self._state_loaded:
+                return
+            try:
+                file_states, hashes = self._state_store.load()
+            except Exception as e:
+                logger.error(f"Failed to load pipeline state: {e}")
+                self._state_loaded = True
+                return
+            self._baseline_roots |= self._state_store.baselines
+            # 进程内已产生的状态比磁盘上的更新
+            file_states.update(self._file_state_cache)
+            self._file_state_cache = file_states
+            # 按时间顺序写入，容量不足时淘汰的是最旧的指纹
+            ttl = self._seen_hashes.ttl
+            now = time.time()
+            for fingerprint, seen_at in sorted(hashes.items(), key=lambda item: item[1]):
+                if ttl is None or now - seen_at <= ttl:
+                    self._seen_hashes.add(fingerprint, seen_at)
+            self._state_loaded = True
         
     def _get_file_state(self, path_str: str) -> Optional[tuple]:
-        """获取文件的物理状态 (mtime, size)"""
+        """获取文件的物理状态 (mtime, size, inode)"""
         try:
             p = Path(path_str)
             if p.exists() and p.is_file():
                 stat = p.stat()
-                return (stat.st_mtime, stat.st_size)
+                return (stat.st_mtime, stat.st_size, stat.st_ino)
         except Exception:
             pass
         return None
@@ -81,9 +181,9 @@ class IngestionPipeline:
             key_fields = payload.get('title') or payload.get('task_id') or payload.get('id', '')
             return f"{event_type}:{source}:{key_fields}"
     
-    def _generate_event_hash(self, event_type: str, source: str, payload: Dict[str, Any]) -> str:
+    def _generate_event_hash(self, event_type: str, source: str, payload: Dict[str, Any]) -> int:
         """
-        生成事件的哈希值，用于去重
+        生成事件的 64 位指纹，用于去重
         
         完全相同的 payload 应该被去重。
         注意：排除 timestamp 字段，确保同一事件在不同时间被视为重复（如果内容没变）。
@@ -98,7 +198,7 @@ class IngestionPipeline:
             'source': source,
             'payload': clean_payload
         }, sort_keys=True)
-        return hashlib.md5(content.encode()).hexdigest()
+        return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "little")
     
     def _should_filter(self, event_type: str, payload: Dict[str, Any]) -> bool:
         """
@@ -107,36 +207,12 @@ class IngestionPipeline:
         Returns:
             True 表示应该过滤（丢弃），False 表示应该保留
         """
-        # 文件事件需要检查路径
+        # 文件事件需要检查路径（模式已编译为集合查询，见 PathFilter）
         if event_type.startswith('file.'):
             path_str = payload.get('path', '')
             if not path_str:
                 return True  # 没有路径，过滤掉
-            
-            path = Path(path_str)
-            
-            # 检查文件名和目录名
-            for pattern in self.FILTER_PATTERNS:
-                if pattern.startswith('*'):
-                    # 通配符匹配
-                    if path.name.endswith(pattern[1:]):
-                        logger.debug(f"Filter matched wildcard: {pattern} for {path.name}")
-                        return True
-                elif pattern in path.parts:
-                    # 目录名匹配
-                    logger.debug(f"Filter matched dir: {pattern} in {path}")
-                    return True
-                elif path.name == pattern:
-                    # 文件名完全匹配
-                    logger.debug(f"Filter matched exact: {pattern} for {path.name}")
-                    return True
-            
-            # 检查隐藏文件（Unix 风格）
-            if path.name.startswith('.'):
-                # 但允许 .env（配置）和 .gitignore 等
-                if path.name not in ['.env', '.gitignore', '.dockerignore']:
-                    logger.debug(f"Filter hidden file: {path.name}")
-                    return True
+            return self._path_filter.matches(path_str)
         
         return False
     
@@ -194,92 +270,403 @@ class IngestionPipeline:
             event_type: 事件类型，如 "task.created", "file.created"
             source: 事件来源，如 "cli", "file_watcher", "scheduler"
             payload: 事件数据
-            publish_func: 发布函数，应该调用 EventBus._publish_direct 避免循环
+            publish_func: 发布函数，应该是 EventBus 的底层发布函数（_publish_direct
+                或写后队列的 submit），避免循环
         
         Returns:
-            事件ID（如果成功发布），None（如果被过滤或去重）
+            事件ID 或 Future（如果成功发布/入队），None（如果被过滤或去重）
+
+        每次调用的结果计入 pipeline.ingest{outcome, source, type} 计数器（见 core/metrics.py）
         """
-        with self._lock:
-            # 1. 过滤：检查是否应该丢弃
-            if self._should_filter(event_type, payload):
-                # logger.debug(f"Event filtered: {event_type} - {payload}")
-                return None
-            
-            # 2. 标准化：统一格式
-            normalized_payload = self._normalize_payload(event_type, source, payload)
-            
+        started = time.perf_counter()
+        outcome, result = self._ingest(event_type, source, payload, publish_func)
+        metrics.inc("pipeline.ingest", outcome=outcome, source=source, type=event_type)
+        metrics.observe("pipeline.ingest", time.perf_counter() - started)
+        return result
+
+    def _ingest(self, event_type: str, source: str, payload: Dict[str, Any], publish_func) -> tuple:
+        """
+        ingest 的实现
+
+        Returns:
+            (outcome, 事件ID/Future/None)，outcome 为 filtered / unchanged / content_unchanged /
+            missing / duplicate / debounced / published / failed 之一
+        """
+        self._ensure_state_loaded()
+
+        # 1. 过滤：检查是否应该丢弃（纯计算，无需加锁）
+        if self._should_filter(event_type, payload):
+            # logger.debug(f"Event filtered: {event_type} - {payload}")
+            return "filtered", None
+
+        # 2. 标准化：统一格式
+        normalized_payload = self._normalize_payload(event_type, source, payload)
+        event_key = self._generate_event_key(event_type, source, normalized_payload)
+        shard = self._shard_for(event_key)
+
+        with shard.lock:
             # === 3. 物理状态检查 (Physical State Check) ===
-            # 这是为了防止 Watchdog 重复报告从未变过的文件
+            # 这是为了防止 Watchdog 重复报告从未变过的文件；在分片锁内 stat，保证同一路径的状态按顺序更新
             if event_type.startswith('file.'):
                 path = normalized_payload.get('path')
                 if path:
                     current_state = self._get_file_state(path)
                     if current_state:
                         last_state = self._file_state_cache.get(path)
-                        if last_state == current_state:
+                        if same_file_state(last_state, current_state):
                             # 物理状态没变，视为重复/噪音
                             logger.debug(f"File state unchanged (duplicate event): {path}")
-                            return None
-                        # 更新状态缓存
+                            return "unchanged", None
+                        if self._content_hasher is not None:
+                            digest = self._content_hasher.digest(path, current_state)
+                            current_state = current_state + (digest,)
+                            if digest is not None and last_state is not None and len(last_state) > 3 \
+                                    and last_state[3] == digest:
+                                # 物理状态变了但内容没变（touch、原样重写）：记下新状态，不生成事件
+                                self._file_state_cache[path] = current_state
+                                if self._state_store:
+                                    self._state_store.record_file_state(path, current_state)
+                                    self._state_changed()
+                                logger.debug(f"File content unchanged (touch/rewrite): {path}")
+                                return "content_unchanged", None
+                        # 更新状态缓存；物理状态同时写入 payload，使同一文件的每次变化指纹都不同
                         self._file_state_cache[path] = current_state
+                        normalized_payload['mtime'], normalized_payload['size'] = current_state[:2]
+                        if self._state_store:
+                            self._state_store.record_file_state(path, current_state)
+                            self._state_changed()
                     else:
                         # 文件可能已被删除
                         if 'deleted' not in event_type:
-                            return None
-            
-            # 3. 去重：检查是否已经处理过完全相同的事件
+                            return "missing", None
+
+            # 3. 去重：检查是否已经处理过（或正在发布）完全相同的事件
             event_hash = self._generate_event_hash(event_type, source, normalized_payload)
-            if event_hash in self._seen_hashes:
+            if event_hash in shard.inflight or self._is_seen(event_hash):
                 logger.debug(f"Event duplicated (hash match): {event_type}")
-                return None  # 重复事件，丢弃
-            
-            # 4. 防抖：检查时间窗口内的重复事件
-            event_key = self._generate_event_key(event_type, source, normalized_payload)
-            now = datetime.now()
-            
-            if event_key in self._event_cache:
-                last_time, last_payload = self._event_cache[event_key]
-                time_diff = (now - last_time).total_seconds()
-                
+                return "duplicate", None  # 重复事件，丢弃
+
+            # 4. 防抖：窗口内的后续事件只更新缓存，等窗口结束后由 ticker 发布最新的一个
+            now = time.monotonic()
+            cached = self._event_cache.get(event_key)
+            if cached is not None:
+                time_diff = now - cached[0]
                 if time_diff < self.debounce_window:
-                    # 在防抖窗口内，更新缓存但不发布
-                    self._event_cache[event_key] = (now, normalized_payload)
+                    pending = (event_type, source, event_hash, publish_func)
+                    self._event_cache[event_key] = (now, normalized_payload, pending)
+                    self._schedule(event_key, now + self.debounce_window)
+                    self._ensure_ticker()
                     logger.debug(f"Event debounced ({time_diff:.2f}s < {self.debounce_window}s): {event_type}")
-                    return None  # 等待防抖窗口结束
-            
-            # 5. 通过所有检查，发布事件
+                    return "debounced", None  # 等待防抖窗口结束
+                # 窗口已过但 ticker 还没来得及处理：新事件本身就是最新状态，直接取代待发布的旧事件
+
+            self._event_cache[event_key] = (now, normalized_payload, None)
+            self._schedule(event_key, now + self.debounce_window)
+            ticket = self._reserve(shard, event_hash)
+
+        # 5. 通过所有检查，在锁外按顺序发布事件（前沿）
+        event_id = self._publish(shard, ticket, event_type, source, normalized_payload, event_hash, publish_func)
+        return ("published" if event_id is not None else "failed"), event_id
+
+    def _shard_for(self, event_key: str) -> _Shard:
+        """文件事件按路径分片（同一路径的 created/modified/deleted 保持顺序），其他事件按事件键分片"""
+        if event_key.startswith('file.'):
+            event_key = event_key.split(':', 1)[1]
+        return self._shards[hash(event_key) % len(self._shards)]
+
+    def _is_seen(self, event_hash: int) -> bool:
+        with self._seen_lock:
+            return event_hash in self._seen_hashes
+
+    def _schedule(self, event_key: str, when: float):
+        with self._timer_lock:
+            was_empty = not len(self._timers)
+            self._timers.schedule(event_key, when)
+        if was_empty:
+            self._ticker_wake.set()
+
+    @staticmethod
+    def _reserve(shard: _Shard, event_hash: int) -> int:
+        """登记在途指纹并领取发布票号（调用方需持有 shard.lock）"""
+        shard.inflight.add(event_hash)
+        ticket = shard.next_ticket
+        shard.next_ticket += 1
+        return ticket
+
+    def _publish(
+        self,
+        shard: _Shard,
+        ticket: int,
+        event_type: str,
+        source: str,
+        payload: Dict[str, Any],
+        event_hash: int,
+        publish_func: Callable
+    ):
+        """
+        轮到 ticket 时调用发布函数（不持有任何锁），成功后记录指纹
+
+        写后模式下发布函数返回 Future：组提交成功后才记录指纹，失败时只释放在途指纹，
+        重试同一变化时不会被当作重复事件丢弃。
+        """
+        with shard.turn:
+            while shard.serving != ticket:
+                shard.turn.wait()
+        event_id = None
+        started = time.perf_counter()
+        try:
+            # 调用发布函数（应该是 _publish_direct 或写后队列的 submit，避免循环）
+            event_id = publish_func(event_type, source, payload)
+        except Exception as e:
+            # 发布失败，记录但不阻塞
+            logger.error(f"Failed to publish event: {e}")
+        finally:
+            metrics.observe("pipeline.publish", time.perf_counter() - started)
+            with shard.turn:
+                shard.serving += 1
+                shard.turn.notify_all()
+
+        if isinstance(event_id, Future):
+            # 提交完成前指纹留在在途集合中，继续挡住相同的事件
+            event_id.add_done_callback(
+                lambda future: self._settle(
+                    shard, event_type, payload, event_hash,
+                    not future.cancelled() and future.exception() is None
+                )
+            )
+        else:
+            self._settle(shard, event_type, payload, event_hash, event_id is not None)
+        if event_id is None:
+            return None
+
+        event_ref = event_id if isinstance(event_id, int) else "queued"
+        logger.info(f"Event ingested: {event_type} from {source} (ID: {event_ref})")
+        return event_id
+
+    def _settle(self, shard: _Shard, event_type: str, payload: Dict[str, Any], event_hash: int, ok: bool):
+        """
+        发布结束后移出在途指纹：成功时先记入已处理指纹（两者之间不会出现"都不在"的空窗），
+        失败时撤销该事件记下的文件状态，之后同一变化的事件仍能通过物理状态检查
+        """
+        if ok:
+            self._record_seen(event_hash)
+        with shard.lock:
+            shard.inflight.discard(event_hash)
+            if ok or not event_type.startswith('file.'):
+                return
+            path = payload.get('path')
+            state = self._file_state_cache.get(path) if path else None
+            if state is not None and state[:2] == (payload.get('mtime'), payload.get('size')):
+                del self._file_state_cache[path]
+                if self._state_store:
+                    self._state_store.record_file_removed(path)
+                    self._state_changed()
+
+    def _record_seen(self, event_hash: int):
+        seen_at = time.time()
+        with self._seen_lock:
+            self._seen_hashes.add(event_hash, seen_at)
+        if self._state_store:
+            self._state_store.record_hash(event_hash, seen_at)
+            self._state_changed()
+
+    def _state_changed(self):
+        """有新的状态记录进入缓冲：唤醒写入线程（已关闭时就地写入，如关闭后才完成的组提交回调）"""
+        if self._state_stop.is_set():
+            self._flush_state()
+            return
+        if self._state_writer is None:
+            with self._lock:
+                if self._state_writer is None and not self._state_stop.is_set():
+                    self._state_writer = Thread(target=self._state_loop, name="PipelineStateWriter", daemon=True)
+                    self._state_writer.start()
+        self._state_dirty.set()
+
+    def _state_loop(self):
+        """有记录时写入一次，然后至少间隔 PIPELINE_STATE_FLUSH_INTERVAL 秒，把这段时间的记录攒成一批"""
+        while not self._state_stop.is_set():
+            self._state_dirty.wait()
+            self._state_dirty.clear()
             try:
-                # 调用发布函数（应该是 _publish_direct，避免循环）
-                event_id = publish_func(event_type, source, normalized_payload)
-                
-                # 记录到缓存和已处理集合
-                self._event_cache[event_key] = (now, normalized_payload)
-                self._seen_hashes.add(event_hash)
-                
-                # 清理过期的缓存（超过防抖窗口2倍的时间）
-                self._cleanup_cache(now)
-                
-                logger.info(f"Event ingested: {event_type} from {source} (ID: {event_id})")
-                return event_id
+                self._flush_state()
             except Exception as e:
-                # 发布失败，记录但不阻塞
-                logger.error(f"Failed to publish event: {e}")
-                return None
-    
-    def _cleanup_cache(self, now: datetime):
-        """清理过期的缓存项"""
-        expire_time = now - timedelta(seconds=self.debounce_window * 2)
-        expired_keys = [
-            key for key, (timestamp, _) in self._event_cache.items()
-            if timestamp < expire_time
-        ]
-        for key in expired_keys:
-            del self._event_cache[key]
-    
-    def reset(self):
-        """重置管道状态（用于测试或重启）"""
+                logger.error(f"Pipeline state writer failed: {e}")
+            self._state_stop.wait(PIPELINE_STATE_FLUSH_INTERVAL)
+
+    def _flush_state(self):
+        """把缓冲的状态记录追加到日志，日志膨胀时压缩（不持有分片锁，摄入线程不会被阻塞）"""
+        with self._store_lock:
+            if not self._state_store:
+                return
+            self._state_store.flush()
+            if self._state_store.needs_compaction(len(self._file_state_cache) + len(self._seen_hashes)):
+                # dict 拷贝在 GIL 下是原子的；指纹表在 _seen_lock 下只做数组拷贝，遍历在锁外进行
+                file_states = dict(self._file_state_cache)
+                with self._seen_lock:
+                    hashes = self._seen_hashes.copy()
+                self._state_store.compact(file_states.items(), hashes.items())
+
+    def _ensure_ticker(self):
+        """启动后沿发布的 ticker 线程"""
+        if self._ticker is not None:
+            return
         with self._lock:
-            self._event_cache.clear()
-            self._seen_hashes.clear()
-            self._file_state_cache.clear()
-            logger.info("Pipeline reset")
+            if self._ticker is None and not self._ticker_stop.is_set():
+                self._ticker = Thread(target=self._tick_loop, name="DebounceTicker", daemon=True)
+                self._ticker.start()
+
+    def _tick_loop(self):
+        """时间轮为空时一直等待唤醒，否则睡到最早的到期时刻再处理"""
+        while not self._ticker_stop.is_set():
+            # 先清除唤醒标志再读取到期时刻，读取之后的 schedule 会重新置位，不会丢失唤醒
+            self._ticker_wake.clear()
+            with self._timer_lock:
+                deadline = self._timers.next_deadline()
+            if deadline is None:
+                self._ticker_wake.wait()
+                continue
+            # 多等 1 ms，避免浮点误差让 advance 在到期 tick 之前被调用而空转
+            delay = deadline - time.monotonic() + 1e-3
+            if delay > 0:
+                self._ticker_wake.wait(delay)
+                continue
+            try:
+                self.flush_expired()
+            except Exception as e:
+                logger.error(f"Debounce ticker failed: {e}")
+
+    def flush_expired(self, now: Optional[float] = None) -> int:
+        """
+        处理防抖窗口已结束的 key：有待发布的后沿事件则发布，否则丢弃缓存项
+
+        Returns:
+            发布的后沿事件数量
+        """
+        now = time.monotonic() if now is None else now
+        with self._timer_lock:
+            expired = self._timers.advance(now)
+        return sum(1 for event_key in expired if self._emit_trailing(event_key, now))
+
+    def flush(self) -> int:
+        """立即发布所有待发布的后沿事件（关闭前调用），返回发布数量"""
+        with self._timer_lock:
+            self._timers.clear()
+        emitted = sum(1 for event_key in list(self._event_cache) if self._emit_trailing(event_key, None))
+        self._event_cache.clear()
+        return emitted
+
+    def _emit_trailing(self, event_key: str, now: Optional[float]) -> bool:
+        """
+        发布 event_key 的后沿事件；now 为 None 表示不论窗口是否结束都立即发布
+
+        发布后重新开启一个窗口，保证同一个 key 每个窗口最多发布一次。
+        """
+        shard = self._shard_for(event_key)
+        with shard.lock:
+            cached = self._event_cache.get(event_key)
+            if cached is None:
+                return False
+            last_time, payload, pending = cached
+            if now is not None and last_time + self.debounce_window > now + 1e-6:
+                return False  # 弹出后又来了新事件，已重新调度
+            if pending is None:
+                del self._event_cache[event_key]
+                return False
+            event_type, source, event_hash, publish_func = pending
+            if event_hash in shard.inflight or self._is_seen(event_hash):
+                del self._event_cache[event_key]
+                return False
+            if now is None:
+                del self._event_cache[event_key]
+            else:
+                self._event_cache[event_key] = (now, payload, None)
+                self._schedule(event_key, now + self.debounce_window)
+            ticket = self._reserve(shard, event_hash)
+        published = self._publish(shard, ticket, event_type, source, payload, event_hash, publish_func) is not None
+        metrics.inc("pipeline.trailing", outcome="published" if published else "failed", source=source, type=event_type)
+        return published
+
+    def file_state_snapshot(self) -> Dict[str, tuple]:
+        """已知文件物理状态的快照 path -> (mtime, size, inode)（必要时先载入持久化状态）"""
+        self._ensure_state_loaded()
+        return dict(self._file_state_cache)
+
+    def record_file_states(self, states: Dict[str, tuple]):
+        """直接记录一批文件状态而不发布事件（首次扫描建立基线时使用）"""
+        self._ensure_state_loaded()
+        for path, state in states.items():
+            shard = self._shard_for(f"file.:{path}")
+            with shard.lock:
+                self._file_state_cache[path] = state
+                if self._state_store:
+                    self._state_store.record_file_state(path, state)
+        if self._state_store and states:
+            self._state_changed()
+
+    def has_baseline(self, root: str) -> bool:
+        """root 下是否已完成过一次全量基线扫描（必要时先载入持久化状态）"""
+        self._ensure_state_loaded()
+        return root in self._baseline_roots
+
+    def record_baseline(self, root: str):
+        """标记 root 的全量基线已完成，此后对账扫描把快照中没有的文件视为新建"""
+        self._ensure_state_loaded()
+        self._baseline_roots.add(root)
+        if self._state_store:
+            self._state_store.record_baseline(root)
+            self._state_changed()
+
+    def forget_file_states(self, paths: Iterable[str]) -> int:
+        """从状态缓存（及持久化日志）中移除已不存在的文件，返回移除数量"""
+        removed = 0
+        for path in paths:
+            shard = self._shard_for(f"file.:{path}")
+            with shard.lock:
+                if self._file_state_cache.pop(path, None) is not None:
+                    removed += 1
+                    if self._state_store:
+                        self._state_store.record_file_removed(path)
+        if self._state_store and removed:
+            self._state_changed()
+        return removed
+
+    def reset(self):
+        """重置管道状态（用于测试或重启），同时清空持久化状态"""
+        for shard in self._shards:
+            shard.lock.acquire()
+        try:
+            with self._timer_lock, self._store_lock, self._seen_lock:
+                self._event_cache.clear()
+                self._timers.clear()
+                self._seen_hashes.clear()
+                self._file_state_cache.clear()
+                self._baseline_roots.clear()
+                if self._state_store:
+                    self._state_store.clear()
+        finally:
+            for shard in self._shards:
+                shard.lock.release()
+        logger.info("Pipeline reset")
+
+    def stats(self) -> Dict[str, Any]:
+        """去重索引的统计信息（条目数、内存、淘汰次数、误判率估计等）"""
+        with self._seen_lock:
+            return {"seen_hashes": self._seen_hashes.stats()}
+
+    def close(self):
+        """发布剩余的后沿事件，停止 ticker 与状态写入线程，写入缓冲中的状态记录并关闭持久化存储"""
+        self._ticker_stop.set()
+        self._ticker_wake.set()
+        if self._ticker is not None:
+            self._ticker.join()
+            self._ticker = None
+        self.flush()
+        self._state_stop.set()
+        self._state_dirty.set()
+        if self._state_writer is not None:
+            self._state_writer.join()
+            self._state_writer = None
+        self._flush_state()
+        with self._store_lock:
+            if self._state_store:
+                self._state_store.close()
@@ -0,0 +1,139 @@
+"""
+进程内指标注册表 (Metrics Registry)
+
+- 计数器：按 (名称, 标签) 累加，如 pipeline.ingest{outcome=duplicate, source=file_watcher, type=file.modified}
+- 直方图：固定的对数分桶（10 µs 起每桶翻倍），记录次数、总和、最大值，分位数按桶上界估算
+
+热路径上每次记录只是一次加锁的字典更新和一次二分查找。
+`life serve` 定期把 snapshot() 写入 METRICS_SNAPSHOT_PATH，`life stats` 读取并展示。
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# 直方图桶上界（秒）：10 µs, 20 µs, ... 约 168 s，超出的落入最后一个溢出桶
+_BUCKET_BOUNDS: List[float] = [1e-5 * 2 ** i for i in range(25)]
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram:
+    """固定分桶的耗时直方图（非线程安全，由 MetricsRegistry 加锁）"""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """第 q 分位（0~1）所在桶的上界，不超过实际最大值"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= rank and n:
+                return min(_BUCKET_BOUNDS[i], self.max) if i < len(_BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry:
+    """线程安全的计数器与直方图集合"""
+
+    def __init__(self):
+        self._counters: Dict[_Key, int] = {}
+        self._histograms: Dict[_Key, Histogram] = {}
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+
+    def inc(self, name: str, n: int = 1, **labels):
+        """计数器 name{labels} 加 n"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    def observe(self, name: str, seconds: float, **labels):
+        """向直方图 name{labels} 记录一次耗时（秒）"""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前所有指标的 JSON 友好快照"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.summary()}
+                for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0])
+            ]
+        return {
+            "taken_at": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "uptime": time.time() - self._started_at,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def write_snapshot(self, path: Path):
+        """写入临时文件后原子替换，读取方不会看到写了一半的快照"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started_at = time.time()
+
+
+def load_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """读取 write_snapshot 写入的快照，不存在时返回 None"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 进程内单例：同一进程中的 Pipeline、Service 共享
+metrics = MetricsRegistry()
@@ -0,0 +1,146 @@
+"""
+轻量级数据库迁移 (Schema Migrations)
+
+`Base.metadata.create_all` 只能创建缺失的表，无法给已有数据库补索引。
+这里维护一个按版本号递增的迁移列表，已应用的版本号记录在 SQLite 的
+`PRAGMA user_version` 中；每个迁移在独立事务中执行，失败时整体回滚。
+pysqlite 的旧式事务控制只在 DML 之前隐式 BEGIN，DDL 不在事务中，所以这里显式发出
+BEGIN IMMEDIATE，迁移的 DDL 与 user_version 的更新一起提交或回滚。
+
+新增迁移：在 MIGRATIONS 末尾追加 (version, description, statements)，
+version 必须严格递增，语句应尽量幂等（IF NOT EXISTS）。
+需要先探测 SQLite 能力的迁移可以用接收 Connection 的函数代替 SQL 字符串。
+"""
+from typing import Callable, List, Optional, Tuple, Union
+from sqlalchemy.engine import Connection, Engine
+from life_system.utils.logger import logger
+
+Statement = Union[str, Callable[[Connection], None]]
+
+
+def fts5_trigram_available(conn: Connection) -> bool:
+    """当前 SQLite 是否支持 FTS5 及 trigram 分词器（3.34+）"""
+    try:
+        conn.exec_driver_sql("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        conn.exec_driver_sql("DROP TABLE temp._fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def _create_tasks_fts(conn: Connection):
+    """
+    tasks_fts：以 tasks 为外部内容表的 FTS5 索引，trigram 分词，支持中文与任意子串
+
+    三个触发器让索引随 tasks 的增删改同步；'rebuild' 一次性回填已有任务。
+    SQLite 不支持时跳过，TaskService.search_tasks 退化为 LIKE 扫描。
+    """
+    if not fts5_trigram_available(conn):
+        logger.warning("SQLite lacks FTS5 trigram support, task search falls back to LIKE")
+        return
+    for statement in (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+        "title, content='tasks', content_rowid='id', tokenize='trigram')",
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO tasks_fts(rowid, title) VALUES (new.id, new.title);
+        END
+        """,
+        "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+    ):
+        conn.exec_driver_sql(statement)
+
+
+MIGRATIONS: List[Tuple[int, str, List[Statement]]] = [
+    (1, "composite and partial indexes for hot queries", [
+        # get_unprocessed: WHERE processed = 0 AND id > ? ORDER BY id
+        "CREATE INDEX IF NOT EXISTS ix_events_unprocessed ON events (id) WHERE processed = 0",
+        # process_events 去重: WHERE status = ? AND title IN (...)
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_title ON tasks (status, title)",
+        # list_tasks / 提醒 / 自动归档: WHERE status = ? [AND created_at < ?] ORDER BY created_at
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_created_at ON tasks (status, created_at)",
+        # get_task_history: WHERE task_id = ? ORDER BY created_at
+        "CREATE INDEX IF NOT EXISTS ix_task_transitions_task_created ON task_transitions (task_id, created_at)",
+    ]),
+    (2, "index tasks.updated_at for incremental similarity index sync", [
+        # TaskService 同步相似度索引: WHERE id > ? OR updated_at > ?
+        "CREATE INDEX IF NOT EXISTS ix_tasks_updated_at ON tasks (updated_at)",
+    ]),
+    (3, "analysis_cache side table for persisted TaskAnalyzer results", [
+        """
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            kind TEXT NOT NULL,
+            version TEXT NOT NULL,
+            title TEXT NOT NULL,
+            result TEXT NOT NULL,
+            PRIMARY KEY (kind, version, title)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    (4, "index events.created_at for the retention cutoff", [
+        # RetentionService: SELECT MAX(id) FROM events WHERE created_at < ?
+        "CREATE INDEX IF NOT EXISTS ix_events_created_at ON events (created_at)",
+    ]),
+    (5, "tasks_fts full-text index (FTS5 trigram) with sync triggers and backfill", [
+        # TaskService.search_tasks: tasks_fts MATCH ? ORDER BY rank
+        _create_tasks_fts,
+    ]),
+]
+
+
+def get_schema_version(conn: Connection) -> int:
+    """读取当前数据库已应用的迁移版本"""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+
+
+def run_migrations(engine: Optional[Engine] = None) -> int:
+    """
+    应用所有未执行的迁移
+
+    Returns:
+        本次应用的迁移数量
+    """
+    if engine is None:
+        from life_system.core.db import engine
+
+    with engine.connect() as conn:
+        current = get_schema_version(conn)
+
+    applied = 0
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        with engine.connect() as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.exec_driver_sql(statement)
+                # PRAGMA 不支持绑定参数；version 来自上面的常量列表
+                conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+        logger.info(f"Applied migration {version}: {description}")
+        applied += 1
+    return applied
+
+
+def explain_query_plan(conn: Connection, statement: str, parameters=()) -> List[str]:
+    """返回 EXPLAIN QUERY PLAN 的 detail 列，用于确认查询命中了哪个索引"""
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row[-1] for row in rows]
@@ -2,6 +2,9 @@ from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey
 from life_system.core.db import Base
 
+# 注意：复合索引/部分索引由 core/migrations.py 统一维护，
+# 以便已有数据库也能通过迁移补齐，这里只声明单列索引。
+
 class Event(Base):
     __tablename__ = "events"
 
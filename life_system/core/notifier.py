@@ -0,0 +1,95 @@
+"""
+事件到达通知 (Event Notifier)
+
+让事件处理器在有新事件时立即醒来，而不是固定间隔轮询：
+
+- 进程内：EventBus 提交事件后调用 notifier.notify()，唤醒等待中的处理循环
+- 跨进程：life serve 在 127.0.0.1 上绑定一个 UDP 端口，并把端口号写入
+  life_serve.lock 旁边的 life_serve.wake；其他进程（life add 等）提交事件后
+  向该端口发送一个字节。UDP 无连接，服务未运行时信号只会被丢弃，不会阻塞发布方。
+"""
+import socket
+import threading
+from pathlib import Path
+from typing import Optional
+from life_system.config.settings import DB_PATH
+from life_system.utils.logger import logger
+
+# 与单实例锁放在一起，确保所有进程看到的是同一个文件
+WAKE_FILE_PATH = Path(DB_PATH).parent / "life_serve.wake"
+
+
+class EventNotifier:
+    """进程内的事件到达信号，可选地监听来自其他进程的唤醒"""
+
+    def __init__(self, wake_file: Path = WAKE_FILE_PATH):
+        self.wake_file = wake_file
+        self._event = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def listening(self) -> bool:
+        """当前进程是否在监听跨进程唤醒（即是否为 serve 进程）"""
+        return self._sock is not None
+
+    def notify(self):
+        """标记有新事件到达"""
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待新事件到达；返回 True 表示被唤醒，False 表示超时"""
+        woke = self._event.wait(timeout)
+        self._event.clear()
+        return woke
+
+    def start_listener(self):
+        """绑定本地 UDP 端口并写入端口文件，开始接收其他进程的唤醒信号"""
+        if self._sock:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        self.wake_file.write_text(str(port), encoding="utf-8")
+        self._sock = sock
+        self._thread = threading.Thread(target=self._listen, args=(sock,), name="EventNotifier", daemon=True)
+        self._thread.start()
+        logger.info(f"Event wake listener on 127.0.0.1:{port} ({self.wake_file})")
+
+    def stop_listener(self):
+        """停止监听并删除端口文件"""
+        sock, self._sock = self._sock, None
+        if sock:
+            # close() 不一定能打断另一个线程里阻塞的 recv()，先给自己发一个信号
+            try:
+                sock.sendto(b"\x00", sock.getsockname())
+            except OSError:
+                pass
+            sock.close()
+        try:
+            self.wake_file.unlink()
+        except FileNotFoundError:
+            pass
+
+    def signal_serve(self):
+        """向 serve 进程发送唤醒信号（serve 未运行时静默忽略）"""
+        try:
+            port = int(self.wake_file.read_text(encoding="utf-8").strip())
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.sendto(b"\x01", ("127.0.0.1", port))
+        except (OSError, ValueError):
+            pass
+
+    def _listen(self, sock: socket.socket):
+        while True:
+            try:
+                sock.recv(64)
+            except OSError:
+                break  # socket 已关闭
+            if self._sock is not sock:
+                break  # 已调用 stop_listener
+            self.notify()
+
+
+# 进程内单例：同一进程中的所有 EventBus 共享
+notifier = EventNotifier()
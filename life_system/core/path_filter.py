@@ -0,0 +1,97 @@
+"""
+路径过滤器 (Path Filter)
+
+把 IngestionPipeline.FILTER_PATTERNS 一次性编译成集合查询：
+- `*.ext`   -> 扩展名集合（O(1) 查询）
+- `*xxx`    -> 其他后缀，交给 str.endswith(tuple)
+- `xxx*`    -> 文件名前缀，交给 str.startswith(tuple)
+- 中间带 `*` 的模式 -> 合并成一个正则，只匹配文件名
+- 其他模式  -> 路径段集合，匹配任意一级目录名或文件名
+
+目录部分的判定结果按目录前缀缓存，`node_modules/...` 下的大量事件只需一次字典查询。
+"""
+import fnmatch
+import os
+import re
+from pathlib import PurePath
+from typing import Dict, Iterable
+
+
+class PathFilter:
+    """由过滤模式编译而成的路径匹配器"""
+
+    # 允许通过的隐藏文件（配置类文件）
+    ALLOWED_HIDDEN = frozenset({'.env', '.gitignore', '.dockerignore'})
+
+    def __init__(self, patterns: Iterable[str], dir_cache_size: int = 4096):
+        extensions = set()
+        suffixes = set()
+        prefixes = set()
+        globs = []
+        names = set()
+        for pattern in patterns:
+            stars = pattern.count('*')
+            if stars == 1 and pattern.startswith('*'):
+                suffix = pattern[1:]
+                if suffix.startswith('.') and suffix.count('.') == 1:
+                    extensions.add(suffix)
+                else:
+                    suffixes.add(suffix)
+            elif stars == 1 and pattern.endswith('*'):
+                prefixes.add(pattern[:-1])
+            elif stars:
+                globs.append(fnmatch.translate(pattern))
+            else:
+                names.add(pattern)
+
+        self._extensions = frozenset(extensions)
+        self._suffixes = tuple(sorted(suffixes))
+        self._prefixes = tuple(sorted(prefixes))
+        self._glob = re.compile("|".join(sorted(globs))).match if globs else None
+        self._names = frozenset(names)
+        self._dir_cache_size = dir_cache_size
+        self._dir_verdicts: Dict[str, bool] = {}
+        self._seps = tuple(filter(None, (os.sep, os.altsep)))
+
+    def matches(self, path_str: str) -> bool:
+        """True 表示路径命中过滤规则（应丢弃）"""
+        if path_str.endswith(self._seps):
+            path_str = path_str.rstrip(''.join(self._seps)) or path_str
+        cut = path_str.rfind(os.sep)
+        if os.altsep:
+            cut = max(cut, path_str.rfind(os.altsep))
+        name = path_str[cut + 1:]
+        if name in ('', '.', '..'):
+            # 罕见的非规范路径，交给 PurePath 处理
+            parts = PurePath(path_str).parts
+            return bool(parts) and (self._match_name(parts[-1]) or self._match_dirs(parts[:-1]))
+
+        if self._match_name(name):
+            return True
+
+        dir_part = path_str[:cut] if cut >= 0 else ''
+        verdict = self._dir_verdicts.get(dir_part)
+        if verdict is None:
+            verdict = self._match_dirs(PurePath(dir_part).parts) if dir_part else False
+            if len(self._dir_verdicts) >= self._dir_cache_size:
+                self._dir_verdicts.clear()
+            self._dir_verdicts[dir_part] = verdict
+        return verdict
+
+    def _match_name(self, name: str) -> bool:
+        if name in self._names:
+            return True
+        dot = name.rfind('.')
+        if dot >= 0 and name[dot:] in self._extensions:
+            return True
+        if self._suffixes and name.endswith(self._suffixes):
+            return True
+        if self._prefixes and name.startswith(self._prefixes):
+            return True
+        if self._glob is not None and self._glob(name):
+            return True
+        # 隐藏文件（Unix 风格），但允许 .env（配置）和 .gitignore 等
+        return name.startswith('.') and name not in self.ALLOWED_HIDDEN
+
+    def _match_dirs(self, parts: Iterable[str]) -> bool:
+        return not self._names.isdisjoint(parts)
@@ -0,0 +1,209 @@
+"""
+IngestionPipeline 去重状态的磁盘持久化
+
+格式：追加写日志 (append-only log)，每行一条记录，字段以制表符分隔：
+
+    F <mtime> <size> <inode> <path>   文件物理状态 (path -> (mtime, size, inode))
+    F <mtime> <size> <inode> <digest> <path>
+                                      同上，附带内容指纹（16 位十六进制，见 ContentHasher）
+    D <path>                          文件已不存在，移除其状态
+    H <fingerprint> <seen_at>         已发布事件的 64 位指纹（16 位十六进制）
+    B <root>                          root 下的全量基线扫描已完成（见 StartupReconciler）
+
+旧版本写入的 `F <mtime> <size> <path>` 记录没有 inode，载入为 (mtime, size, None)，
+比较时只看 mtime 和 size（见 same_file_state）。
+
+启动时回放日志即可恢复状态（同一 key 后写覆盖先写）。
+日志记录数超过存活条目数的 COMPACT_RATIO 倍时，用当前状态重写一份紧凑快照。
+
+record_* 只把记录放进内存缓冲（不做磁盘 I/O，可以在摄入线程持锁时调用），
+flush() 把缓冲追加到日志；flush / compact / clear / close 由调用方串行执行
+（IngestionPipeline 在单独的写入线程中执行，关闭时做最后一次 flush）。
+"""
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, TextIO, Tuple
+from life_system.utils.logger import logger
+
+
+def same_file_state(old: Optional[tuple], new: Optional[tuple]) -> bool:
+    """比较两个 (mtime, size, inode) 状态；任一方 inode 未知时只比较 mtime 和 size"""
+    if old is None or new is None:
+        return old is new
+    if old[:2] != new[:2]:
+        return False
+    return old[2] is None or new[2] is None or old[2] == new[2]
+
+
+class PipelineStateStore:
+    """追加写日志 + 定期压缩的去重状态存储"""
+
+    COMPACT_RATIO = 2.0          # 日志记录数 / 存活条目数 超过该值时压缩
+    MIN_COMPACT_RECORDS = 1000   # 日志太小时不值得压缩
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fh: Optional[TextIO] = None
+        self._records = 0  # 当前日志中的记录数（含被覆盖的旧记录）
+        # 尚未写入日志的记录；_pending_lock 只保护缓冲本身，持有期间不做 I/O
+        self._pending: List[str] = []
+        self._pending_lock = Lock()
+        # 已完成全量基线的监控根目录；旧版本的日志只记录了 watcher 碰巧看到的文件，没有这类记录
+        self.baselines: Set[str] = set()
+
+    def load(self) -> Tuple[Dict[str, tuple], Dict[int, float]]:
+        """
+        回放日志，恢复状态
+
+        Returns:
+            (file_states, hashes)：path -> (mtime, size, inode[, digest])，fingerprint -> seen_at
+        """
+        file_states: Dict[str, tuple] = {}
+        hashes: Dict[int, float] = {}
+        baselines: Set[str] = set()
+        records = 0
+        started = time.perf_counter()
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    # 路径中不含制表符（写入时已排除），按字段数区分各版本的 F 记录
+                    parts = line.rstrip("\n").split("\t")
+                    try:
+                        if parts[0] == "F" and len(parts) == 6:
+                            file_states[parts[5]] = (
+                                float(parts[1]), int(parts[2]), int(parts[3]), int(parts[4], 16)
+                            )
+                        elif parts[0] == "F" and len(parts) == 5:
+                            file_states[parts[4]] = (float(parts[1]), int(parts[2]), int(parts[3]))
+                        elif parts[0] == "F" and len(parts) == 4:
+                            file_states[parts[3]] = (float(parts[1]), int(parts[2]), None)
+                        elif parts[0] == "D" and len(parts) == 2:
+                            file_states.pop(parts[1], None)
+                        elif parts[0] == "H" and len(parts) == 3 and len(parts[1]) == 16:
+                            hashes[int(parts[1], 16)] = float(parts[2])
+                        elif parts[0] == "B" and len(parts) == 2:
+                            baselines.add(parts[1])
+                        else:
+                            continue
+                    except ValueError:
+                        # 崩溃时可能留下半行，忽略即可
+                        continue
+                    records += 1
+
+        self._records = records
+        self.baselines = baselines
+        logger.debug(
+            f"Pipeline state loaded from {self.path}: {len(file_states)} files, "
+            f"{len(hashes)} hashes in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return file_states, hashes
+
+    def record_file_state(self, path: str, state: tuple):
+        """追加一条文件状态记录"""
+        if "\t" in path or "\n" in path:
+            return  # 无法安全编码的路径不持久化，重启后靠 Service 层兜底
+        self._append(self._format_file_state(path, state))
+
+    def record_file_removed(self, path: str):
+        """追加一条文件移除记录"""
+        if "\t" in path or "\n" in path:
+            return
+        self._append(f"D\t{path}\n")
+
+    @staticmethod
+    def _format_file_state(path: str, state: tuple) -> str:
+        if len(state) > 3 and state[2] is not None and state[3] is not None:
+            return f"F\t{state[0]!r}\t{state[1]}\t{state[2]}\t{state[3]:016x}\t{path}\n"
+        if len(state) > 2 and state[2] is not None:
+            return f"F\t{state[0]!r}\t{state[1]}\t{state[2]}\t{path}\n"
+        return f"F\t{state[0]!r}\t{state[1]}\t{path}\n"
+
+    def record_baseline(self, root: str):
+        """追加一条基线完成记录"""
+        if "\t" in root or "\n" in root:
+            return
+        with self._pending_lock:
+            if root in self.baselines:
+                return
+            self.baselines.add(root)
+            self._pending.append(f"B\t{root}\n")
+
+    def record_hash(self, fingerprint: int, seen_at: float):
+        """追加一条事件指纹记录"""
+        self._append(f"H\t{fingerprint:016x}\t{seen_at!r}\n")
+
+    def needs_compaction(self, live: int) -> bool:
+        """日志记录数是否已膨胀到存活状态数 live 的 COMPACT_RATIO 倍以上"""
+        return self._records >= self.MIN_COMPACT_RECORDS and self._records >= live * self.COMPACT_RATIO
+
+    @property
+    def pending(self) -> int:
+        """缓冲中尚未写入日志的记录数"""
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """把缓冲中的记录追加到日志，返回写入的记录数"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        try:
+            if self._fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write("".join(pending))
+            self._fh.flush()
+            self._records += len(pending)
+        except OSError as e:
+            # 持久化失败不影响内存中的去重
+            logger.error(f"Failed to persist pipeline state: {e}")
+        return len(pending)
+
+    def compact(self, file_states: Iterable[Tuple[str, tuple]], hashes: Iterable[Tuple[int, float]]):
+        """
+        写入临时文件后原子替换，崩溃时旧日志仍然完整
+
+        缓冲中尚未 flush 的记录保留，之后追加到新日志末尾（与快照重复的记录回放时无害）。
+        """
+        self.close()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        records = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for path, state in file_states:
+                if "\t" in path or "\n" in path:
+                    continue
+                f.write(self._format_file_state(path, state))
+                records += 1
+            for fingerprint, seen_at in hashes:
+                f.write(f"H\t{fingerprint:016x}\t{seen_at!r}\n")
+                records += 1
+            for root in sorted(self.baselines):
+                f.write(f"B\t{root}\n")
+                records += 1
+        os.replace(tmp_path, self.path)
+        logger.info(f"Pipeline state compacted: {self._records} -> {records} records")
+        self._records = records
+
+    def clear(self):
+        """清空持久化状态"""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        with self._pending_lock:
+            self._pending = []
+            self.baselines.clear()
+        self._records = 0
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    def _append(self, line: str):
+        with self._pending_lock:
+            self._pending.append(line)
@@ -0,0 +1,97 @@
+"""
+哈希时间轮 (Hashed Timer Wheel)
+
+把到期时间按 tick 取整后散列到固定数量的槽里：
+- schedule / reschedule 只是往槽里追加一项，O(1)
+- advance 只访问经过的槽，每个定时项在到期（或被覆盖后被丢弃）时只被处理一次，均摊 O(1)
+
+- next_deadline 从一个按到期 tick 排序的小根堆取最早的到期时刻，均摊 O(log n)
+
+重新调度同一个 key 时不删除旧项，而是记录最新的到期 tick，
+旧项在其所在的槽被扫描时（或浮到堆顶时）发现不匹配直接丢弃（惰性删除）。
+非线程安全，由调用方加锁。
+"""
+import heapq
+import itertools
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """按 key 去重的单层哈希时间轮"""
+
+    def __init__(self, tick: float = 0.05, slots: int = 256, now: float = 0.0):
+        """
+        Args:
+            tick: 时间精度（秒），到期项最多晚 tick 秒被弹出，不会提前
+            slots: 槽数；tick * slots 应大于常用的定时时长，超出的项会多绕几圈
+            now: 起始时间（与 schedule/advance 使用同一时钟，如 time.monotonic()）
+        """
+        self.tick = tick
+        self._slots: List[List[Tuple[int, Hashable]]] = [[] for _ in range(slots)]
+        self._deadlines: Dict[Hashable, int] = {}
+        # (tick, 序号, key) 小根堆；序号保证 tick 相同时不比较 key
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._current = int(now / tick)  # 已处理到的 tick
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, when: float):
+        """在时刻 when 之后弹出 key；key 已存在时改为新的到期时间"""
+        tick = max(math.ceil(when / self.tick), self._current + 1)
+        self._deadlines[key] = tick
+        self._slots[tick % len(self._slots)].append((tick, key))
+        heapq.heappush(self._heap, (tick, next(self._seq), key))
+
+    def next_deadline(self) -> Optional[float]:
+        """最早的到期时刻（按 tick 取整，与 advance 的弹出时刻一致），没有定时项时返回 None"""
+        heap = self._heap
+        while heap:
+            tick, _, key = heap[0]
+            if self._deadlines.get(key) == tick:
+                return tick * self.tick
+            heapq.heappop(heap)  # 已弹出、被重新调度或取消
+        return None
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """推进到时刻 now，返回所有已到期的 key（按到期顺序）"""
+        target = int(now / self.tick)
+        if target <= self._current:
+            return []
+
+        n_slots = len(self._slots)
+        expired: List[Hashable] = []
+        # 间隔超过一圈时每个槽只需扫描一次
+        start = max(self._current + 1, target - n_slots + 1)
+        for tick in range(start, target + 1):
+            slot = self._slots[tick % n_slots]
+            if not slot:
+                continue
+            remaining = []
+            for deadline, key in slot:
+                if self._deadlines.get(key) != deadline:
+                    continue  # 已被重新调度或取消
+                if deadline <= target:
+                    del self._deadlines[key]
+                    expired.append((deadline, key))
+                else:
+                    remaining.append((deadline, key))
+            self._slots[tick % n_slots] = remaining
+        self._current = target
+
+        expired.sort(key=lambda item: item[0])
+        return [key for _, key in expired]
+
+    def clear(self):
+        for slot in self._slots:
+            slot.clear()
+        self._deadlines.clear()
+        self._heap.clear()
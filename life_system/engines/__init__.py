@@ -1,6 +1,19 @@
 """分析引擎模块"""
-from life_system.engines.task_analyzer import TaskAnalyzer
-from life_system.engines.similarity_engine import SimilarityEngine
+from importlib import import_module
 
-__all__ = ["TaskAnalyzer", "SimilarityEngine"]
+# 按需导入：BatchSimilarityEngine 会拉起 numpy/scipy，只在真正使用时加载
+_EXPORTS = {
+    "TaskAnalyzer": "life_system.engines.task_analyzer",
+    "SimilarityEngine": "life_system.engines.similarity_engine",
+    "SimilarityIndex": "life_system.engines.similarity_index",
+    "BatchSimilarityEngine": "life_system.engines.batch_similarity",
+}
 
+__all__ = ["TaskAnalyzer", "SimilarityEngine", "SimilarityIndex", "BatchSimilarityEngine"]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
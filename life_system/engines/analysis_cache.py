@@ -0,0 +1,143 @@
+"""
+分析结果缓存 (Analysis Cache)
+TaskAnalyzer 的结果只取决于标题和关键词词典，文件事件生成的任务标题
+（如 "[MODIFIED] 审查文件: x.md"）会反复出现，缓存后无需重复分析。
+
+- 内存层：按 (kind, 词典版本, 规范化标题) 为键的 LRU，容量有上限
+- 持久层（可选）：SQLite 旁路表 analysis_cache（由 migrations 创建），
+  让其他进程和重启后的进程也能复用结果；传入 SQLAlchemy Engine 时启用
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from life_system.utils.logger import logger
+
+_SELECT = "SELECT result FROM analysis_cache WHERE kind = ? AND version = ? AND title = ?"
+_UPSERT = "INSERT OR REPLACE INTO analysis_cache (kind, version, title, result) VALUES (?, ?, ?, ?)"
+_PRUNE = "DELETE FROM analysis_cache WHERE kind = ? AND version != ?"
+
+
+def normalize_title(title: str) -> str:
+    """规范化标题：去掉首尾空白并把连续空白合并为一个空格"""
+    return " ".join(title.split())
+
+
+def _clone(result: Dict[str, Any]) -> Dict[str, Any]:
+    # 结果是 {str: 标量 | list | dict} 的浅层结构，复制一层容器即可防止调用方改动缓存
+    return {
+        key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+        for key, value in result.items()
+    }
+
+
+class AnalysisCache:
+    """带命中统计的 LRU 缓存，可选 SQLite 持久层"""
+
+    def __init__(self, max_entries: int = 4096, engine=None):
+        """
+        Args:
+            max_entries: 内存中最多缓存的结果数，超出时淘汰最久未使用的
+            engine: SQLAlchemy Engine；提供时读写 analysis_cache 表
+        """
+        self.max_entries = max_entries
+        self.engine = engine
+        self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pruned: Set[Tuple[str, str]] = set()
+        self.hits = 0
+        self.persisted_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self,
+        kind: str,
+        title: str,
+        version: str,
+        compute: Callable[[str], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        返回 compute(规范化标题) 的结果，命中缓存时不调用 compute
+
+        Args:
+            kind: 结果类型（如 "analyze"、"entities"），不同类型互不干扰
+            title: 原始标题
+            version: 结果依赖的词典/算法版本，变化后旧结果自动失效
+            compute: 未命中时调用的纯函数
+        """
+        normalized = normalize_title(title)
+        key = (kind, version, normalized)
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _clone(result)
+
+        result = self._load(key)
+        if result is not None:
+            with self._lock:
+                self.persisted_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            result = compute(normalized)
+            self._store(key, result)
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return _clone(result)
+
+    def _load(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        if self.engine is None:
+            return None
+        try:
+            with self.engine.connect() as conn:
+                row = conn.exec_driver_sql(_SELECT, key).first()
+        except Exception as e:
+            # 表不存在（尚未迁移）等情况下退化为纯内存缓存
+            logger.debug(f"Analysis cache lookup failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _store(self, key: Tuple[str, str, str], result: Dict[str, Any]):
+        if self.engine is None:
+            return
+        kind, version, _ = key
+        try:
+            with self.engine.begin() as conn:
+                if (kind, version) not in self._pruned:
+                    # 每个进程对每个版本只清理一次旧版本的结果
+                    conn.exec_driver_sql(_PRUNE, (kind, version))
+                    self._pruned.add((kind, version))
+                conn.exec_driver_sql(_UPSERT, (*key, json.dumps(result, ensure_ascii=False)))
+        except Exception as e:
+            logger.debug(f"Analysis cache write failed: {e}")
+
+    def clear(self):
+        """清空内存层并重置统计（不影响持久层）"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.persisted_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.persisted_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "persisted_hits": self.persisted_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.persisted_hits) / lookups if lookups else 0.0,
+            }
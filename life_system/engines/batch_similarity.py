@@ -0,0 +1,192 @@
+"""
+批量相似度引擎 (Batch Similarity Engine)
+纯函数式，无副作用。一次性计算整批任务之间的相似度，用于全量查重。
+
+- 标题 → 字符 n-gram TF-IDF 稀疏矩阵（每行 L2 归一化，点积即余弦相似度）
+- 按行分块计算 X[block] · Xᵀ，每块只保留每行的 top-k 近邻，内存占用与总任务数线性相关
+- 余弦相似度只用于召回候选；返回前用 SimilarityEngine.similarity_score 重新打分，
+  阈值语义与 is_duplicate / find_similar_tasks 完全一致
+
+安装了 numpy + scipy 时走向量化实现（pip install life-os[fast]），
+否则退回纯 Python 的稀疏字典实现，结果相同，只是更慢。
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Sequence, Tuple
+from life_system.engines.similarity_engine import SimilarityEngine
+
+try:
+    import numpy as np
+    from scipy import sparse
+    HAS_SCIPY = True
+except ImportError:  # 可选依赖
+    np = None
+    sparse = None
+    HAS_SCIPY = False
+
+
+class BatchSimilarityEngine:
+    """字符 n-gram TF-IDF + 分块 top-k 余弦近邻"""
+
+    def __init__(
+        self,
+        ngram_range: Tuple[int, int] = (2, 3),
+        max_block_cells: int = 4_000_000,
+        use_scipy: bool = HAS_SCIPY
+    ):
+        """
+        Args:
+            ngram_range: 字符 n-gram 的长度范围（闭区间）
+            max_block_cells: 每块相似度矩阵的最大单元数（行数 × 任务数），
+                决定峰值内存（float32 时约 4 字节/单元）
+            use_scipy: 是否使用 numpy/scipy 实现
+        """
+        if use_scipy and not HAS_SCIPY:
+            raise ImportError("numpy and scipy are required for use_scipy=True")
+        self.ngram_range = ngram_range
+        self.max_block_cells = max_block_cells
+        self.use_scipy = use_scipy
+
+    def _ngrams(self, title: str) -> Counter:
+        text = title.lower()
+        low, high = self.ngram_range
+        grams: Counter = Counter()
+        for n in range(low, high + 1):
+            if len(text) < n:
+                continue
+            grams.update(text[i:i + n] for i in range(len(text) - n + 1))
+        if not grams and text:
+            grams[text] = 1  # 比最短 n-gram 还短的标题
+        return grams
+
+    def vectorize(self, titles: Sequence[str]) -> List[Dict[int, float]]:
+        """
+        计算 TF-IDF 向量（稀疏字典形式：{term_index: weight}）
+
+        tf 取 1 + log(count)，idf 取平滑形式 log((1 + n) / (1 + df)) + 1，
+        每个向量做 L2 归一化。
+        """
+        counts = [self._ngrams(title) for title in titles]
+        vocabulary: Dict[str, int] = {}
+        df: Counter = Counter()
+        for grams in counts:
+            for gram in grams:
+                if gram not in vocabulary:
+                    vocabulary[gram] = len(vocabulary)
+                df[vocabulary[gram]] += 1
+
+        n = len(titles)
+        idf = {term: math.log((1 + n) / (1 + freq)) + 1 for term, freq in df.items()}
+        vectors = []
+        for grams in counts:
+            vector = {}
+            for gram, count in grams.items():
+                term = vocabulary[gram]
+                vector[term] = (1 + math.log(count)) * idf[term]
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            vectors.append({term: w / norm for term, w in vector.items()})
+        return vectors
+
+    def top_k_neighbors(
+        self,
+        titles: Sequence[str],
+        k: int = 10,
+        min_cosine: float = 0.3
+    ) -> Iterator[Tuple[int, int, float]]:
+        """
+        逐行产出每个标题余弦相似度最高的 k 个近邻（不含自身）
+
+        Yields:
+            (i, j, cosine)，i / j 为 titles 中的下标
+        """
+        if len(titles) < 2 or k <= 0:
+            return
+        vectors = self.vectorize(titles)
+        if self.use_scipy:
+            yield from self._top_k_scipy(vectors, k, min_cosine)
+        else:
+            yield from self._top_k_python(vectors, k, min_cosine)
+
+    def _top_k_scipy(self, vectors: List[Dict[int, float]], k: int, min_cosine: float):
+        n = len(vectors)
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for vector in vectors:
+            indices.extend(vector.keys())
+            data.extend(vector.values())
+            indptr.append(len(indices))
+        n_terms = max(indices) + 1 if indices else 0
+        matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices), np.asarray(indptr)),
+            shape=(n, n_terms)
+        )
+        matrix_t = matrix.T.tocsr()
+
+        k = min(k, n - 1)
+        block = max(1, self.max_block_cells // n)
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            scores = (matrix[start:stop] @ matrix_t).toarray()
+            rows = np.arange(stop - start)
+            scores[rows, rows + start] = -1.0  # 排除自身
+            top = np.argpartition(scores, -k, axis=1)[:, -k:]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            for row in range(stop - start):
+                for j, score in zip(top[row], top_scores[row]):
+                    if score >= min_cosine:
+                        yield start + row, int(j), float(score)
+
+    def _top_k_python(self, vectors: List[Dict[int, float]], k: int, min_cosine: float):
+        # 倒排表上的稀疏点积：只访问与当前行至少共享一个 n-gram 的行
+        postings: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        for row, vector in enumerate(vectors):
+            for term, weight in vector.items():
+                postings[term].append((row, weight))
+
+        for i, vector in enumerate(vectors):
+            scores: Dict[int, float] = defaultdict(float)
+            for term, weight in vector.items():
+                for j, other in postings[term]:
+                    scores[j] += weight * other
+            scores.pop(i, None)
+            for j, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1]):
+                if score >= min_cosine:
+                    yield i, j, score
+
+    def find_duplicate_pairs(
+        self,
+        tasks: Sequence[Tuple[int, str]],
+        threshold: float = 0.9,
+        k: int = 10,
+        min_cosine: float = 0.3
+    ) -> List[Tuple[int, int, float]]:
+        """
+        找出整批任务中所有近似重复的任务对
+
+        Args:
+            tasks: [(task_id, title), ...]
+            threshold: SequenceMatcher 相似度阈值，与 SimilarityEngine.is_duplicate 相同
+            k: 每个任务最多考察的余弦近邻数
+            min_cosine: 余弦相似度低于该值的近邻不进入重新打分
+
+        Returns:
+            [(task_id_a, task_id_b, similarity_score), ...]，task_id_a < task_id_b，
+            按相似度降序排列
+        """
+        titles = [title for _, title in tasks]
+        checked = set()
+        pairs = []
+        for i, j, _ in self.top_k_neighbors(titles, k, min_cosine):
+            key = (i, j) if i < j else (j, i)
+            if key in checked:
+                continue
+            checked.add(key)
+            score = SimilarityEngine.similarity_score(titles[i], titles[j])
+            if score >= threshold:
+                id_a, id_b = sorted((tasks[i][0], tasks[j][0]))
+                pairs.append((id_a, id_b, score))
+
+        pairs.sort(key=lambda pair: pair[2], reverse=True)
+        return pairs
@@ -0,0 +1,73 @@
+"""
+关键词自动机 (Keyword Automaton)
+Aho-Corasick 多模式匹配：一次扫描标题即可找出词典中出现的所有关键词，
+耗时只与标题长度和命中数有关，与词典大小无关。
+
+自动机在构建后只读，可以在多个线程之间共享。
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 自动机（字符级 trie + 失配链接）"""
+
+    def __init__(self, keywords: Iterable[str]):
+        # 节点以下标表示：_goto[node] 为 {字符: 子节点}，_outputs[node] 为在该节点结束的关键词
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[str, ...]] = [()]
+        self.size = 0
+
+        for keyword in keywords:
+            if keyword:
+                self._insert(keyword)
+        self._build_fail_links()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _insert(self, keyword: str):
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            node = child
+        if keyword not in self._outputs[node]:
+            self._outputs[node] = self._outputs[node] + (keyword,)
+            self.size += 1
+
+    def _build_fail_links(self):
+        # 按 BFS 顺序计算失配链接，并把失配节点的输出合并进来（字典后缀链接展开）
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                if self._outputs[self._fail[child]]:
+                    self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """逐个产出 (结束位置, 关键词)，重叠的匹配也会全部产出"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword in outputs[node]:
+                yield position, keyword
+
+    def find_all(self, text: str) -> Set[str]:
+        """返回 text 中出现过的关键词集合（等价于对每个关键词做 `keyword in text`）"""
+        return {keyword for _, keyword in self.iter_matches(text)}
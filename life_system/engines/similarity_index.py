@@ -0,0 +1,187 @@
+"""
+相似度候选索引 (Similarity Index)
+字符 n-gram 倒排索引：先用共享 n-gram 数量筛出少量候选，
+再交给 SimilarityEngine (SequenceMatcher) 精确打分，避免对全部任务逐一比较。
+
+索引可以增量维护（add/update/remove），并以 JSON 快照保存到磁盘，
+快照中同时保存倒排表，启动时直接载入而不必重建。
+scope 是调用方对索引内容的描述（如收录哪些任务状态），随快照保存，载入时由调用方比对。
+"""
+import heapq
+import json
+import os
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from life_system.engines.similarity_engine import SimilarityEngine
+
+
+class SimilarityIndex:
+    """字符 n-gram 倒排索引 + SequenceMatcher 重排"""
+
+    FORMAT_VERSION = 2
+    # 出现在超过该比例任务中的 n-gram（如 "审查"、"文件"）区分度太低，候选召回时跳过，只参与排序
+    STOP_GRAM_RATIO = 0.2
+    # 索引小于该规模时不跳过任何 n-gram：小索引里几乎每个 n-gram 都超过比例，跳过会漏掉真正的相似任务
+    STOP_GRAM_MIN_TASKS = 1000
+
+    def __init__(self, ngram: int = 2, scope: str = ""):
+        self.ngram = ngram
+        self.scope = scope
+        self._titles: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        # 与数据库同步的水位：只由 TaskService 的同步查询推进，
+        # 进程内的增量 add 不推进水位，保证其他进程创建的任务也会被补齐
+        self.synced_id = 0
+        self.synced_at: Optional[str] = None  # ISO 格式的 updated_at
+        self.dirty = 0                  # 上次保存后的变更数
+
+    def _grams(self, title: str) -> Set[str]:
+        text = title.lower()
+        n = self.ngram
+        if len(text) <= n:
+            return {text} if text else set()
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._titles
+
+    def add(self, task_id: int, title: str):
+        """索引一个任务；已存在时等同于 update（改名）"""
+        old_title = self._titles.get(task_id)
+        if old_title == title:
+            return
+        if old_title is not None:
+            self._unlink(task_id, old_title)
+        self._titles[task_id] = title
+        for gram in self._grams(title):
+            self._postings[gram].add(task_id)
+        self.dirty += 1
+
+    update = add
+
+    def remove(self, task_id: int):
+        title = self._titles.pop(task_id, None)
+        if title is not None:
+            self._unlink(task_id, title)
+            self.dirty += 1
+
+    def _unlink(self, task_id: int, title: str):
+        for gram in self._grams(title):
+            ids = self._postings.get(gram)
+            if ids:
+                ids.discard(task_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def candidates(self, title: str, limit: Optional[int] = 50, exclude_id: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        按共享 n-gram 的 Dice 系数返回最多 limit 个候选 [(task_id, title), ...]，limit 为 None 时返回全部
+        """
+        grams = self._grams(title)
+        if not grams:
+            return []
+
+        total = len(self._titles)
+        ranked_grams = sorted(
+            (gram for gram in grams if gram in self._postings),
+            key=lambda gram: len(self._postings[gram])
+        )
+        use_grams, rank_grams = ranked_grams, []
+        if total >= self.STOP_GRAM_MIN_TASKS:
+            max_df = max(1, int(total * self.STOP_GRAM_RATIO))
+            selective = [gram for gram in ranked_grams if len(self._postings[gram]) <= max_df]
+            # 全是高频 n-gram 时退化为使用全部 n-gram
+            if selective:
+                use_grams, rank_grams = selective, ranked_grams[len(selective):]
+
+        shared: Counter = Counter()
+        for gram in use_grams:
+            shared.update(self._postings[gram])
+        shared.pop(exclude_id, None)
+        # 高频 n-gram 不召回新候选，但仍计入已有候选的共享数，排序与不跳过时一致
+        for gram in rank_grams:
+            postings = self._postings[gram]
+            if len(postings) < len(shared):
+                shared.update(task_id for task_id in postings if task_id in shared)
+            else:
+                shared.update(task_id for task_id in shared.keys() & postings)
+
+        n = self.ngram
+
+        def dice(task_id: int) -> float:
+            # 候选的 n-gram 数用 len - n + 1 近似（不重复计算集合）
+            other = max(1, len(self._titles[task_id]) - n + 1)
+            return 2 * shared[task_id] / (len(grams) + other)
+
+        if limit is None:
+            best = sorted(shared, key=dice, reverse=True)
+        else:
+            best = heapq.nlargest(limit, shared, key=dice)
+        return [(task_id, self._titles[task_id]) for task_id in best]
+
+    def find_similar(
+        self,
+        title: str,
+        threshold: float = 0.6,
+        max_candidates: int = 50,
+        exclude_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        查找相似任务：索引筛选候选 + SequenceMatcher 精确打分
+
+        Dice 排序与 SequenceMatcher 的得分并不单调一致，候选数上限会漏掉排在后面的相似任务；
+        索引小于 STOP_GRAM_MIN_TASKS 时不设上限，结果与逐一比较所有共享 n-gram 的任务相同。
+
+        Returns:
+            [(task_id, similarity_score), ...]，按相似度降序排列
+        """
+        target_len = len(title)
+        candidates = []
+        limit = max_candidates if len(self._titles) >= self.STOP_GRAM_MIN_TASKS else None
+        for task_id, candidate in self.candidates(title, limit, exclude_id):
+            # ratio = 2M / (la + lb) <= 2 * min(la, lb) / (la + lb)，长度差太大时不可能达到阈值
+            total_len = target_len + len(candidate)
+            if total_len and 2 * min(target_len, len(candidate)) / total_len < threshold:
+                continue
+            candidates.append((task_id, candidate))
+        return SimilarityEngine.find_similar_tasks(title, candidates, threshold)
+
+    def save(self, path: Path):
+        """原子地写入 JSON 快照（倒排表一并保存，载入时无需重建）"""
+        path = Path(path)
+        data = {
+            "version": self.FORMAT_VERSION,
+            "ngram": self.ngram,
+            "scope": self.scope,
+            "synced_id": self.synced_id,
+            "synced_at": self.synced_at,
+            "titles": self._titles,
+            "postings": {gram: list(ids) for gram, ids in self._postings.items()},
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.dirty = 0
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["SimilarityIndex"]:
+        """载入快照；文件不存在或格式不兼容时返回 None"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != cls.FORMAT_VERSION:
+            return None
+
+        index = cls(ngram=data["ngram"], scope=data["scope"])
+        index._titles = {int(task_id): title for task_id, title in data["titles"].items()}
+        index._postings = defaultdict(set, ((gram, set(ids)) for gram, ids in data["postings"].items()))
+        index.synced_id = data["synced_id"]
+        index.synced_at = data["synced_at"]
+        return index
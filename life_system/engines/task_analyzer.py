@@ -2,9 +2,15 @@
 任务分析引擎 (Analysis Engine)
 纯函数式，无副作用。只负责分析任务内容，返回分析结果。
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional
+import hashlib
+import json
 import re
 from collections import Counter
+from pathlib import Path
+from life_system.config.settings import ANALYZER_KEYWORDS_PATH, ANALYSIS_CACHE_SIZE
+from life_system.engines.analysis_cache import AnalysisCache
+from life_system.engines.keyword_automaton import KeywordAutomaton
 
 class TaskAnalyzer:
     """任务分析引擎：提取关键词、分类、优先级"""
@@ -20,11 +26,89 @@ class TaskAnalyzer:
         "阅读": {"category": "学习/成长", "priority": "low"},
         "整理": {"category": "生活/整理", "priority": "low"},
     }
+
+    # KEYWORDS 编译成的 Aho-Corasick 自动机，词典变化时才重建。
+    # 直接修改 KEYWORDS 后如果词条数量不变，需要调用 invalidate_keywords()。
+    _automaton: Optional[KeywordAutomaton] = None
+    _automaton_key = None
+    _keyword_rank: Dict[str, int] = {}
+    _dictionary_fingerprint = ""
+    _dictionary_version = 0
+    _external_loaded = False
+
+    # 分析逻辑本身变化时递增，使缓存（包括持久化的结果）失效
+    ANALYZER_VERSION = 1
+    # 分析结果缓存；设为 None 可关闭，换成带 engine 的实例可跨进程持久化
+    cache: Optional[AnalysisCache] = AnalysisCache(ANALYSIS_CACHE_SIZE)
+    
+    @classmethod
+    def load_keywords(cls, path: Path) -> int:
+        """
+        从外部词典文件追加/覆盖关键词，返回载入的词条数
+
+        文件为 UTF-8 文本，每行 `关键词<TAB>分类<TAB>优先级`，优先级可省略（默认 medium）；
+        空行和以 # 开头的行被忽略。
+        """
+        loaded = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.strip() or line.startswith("#"):
+                    continue
+                parts = line.split("\t")
+                if len(parts) < 2 or not parts[0]:
+                    continue
+                priority = parts[2].strip() if len(parts) > 2 and parts[2].strip() else "medium"
+                cls.KEYWORDS[parts[0]] = {"category": parts[1].strip(), "priority": priority}
+                loaded += 1
+        cls.invalidate_keywords()
+        return loaded
+
+    @classmethod
+    def invalidate_keywords(cls):
+        """标记词典已变化，下次分析时重建自动机"""
+        cls._dictionary_version += 1
+
+    @classmethod
+    def _get_automaton(cls) -> KeywordAutomaton:
+        # 外部词典在第一次分析时才载入，不拖慢 import
+        if not cls._external_loaded:
+            cls._external_loaded = True
+            if ANALYZER_KEYWORDS_PATH.exists():
+                cls.load_keywords(ANALYZER_KEYWORDS_PATH)
+
+        key = (id(cls.KEYWORDS), len(cls.KEYWORDS), cls._dictionary_version)
+        if cls._automaton is None or cls._automaton_key != key:
+            keywords = list(cls.KEYWORDS)
+            cls._keyword_rank = {keyword: rank for rank, keyword in enumerate(keywords)}
+            cls._automaton = KeywordAutomaton(keywords)
+            cls._automaton_key = key
+            encoded = json.dumps(cls.KEYWORDS, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            cls._dictionary_fingerprint = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+        return cls._automaton
+
+    @classmethod
+    def dictionary_version(cls) -> str:
+        """当前词典内容与分析逻辑的版本标识（跨进程稳定），用作缓存键的一部分"""
+        cls._get_automaton()
+        return f"{cls.ANALYZER_VERSION}:{cls._dictionary_fingerprint}"
+
+    @staticmethod
+    def match_keywords(title: str) -> List[str]:
+        """返回标题中出现的关键词，顺序与 KEYWORDS 中的顺序一致"""
+        automaton = TaskAnalyzer._get_automaton()
+        rank = TaskAnalyzer._keyword_rank
+        return sorted(automaton.find_all(title), key=rank.__getitem__)
+
+    @staticmethod
+    def analyze_many(titles: Iterable[str]) -> List[Dict[str, Any]]:
+        """批量分析多个标题，结果顺序与输入一致"""
+        return [TaskAnalyzer.analyze(title) for title in titles]
     
     @staticmethod
     def analyze(title: str) -> Dict[str, Any]:
         """
-        分析任务标题，返回分析结果
+        分析任务标题，返回分析结果（相同的规范化标题命中缓存时不重复分析）
         
         Returns:
             {
@@ -34,20 +118,27 @@ class TaskAnalyzer:
                 "suggested_tags": List[str] # 建议的标签
             }
         """
+        cache = TaskAnalyzer.cache
+        if cache is None:
+            return TaskAnalyzer._analyze(title)
+        return cache.get_or_compute("analyze", title, TaskAnalyzer.dictionary_version(), TaskAnalyzer._analyze)
+
+    @staticmethod
+    def _analyze(title: str) -> Dict[str, Any]:
         # 提取关键词
         keywords = []
         category = None
         priority = "medium"  # 默认优先级
         
-        # 简单的关键词匹配（未来可以用 NLP 模型）
-        for keyword, info in TaskAnalyzer.KEYWORDS.items():
-            if keyword in title:
-                keywords.append(keyword)
-                if not category:
-                    category = info["category"]
-                # 优先级取最高（high > medium > low）
-                if info["priority"] == "high" or (info["priority"] == "medium" and priority == "low"):
-                    priority = info["priority"]
+        # 关键词匹配：Aho-Corasick 一次扫描（未来可以用 NLP 模型）
+        for keyword in TaskAnalyzer.match_keywords(title):
+            info = TaskAnalyzer.KEYWORDS[keyword]
+            keywords.append(keyword)
+            if not category:
+                category = info["category"]
+            # 优先级取最高（high > medium > low）
+            if info["priority"] == "high" or (info["priority"] == "medium" and priority == "low"):
+                priority = info["priority"]
         
         # 提取其他可能的标签（名词、动词）
         words = re.findall(r'\w+', title)
@@ -70,6 +161,13 @@ class TaskAnalyzer:
         提取实体（项目名、工具名等）
         例如："优化lifeOS" → {"project": "lifeOS"}
         """
+        cache = TaskAnalyzer.cache
+        if cache is None:
+            return TaskAnalyzer._extract_entities(title)
+        return cache.get_or_compute("entities", title, str(TaskAnalyzer.ANALYZER_VERSION), TaskAnalyzer._extract_entities)
+
+    @staticmethod
+    def _extract_entities(title: str) -> Dict[str, Any]:
         # 简单的实体提取（未来可以用 NER 模型）
         entities = {}
         
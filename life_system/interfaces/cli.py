@@ -1,16 +1,25 @@
 import typer
-from rich.table import Table
-from life_system.core.db import init_db
-from life_system.services.task_service import TaskService
 from life_system.utils.console import console
-from life_system.utils.interaction import smart_prompt, safe_confirm
+
+# 启动速度：模块级只导入 typer 和 rich console，`life --help` 不应拉起 SQLAlchemy、
+# prompt_toolkit、textual、apscheduler、watchdog 等重量级依赖；
+# 这些模块在各自命令内部导入，TaskService 在第一次使用时才构造（见 get_service）。
+# 预算见 benchmarks/check_import_time.py
 
 app = typer.Typer(
     help="LifeOS: 你的个人生活操作系统",
     add_completion=False, # 禁用 Typer 默认的 shell 补全安装提示，保持清爽
     context_settings={"help_option_names": ["-h", "--help"]} # 统一使用 -h 和 --help
 )
-service = TaskService()
+_service = None
+
+def get_service():
+    """第一次使用时构造 TaskService（连带 EventBus、IngestionPipeline 和数据库模型）"""
+    global _service
+    if _service is None:
+        from life_system.services.task_service import TaskService
+        _service = TaskService()
+    return _service
 
 @app.command()
 def init(
@@ -20,6 +29,7 @@ def init(
     初始化数据库。
     使用 --force/-f 参数可删除现有数据重新开始。
     """
+    from life_system.utils.interaction import safe_confirm
     if force:
         if safe_confirm("[bold red]警告：这将永久删除所有现有数据！确定要继续吗？[/bold red]", default=False):
             try:
@@ -28,11 +38,17 @@ def init(
                 if DB_PATH.exists():
                     DB_PATH.unlink()
                     console.print(f"[yellow]已删除旧数据库: {DB_PATH}[/yellow]")
+                # WAL 模式下的伴随文件
+                for suffix in ("-wal", "-shm"):
+                    sidecar = DB_PATH.with_name(DB_PATH.name + suffix)
+                    if sidecar.exists():
+                        sidecar.unlink()
             except Exception as e:
                 console.print(f"[red]删除失败: {e}[/red]")
                 return
 
     if safe_confirm("确定要初始化数据库吗？这不会删除现有数据，但会创建缺失的表。"):
+        from life_system.core.db import init_db
         init_db()
         console.print("[green]Database initialized![/green]")
 
@@ -57,12 +73,16 @@ def add(
         return
 
     if not title:
+        from life_system.utils.interaction import smart_prompt
         title = smart_prompt("请输入任务标题")
     
     if not title:
         return
 
-    event_id = service.create_task_event(title)
+    event_id = get_service().create_task_event(title)
+    if event_id is None:
+        console.print("[yellow]相同的任务事件刚刚发布过，已忽略。[/yellow]")
+        return
     console.print(f"[green]Task event published (ID: {event_id}). Run 'process' to apply.[/green]")
 
 @app.command(context_settings={"allow_extra_args": True, "ignore_unknown_options": True})
@@ -80,22 +100,77 @@ def process(ctx: typer.Context):
         console.print("[cyan]如果你想放弃任务，请使用: life drop <ID>[/cyan]")
         return
 
-    count = service.process_events()
+    count = get_service().drain_events()
     console.print(f"[green]Processed {count} events.[/green]")
 
+def _print_task_rows(rows, out, chunk: int = 50) -> int:
+    """
+    分块渲染任务行：每块一张列宽固定、无外框的表，块与块首尾相接，
+    不需要先把全部行读入内存来计算列宽。返回输出的行数。
+    """
+    from rich import box
+    from rich.table import Table
+
+    def new_table(show_header: bool):
+        table = Table(box=box.SIMPLE_HEAD, show_header=show_header, show_edge=False, pad_edge=False, expand=True)
+        table.add_column("ID", justify="right", style="cyan", no_wrap=True, width=7)
+        table.add_column("Title", style="magenta", ratio=1)
+        table.add_column("Status", style="green", width=8)
+        table.add_column("Created At", justify="right", width=16)
+        return table
+
+    count = 0
+    table = new_table(show_header=True)
+    for task in rows:
+        table.add_row(str(task.id), task.title, task.status, task.created_at.strftime("%Y-%m-%d %H:%M"))
+        count += 1
+        if count % chunk == 0:
+            out.print(table)
+            table = new_table(show_header=False)
+    if table.row_count or not count:
+        out.print(table)
+    return count
+
+def _open_pager():
+    """启动分页程序（$PAGER，默认 less -R），返回 (进程, 写入其 stdin 的 Console)"""
+    import os
+    import shlex
+    import subprocess
+    from rich.console import Console
+    command = os.environ.get("PAGER") or ("more" if os.name == "nt" else "less -R")
+
+    class PagerConsole(Console):
+        def on_broken_pipe(self):
+            # rich 默认会把本进程的 stdout 重定向到 devnull 并退出；这里只需停止输出
+            self.quiet = True
+            raise BrokenPipeError
+
+    process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE, encoding="utf-8", errors="replace")
+    return process, PagerConsole(file=process.stdin, force_terminal=True, width=console.width)
+
 @app.command()
 def list(
     status: str = typer.Option("pending", "--status", "-s", help="筛选状态: pending, done, dropped"),
+    limit: int = typer.Option(None, "--limit", "-n", help="最多显示的任务数"),
+    after: int = typer.Option(None, "--after", "-a", help="从该任务 ID 之后继续列出（配合 --limit 翻页）"),
+    sort: str = typer.Option("asc", "--sort", help="按创建时间排序: asc（从旧到新）, desc（从新到旧）"),
+    pager: bool = typer.Option(False, "--pager", "-p", help="边读取边输出到分页程序（$PAGER 或 less）"),
     ui: bool = typer.Option(False, "--tui", "-t", help="启动 TUI 终端图形界面"),
     gui: bool = typer.Option(False, "--gui", "-g", help="启动 GUI 独立窗口界面")
 ):
     """
     列出任务。
-    支持 -s 筛选状态。
+    支持 -s 筛选状态，-n 限制条数，-a 从指定任务之后翻页，--sort 指定排序方向。
+    支持 -p 在分页程序中逐页浏览。
     支持 -t 启动终端界面。
     支持 -g 启动独立窗口界面。
     """
+    if sort not in ("asc", "desc"):
+        console.print(f"[red]--sort 只能是 asc 或 desc (你输入了: {sort})[/red]")
+        raise typer.Exit(1)
+
     # 懒加载策略
+    service = get_service()
     service.process_events()
     
     if gui:
@@ -114,28 +189,59 @@ def list(
         app.run()
         return
 
-    # 普通列表模式
-    tasks = service.list_tasks(status)
-    table = Table(title=f"Tasks ({status})")
-    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Title", style="magenta")
-    table.add_column("Status", style="green")
-    table.add_column("Created At", justify="right")
-
-    for task in tasks:
-        table.add_row(
-            str(task.id), 
-            task.title, 
-            task.status, 
-            task.created_at.strftime("%Y-%m-%d %H:%M")
-        )
+    # 普通列表模式：逐页读取、逐块渲染
+    rows = service.list_tasks(status, limit=limit, after_id=after, descending=(sort == "desc"))
+    if not pager:
+        last = {}
+
+        def tracked():
+            for task in rows:
+                last["id"] = task.id
+                yield task
+
+        console.print(f"[bold]Tasks ({status})[/bold]")
+        count = _print_task_rows(tracked(), console)
+        if limit and count == limit:
+            console.print(f"[dim]下一页: life list -s {status} -n {limit} --sort {sort} -a {last['id']}[/dim]")
+        return
+
+    process, out = _open_pager()
+    try:
+        out.print(f"[bold]Tasks ({status})[/bold]")
+        _print_task_rows(rows, out)
+    except BrokenPipeError:
+        pass  # 用户提前退出了分页程序，后续页不再读取
+    finally:
+        rows.close()
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        process.wait()
 
-    console.print(table)
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="搜索词，多个词用空格分隔（需同时出现在标题中）"),
+    status: str = typer.Option(None, "--status", "-s", help="只搜索该状态的任务: pending, done, dropped"),
+    limit: int = typer.Option(None, "--limit", "-n", help="最多显示的结果数"),
+):
+    """
+    按标题搜索任务，结果按相关度排序。
+    支持 -s 筛选状态，-n 限制条数。
+    """
+    from rich.markup import escape
+    from life_system.config.settings import TASK_SEARCH_LIMIT
+    rows = get_service().search_tasks(query, status=status, limit=limit or TASK_SEARCH_LIMIT)
+    if not rows:
+        console.print(f"[yellow]没有找到匹配 \"{escape(query)}\" 的任务[/yellow]")
+        return
+    console.print(f"[bold]Search: {escape(query)}[/bold] ({len(rows)})")
+    _print_task_rows(rows, console)
 
 @app.command()
 def done(task_id: int):
     """标记任务完成"""
-    if service.update_status(task_id, "done"):
+    if get_service().update_status(task_id, "done"):
         console.print(f"[green]Task {task_id} marked as done![/green]")
     else:
         console.print(f"[red]Task {task_id} not found.[/red]")
@@ -143,11 +249,79 @@ def done(task_id: int):
 @app.command()
 def drop(task_id: int):
     """放弃任务"""
-    if service.update_status(task_id, "dropped"):
+    if get_service().update_status(task_id, "dropped"):
         console.print(f"[yellow]Task {task_id} dropped.[/yellow]")
     else:
         console.print(f"[red]Task {task_id} not found.[/red]")
 
+@app.command()
+def stats(
+    as_json: bool = typer.Option(False, "--json", help="输出原始 JSON 快照")
+):
+    """
+    查看后台服务的运行指标。
+    显示 life serve 最近一次导出的事件摄入结果计数与各阶段耗时分布。
+    """
+    import json
+    from datetime import datetime
+    from rich.table import Table
+    from life_system.config.settings import METRICS_SNAPSHOT_PATH, METRICS_SNAPSHOT_INTERVAL
+    from life_system.core.metrics import load_snapshot
+
+    snapshot = load_snapshot(METRICS_SNAPSHOT_PATH)
+    if snapshot is None:
+        console.print(f"[yellow]没有找到指标快照 ({METRICS_SNAPSHOT_PATH})，请先运行 'life serve'。[/yellow]")
+        return
+    if as_json:
+        console.print_json(json.dumps(snapshot, ensure_ascii=False))
+        return
+
+    age = (datetime.now() - datetime.fromisoformat(snapshot["taken_at"])).total_seconds()
+    console.print(
+        f"[bold]Snapshot[/bold] {snapshot['taken_at']} (PID {snapshot['pid']}, "
+        f"uptime {snapshot['uptime'] / 60:.1f} min)"
+    )
+    if age > METRICS_SNAPSHOT_INTERVAL * 3:
+        console.print(f"[yellow]快照已有 {age / 60:.0f} 分钟未更新，后台服务可能未在运行。[/yellow]")
+
+    def format_labels(labels):
+        return " ".join(f"{k}={v}" for k, v in labels.items())
+
+    counters = Table(title="Counters")
+    counters.add_column("Metric", style="cyan")
+    counters.add_column("Labels", style="magenta")
+    counters.add_column("Value", justify="right", style="green")
+    for counter in snapshot["counters"]:
+        counters.add_row(counter["name"], format_labels(counter["labels"]), str(counter["value"]))
+    console.print(counters)
+
+    histograms = Table(title="Latency (ms)")
+    histograms.add_column("Metric", style="cyan")
+    histograms.add_column("Labels", style="magenta")
+    histograms.add_column("Count", justify="right")
+    for column in ("Mean", "p50", "p90", "p99", "Max"):
+        histograms.add_column(column, justify="right", style="green")
+    for h in snapshot["histograms"]:
+        histograms.add_row(
+            h["name"], format_labels(h["labels"]), str(h["count"]),
+            *(f"{h[key] * 1000:.2f}" for key in ("mean", "p50", "p90", "p99", "max"))
+        )
+    console.print(histograms)
+
+@app.command()
+def archive(
+    days: int = typer.Option(None, "--days", "-d", help="归档多少天前的已处理事件（默认 EVENT_RETENTION_DAYS）")
+):
+    """
+    归档已处理的旧事件。
+    把超过保留天数的已处理事件搬到按月分段的压缩文件中，并从数据库删除。
+    """
+    from life_system.config.settings import EVENT_RETENTION_DAYS
+    from life_system.services.retention_service import RetentionService
+    retention = RetentionService()
+    count = retention.archive_events(EVENT_RETENTION_DAYS if days is None else days)
+    console.print(f"[green]Archived {count} events to {retention.archive_dir}.[/green]")
+
 @app.command()
 def serve():
     """启动后台调度服务"""
@@ -1,12 +1,45 @@
+"""
+LifeOS 的终端图形界面 (TUI)
+
+- 数据库读写都在线程 Worker 中执行，UI 线程只负责把结果应用到表格
+- 行以任务 id 为 key，刷新时按 key 比较：只删除消失的行、更新变化的单元格、追加新行
+- 按 (created_at, id) 键集分页懒加载：滚动或光标接近已加载末尾时读取下一页
+- 每 TUI_POLL_INTERVAL 秒用 PRAGMA data_version 检查 `life serve` 等其他连接是否提交过修改，
+  有修改时自动重新加载已显示的范围，无需手动刷新
+"""
+from typing import Dict, List, Optional, Tuple
+from textual import work
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, DataTable, Button
-from textual.containers import Container, Horizontal
-from textual.binding import Binding
+from textual.message import Message
+from textual.widgets import Header, Footer, DataTable
+from life_system.config.settings import TASK_LIST_PAGE_SIZE, TUI_POLL_INTERVAL, TUI_PREFETCH_ROWS
+from life_system.core.db import DataVersionProbe
 from life_system.services.task_service import TaskService
 
+_COLUMNS = (("ID", "id"), ("标题", "title"), ("状态", "status"), ("创建时间", "created_at"))
+
+_Cells = Tuple[str, str, str, str]
+
+
+def _cells(row) -> _Cells:
+    return str(row.id), row.title, row.status, row.created_at.strftime("%Y-%m-%d %H:%M")
+
+
+class TaskTable(DataTable):
+    """滚动到接近已加载末尾时发出 NearEnd 消息，供 TaskApp 加载下一页"""
+
+    class NearEnd(Message):
+        pass
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if new_value >= self.max_scroll_y - TUI_PREFETCH_ROWS:
+            self.post_message(self.NearEnd())
+
+
 class TaskApp(App):
     """LifeOS 的终端图形界面 (TUI)"""
-    
+
     CSS = """
     Screen {
         layout: vertical;
@@ -15,15 +48,6 @@ class TaskApp(App):
         height: 1fr;
         border: solid green;
     }
-    .buttons {
-        height: auto;
-        dock: bottom;
-        padding: 1;
-        background: $boost;
-    }
-    Button {
-        margin-right: 1;
-    }
     """
 
     BINDINGS = [
@@ -32,51 +56,188 @@ class TaskApp(App):
         ("r", "refresh", "刷新"),
     ]
 
-    def __init__(self):
+    def __init__(self, status: str = "pending"):
         super().__init__()
         self.service = TaskService()
+        self.status = status
+        self._probe: Optional[DataVersionProbe] = None
+        # 已显示的行：row key -> 单元格内容，按显示顺序排列
+        self._rows: Dict[str, _Cells] = {}
+        self._exhausted = False
+        # 同一时刻只运行一个加载 Worker；加载期间到来的刷新请求在加载结束后补做
+        self._loading = False
+        self._refresh_pending = False
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield DataTable()
+        yield TaskTable()
         yield Footer()
 
     def on_mount(self) -> None:
-        table = self.query_one(DataTable)
+        table = self.query_one(TaskTable)
         table.cursor_type = "row"
-        table.add_columns("ID", "标题", "状态", "创建时间")
+        for label, key in _COLUMNS:
+            table.add_column(label, key=key)
+        self._probe = DataVersionProbe()
+        self.set_interval(TUI_POLL_INTERVAL, self.poll_changes)
         self.refresh_data()
 
+    def on_unmount(self) -> None:
+        if self._probe is not None:
+            self._probe.close()
+
+    # ---------- 加载 ----------
+
     def refresh_data(self):
-        table = self.query_one(DataTable)
-        table.clear()
-        tasks = self.service.list_tasks("pending")
-        for task in tasks:
-            table.add_row(
-                str(task.id),
-                task.title,
-                task.status,
-                task.created_at.strftime("%Y-%m-%d %H:%M")
-            )
+        """重新加载已显示的范围（至少一页），结果按 key 比较后应用"""
+        if self._loading:
+            self._refresh_pending = True
+            return
+        self._loading = True
+        self._reload(max(len(self._rows), TASK_LIST_PAGE_SIZE))
 
-    def action_done_task(self):
-        table = self.query_one(DataTable)
-        row_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
-        # Textual 的 DataTable row_key 默认可能不是我们想要的 ID，这里为了简单演示，
-        # 我们假设第一列是 ID。在实际生产中，会在 add_row 时指定 key。
-        # 更好的做法是在 add_row 时绑定 key:
-        # table.add_row(..., key=str(task.id))
-        
-        # 重新获取当前选中行的第一列(ID)
+    def load_more(self):
+        """从最后一行之后加载下一页"""
+        if self._loading or self._exhausted:
+            return
+        self._loading = True
+        last_key = next(reversed(self._rows), None)
+        self._load_page(int(last_key) if last_key else None)
+
+    @work(thread=True, group="tasks")
+    def _reload(self, count: int):
         try:
-            row = table.get_row_at(table.cursor_coordinate.row)
-            task_id = int(row[0])
-            self.service.update_status(task_id, "done")
-            self.notify(f"任务 {task_id} 已完成")
+            rows = list(self.service.list_tasks(self.status, limit=count))
+        except Exception as e:
+            self.call_from_thread(self._load_failed, e)
+            return
+        self.call_from_thread(self._apply_reload, rows, len(rows) < count)
+
+    @work(thread=True, group="tasks")
+    def _load_page(self, after_id: Optional[int]):
+        try:
+            rows = list(self.service.list_tasks(self.status, limit=TASK_LIST_PAGE_SIZE, after_id=after_id))
+        except Exception as e:
+            self.call_from_thread(self._load_failed, e)
+            return
+        self.call_from_thread(self._apply_page, rows, len(rows) < TASK_LIST_PAGE_SIZE)
+
+    @work(thread=True, group="poll", exclusive=True)
+    def poll_changes(self):
+        """其他连接提交过修改时触发一次刷新"""
+        if self._probe is not None and self._probe.changed():
+            self.call_from_thread(self.refresh_data)
+
+    # ---------- 应用到表格（UI 线程） ----------
+
+    def _apply_reload(self, rows: List, exhausted: bool):
+        table = self.query_one(TaskTable)
+        cursor_key = self._cursor_key()
+        fresh = {str(row.id): _cells(row) for row in rows}
+
+        for key in [key for key in self._rows if key not in fresh]:
+            table.remove_row(key)
+            del self._rows[key]
+
+        # 保留下来的行都排在新行之前时，新行直接追加即可保持顺序
+        in_order = True
+        seen_new = False
+        for key, cells in fresh.items():
+            old = self._rows.get(key)
+            if old is None:
+                table.add_row(*cells, key=key)
+                seen_new = True
+                continue
+            if seen_new:
+                in_order = False
+            if old != cells:
+                for (_, column), before, after in zip(_COLUMNS, old, cells):
+                    if before != after:
+                        table.update_cell(key, column, after)
+        self._rows = fresh
+        if not in_order:
+            position = {cells[0]: i for i, cells in enumerate(fresh.values())}
+            table.sort("id", key=lambda task_id: position[task_id])
+
+        self._exhausted = exhausted
+        self._restore_cursor(cursor_key)
+        self._load_finished()
+
+    def _apply_page(self, rows: List, exhausted: bool):
+        table = self.query_one(TaskTable)
+        for row in rows:
+            key = str(row.id)
+            if key not in self._rows:
+                self._rows[key] = _cells(row)
+                table.add_row(*self._rows[key], key=key)
+        self._exhausted = exhausted
+        self._load_finished()
+
+    def _load_failed(self, error: Exception):
+        self.notify(f"加载任务失败: {error}", severity="error")
+        self._loading = False
+        self._refresh_pending = False
+
+    def _load_finished(self):
+        self._loading = False
+        self.sub_title = f"{self.status}: {len(self._rows)}{'' if self._exhausted else '+'}"
+        if self._refresh_pending:
+            self._refresh_pending = False
             self.refresh_data()
-        except Exception:
+        else:
+            # 等新行参与布局后再比较滚动位置
+            self.call_after_refresh(self._check_near_end)
+
+    def _check_near_end(self):
+        table = self.query_one(TaskTable)
+        if table.cursor_row >= table.row_count - TUI_PREFETCH_ROWS or table.scroll_y >= table.max_scroll_y - TUI_PREFETCH_ROWS:
+            self.load_more()
+
+    def _cursor_key(self) -> Optional[str]:
+        table = self.query_one(TaskTable)
+        if not table.row_count:
+            return None
+        return table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+
+    def _restore_cursor(self, key: Optional[str]):
+        """删除或重排行之后，让光标仍停在原来的任务上"""
+        if key is not None and key in self._rows:
+            table = self.query_one(TaskTable)
+            table.move_cursor(row=table.get_row_index(key), scroll=False)
+
+    def on_task_table_near_end(self, message: TaskTable.NearEnd) -> None:
+        self.load_more()
+
+    def on_data_table_row_highlighted(self, message: DataTable.RowHighlighted) -> None:
+        self._check_near_end()
+
+    # ---------- 操作 ----------
+
+    def action_done_task(self):
+        key = self._cursor_key()
+        if key is None:
             self.notify("请先选择一个任务", severity="warning")
+            return
+        self._mark_done(key)
+
+    @work(thread=True, group="write")
+    def _mark_done(self, key: str):
+        try:
+            updated = self.service.update_status(int(key), "done")
+        except Exception as e:
+            self.call_from_thread(self.notify, f"更新任务 {key} 失败: {e}", severity="error")
+            return
+        if updated:
+            self.call_from_thread(self._task_done, key)
+        else:
+            self.call_from_thread(self.notify, f"任务 {key} 不存在", severity="warning")
+
+    def _task_done(self, key: str):
+        # 先从表格中移除，data_version 变化触发的刷新随后会对齐其余变化
+        if key in self._rows and self.status != "done":
+            self.query_one(TaskTable).remove_row(key)
+            del self._rows[key]
+        self.notify(f"任务 {key} 已完成")
 
     def action_refresh(self):
         self.refresh_data()
-
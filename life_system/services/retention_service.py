@@ -0,0 +1,208 @@
+"""
+事件保留服务 (Retention Service)
+events 表只追加不删除：已处理的旧事件移到压缩归档段中，热表只保留近期数据。
+
+- 归档段：每月一个 JSONL 文件（events-YYYY-MM.jsonl.zst），安装了 zstandard 时用 zstd 压缩，
+  否则退化为 gzip（.jsonl.gz）；每批追加一个独立的压缩帧，两种格式都支持多帧拼接
+- 搬迁：按 id 分批读取 -> 追加写入并 fsync -> 同一事务中删除，每批一个短事务，不长时间阻塞 serve 的写入
+- 查询：iter_archived_events 逐段流式解压、逐行解析，不把整个月的数据读入内存
+
+进程在 fsync 之后、提交删除之前被杀死时，这一批会在下次运行时再归档一次；
+读取时按段内 id 去重，调用方看不到重复事件。
+"""
+import gzip
+import io
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import delete, func, select
+from life_system.config.settings import EVENT_ARCHIVE_DIR, EVENT_RETENTION_DAYS, EVENT_ARCHIVE_CHUNK
+from life_system.core.db import SessionLocal
+from life_system.core.metrics import metrics
+from life_system.core.models import Event
+from life_system.utils.logger import logger
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+# SQLite 单条语句的绑定参数上限较低，DELETE ... IN 需要分块
+_IN_CLAUSE_CHUNK = 500
+
+_SUFFIXES = (".jsonl.zst", ".jsonl.gz")
+
+
+def _segment_month(path: Path) -> Optional[str]:
+    """events-2025-01.jsonl.zst -> "2025-01"，不是归档段时返回 None"""
+    name = path.name
+    for suffix in _SUFFIXES:
+        if name.startswith("events-") and name.endswith(suffix):
+            return name[len("events-"):-len(suffix)]
+    return None
+
+
+class RetentionService:
+    """把已处理的旧事件搬到按月分段的压缩归档中"""
+
+    def __init__(self, archive_dir: Path = EVENT_ARCHIVE_DIR):
+        self.db_factory = SessionLocal
+        self.archive_dir = Path(archive_dir)
+
+    def archive_events(self, older_than_days: int = EVENT_RETENTION_DAYS, chunk_size: int = EVENT_ARCHIVE_CHUNK) -> int:
+        """
+        归档 created_at 早于 older_than_days 天前的已处理事件，并从 events 表删除
+
+        未处理的事件不论多旧都保留在热表中。
+
+        Returns:
+            归档的事件数量
+        """
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        started = time.perf_counter()
+        db = self.db_factory()
+        try:
+            # created_at 走索引找到截止 id，之后按主键范围分批；created_at 基本随 id 递增，
+            # 分批查询里仍带上 created_at 条件，防止范围内混入较新的事件
+            max_id = db.execute(select(func.max(Event.id)).where(Event.created_at < cutoff)).scalar()
+        finally:
+            db.close()
+        if max_id is None:
+            return 0
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        total = 0
+        after_id = 0
+        while True:
+            db = self.db_factory()
+            try:
+                rows = db.execute(
+                    select(Event.id, Event.type, Event.source, Event.payload, Event.created_at)
+                    .where(Event.id > after_id, Event.id <= max_id, Event.processed == True, Event.created_at < cutoff)
+                    .order_by(Event.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+
+                by_month: Dict[str, List[Dict[str, Any]]] = {}
+                for event_id, event_type, source, payload, created_at in rows:
+                    by_month.setdefault(created_at.strftime("%Y-%m"), []).append({
+                        "id": event_id,
+                        "type": event_type,
+                        "source": source,
+                        "payload": payload,
+                        "created_at": created_at.isoformat(),
+                    })
+                for month, records in by_month.items():
+                    self._append_segment(month, records)
+
+                ids = [row[0] for row in rows]
+                for start in range(0, len(ids), _IN_CLAUSE_CHUNK):
+                    db.execute(delete(Event).where(Event.id.in_(ids[start:start + _IN_CLAUSE_CHUNK])))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Event archiving stopped after {total} events: {e}")
+                break
+            finally:
+                db.close()
+
+            total += len(rows)
+            after_id = rows[-1][0]
+            metrics.inc("retention.archived", len(rows))
+
+        if total:
+            logger.info(f"Archived {total} events older than {cutoff:%Y-%m-%d} in {time.perf_counter() - started:.2f} s")
+        return total
+
+    def _segment_path(self, month: str) -> Path:
+        """某个月的归档段：已有哪种格式就沿用哪种，新段按是否安装 zstandard 选择"""
+        for suffix in _SUFFIXES:
+            path = self.archive_dir / f"events-{month}{suffix}"
+            if path.exists():
+                return path
+        return self.archive_dir / f"events-{month}{_SUFFIXES[0] if zstandard else _SUFFIXES[1]}"
+
+    def _append_segment(self, month: str, records: List[Dict[str, Any]]):
+        """把一批记录压缩成一个帧追加到段末尾，fsync 后才返回"""
+        path = self._segment_path(month)
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        if path.name.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to append to {path.name}")
+            frame = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            frame = gzip.compress(data, compresslevel=6)
+
+        with open(path, "ab") as f:
+            size = f.tell()
+            try:
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+            except OSError:
+                # 截掉写了一半的帧，保证段文件仍可完整解压
+                f.truncate(size)
+                raise
+
+    def segments(self) -> List[Path]:
+        """按月份排序的归档段列表"""
+        if not self.archive_dir.exists():
+            return []
+        return sorted((p for p in self.archive_dir.iterdir() if _segment_month(p)), key=_segment_month)
+
+    def iter_archived_events(
+        self,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        type: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        流式读取归档事件
+
+        Args:
+            since: 只返回 created_at >= since 的事件
+            until: 只返回 created_at < until 的事件
+            type: 只返回该类型的事件
+
+        Yields:
+            {"id", "type", "source", "payload", "created_at"}，created_at 为 ISO 格式字符串
+        """
+        since_key = since.isoformat() if since else None
+        until_key = until.isoformat() if until else None
+        for path in self.segments():
+            month = _segment_month(path)
+            # 整段都在范围之外时不解压
+            if since_key and month < since_key[:7]:
+                continue
+            if until_key and month > until_key[:7]:
+                continue
+
+            seen = set()
+            with self._open_segment(path) as lines:
+                for line in lines:
+                    record = json.loads(line)
+                    if record["id"] in seen:
+                        continue
+                    seen.add(record["id"])
+                    if type and record["type"] != type:
+                        continue
+                    if since_key and record["created_at"] < since_key:
+                        continue
+                    if until_key and record["created_at"] >= until_key:
+                        continue
+                    yield record
+
+    @staticmethod
+    def _open_segment(path: Path):
+        if path.name.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {path.name}")
+            raw = open(path, "rb")
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+            return io.TextIOWrapper(reader, encoding="utf-8")
+        return gzip.open(path, "rt", encoding="utf-8")
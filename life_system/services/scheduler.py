@@ -1,4 +1,3 @@
-import time
 from apscheduler.schedulers.background import BackgroundScheduler
 from life_system.services.task_service import TaskService
 from life_system.collectors.fs_watcher import FileWatcher
@@ -6,10 +5,33 @@ from life_system.utils.console import console
 from life_system.utils.logger import logger
 from life_system.utils.lock import SingleInstanceLock
 from life_system.core.collector_manager import CollectorManager
+from life_system.core.notifier import notifier
+from life_system.config.settings import (
+    EVENT_SAFETY_POLL_INTERVAL,
+    DUPLICATE_SCAN_HOUR,
+    ANALYSIS_CACHE_SIZE,
+    ANALYSIS_CACHE_PERSIST,
+    METRICS_SNAPSHOT_PATH,
+    METRICS_SNAPSHOT_INTERVAL,
+    EVENT_RETENTION_HOUR,
+)
+from life_system.core.db import engine, init_db
+from life_system.core.metrics import metrics
+from life_system.engines.analysis_cache import AnalysisCache
+from life_system.engines.task_analyzer import TaskAnalyzer
+from life_system.services.retention_service import RetentionService
 import os
 import sys
 
 service = TaskService()
+retention = RetentionService()
+
+def write_metrics_snapshot():
+    """把进程内指标写入 METRICS_SNAPSHOT_PATH（供 life stats 读取）"""
+    try:
+        metrics.write_snapshot(METRICS_SNAPSHOT_PATH)
+    except OSError as e:
+        logger.warning(f"Failed to write metrics snapshot: {e}")
 
 def run_scheduler():
     """
@@ -18,7 +40,7 @@ def run_scheduler():
     1. 确保全局单例运行
     2. 启动定时任务调度器 (APScheduler)
     3. 启动所有收集器 (CollectorManager)
-    4. 运行主循环 (Event Processing)
+    4. 运行主循环 (Event Processing)：事件到达即唤醒处理，定时轮询只作兜底
     """
     # 0. 单例检查
     instance_lock = SingleInstanceLock()
@@ -26,6 +48,12 @@ def run_scheduler():
         sys.exit(1)
         
     logger.info("Starting LifeOS Background Scheduler...")
+
+    # 创建缺失的表（从未执行过 life init 的新库），再补齐索引等结构（幂等，已是最新版本时几乎无开销）
+    init_db()
+    if ANALYSIS_CACHE_PERSIST:
+        # 分析结果持久化到 analysis_cache 表，重启后相同标题无需重新分析
+        TaskAnalyzer.cache = AnalysisCache(ANALYSIS_CACHE_SIZE, engine=engine)
     
     # 初始化收集器管理器
     # 暂时默认监控当前目录，但应该在文档中强调 "cd 到正确的目录再运行 serve"
@@ -34,30 +62,44 @@ def run_scheduler():
     try:
         # 1. 启动调度器
         scheduler = BackgroundScheduler()
-        # 每 5 秒处理一次 CLI/Watchdog 产生的积压事件
-        scheduler.add_job(service.process_events, 'interval', seconds=5)
+        # 兜底轮询：正常情况下事件由主循环被唤醒后立即处理，这里只防止信号丢失
+        scheduler.add_job(service.drain_events, 'interval', seconds=EVENT_SAFETY_POLL_INTERVAL, max_instances=1, coalesce=True)
+        # 每晚全量查重，结果写入日志
+        scheduler.add_job(service.find_duplicate_pairs, 'cron', hour=DUPLICATE_SCAN_HOUR, max_instances=1, coalesce=True)
+        # 每天把已处理的旧事件搬到压缩归档
+        scheduler.add_job(retention.archive_events, 'cron', hour=EVENT_RETENTION_HOUR, max_instances=1, coalesce=True)
+        # 定期导出运行指标
+        scheduler.add_job(write_metrics_snapshot, 'interval', seconds=METRICS_SNAPSHOT_INTERVAL, max_instances=1, coalesce=True)
         scheduler.start()
         console.print("[green]调度器 (Scheduler) 已启动[/green]")
         logger.info("APScheduler started")
         
-        # 2. 启动所有收集器 (替换原有的硬编码 FileWatcher)
+        # 2. 监听其他进程（life add 等）的唤醒信号
+        notifier.start_listener()
+
+        # 3. 启动所有收集器 (替换原有的硬编码 FileWatcher)
         collector_manager.discover_and_start()
         
         console.print(f"[blue]LifeOS 后台服务运行中... (PID: {os.getpid()})[/blue]")
         console.print("[dim]按 Ctrl+C 停止服务[/dim]")
         logger.info(f"LifeOS Service running at PID {os.getpid()}")
         
-        # 主线程保持运行
+        # 主循环：有事件提交时立即 drain（带超时，保证 Ctrl+C 能及时响应）；
+        # drain 因时间预算中止且仍有积压时会重新置位 notifier，下一次 wait 立即返回
+        service.drain_events()
         while True:
-            time.sleep(1)
+            if notifier.wait(timeout=1):
+                service.drain_events()
             
     except KeyboardInterrupt:
         logger.info("Shutting down service...")
         scheduler.shutdown()
         collector_manager.stop_all()
+        write_metrics_snapshot()
         console.print("[yellow]服务已关闭。[/yellow]")
     finally:
         # 确保退出时释放锁
+        notifier.stop_listener()
         instance_lock.release()
 
 if __name__ == "__main__":
@@ -2,19 +2,22 @@
 任务增强服务 (Task Enhancement Service)
 基于分析引擎的结果，更新任务的元数据
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from life_system.core.models import Task
 from life_system.core.db import SessionLocal
 from life_system.core.event_bus import EventBus
+from life_system.services.task_service import TaskService
 from life_system.utils.console import console
 
 class TaskEnhancementService:
     """任务增强服务：基于分析结果更新任务元数据"""
     
-    def __init__(self):
+    def __init__(self, task_service: Optional[TaskService] = None):
         self.bus = EventBus()
         self.db_factory = SessionLocal
+        # 相似任务通过 TaskService 的 n-gram 索引查找；与其他调用方共用同一个 TaskService 时共用索引
+        self.task_service = task_service or TaskService()
     
     def enhance_task(self, task_id: int, analysis_result: Dict[str, Any]) -> bool:
         """
@@ -28,7 +31,7 @@ class TaskEnhancementService:
                     "category": str,
                     "priority": str,
                     "suggested_tags": List[str],
-                    "similar_tasks": List[Tuple[int, float]]  # 可选
+                    "similar_tasks": List[Tuple[int, float]]  # 可选，缺省时用相似度索引查找
                 }
         """
         db = self.db_factory()
@@ -44,10 +47,14 @@ class TaskEnhancementService:
                 task.category = analysis_result["category"]
             if "priority" in analysis_result:
                 task.priority = analysis_result["priority"]
-            if "similar_tasks" in analysis_result:
-                # 只保留相似度最高的前3个任务
-                similar = analysis_result["similar_tasks"][:3]
-                task.related_task_ids = [task_id for task_id, _ in similar]
+            if "similar_tasks" not in analysis_result:
+                analysis_result = {
+                    **analysis_result,
+                    "similar_tasks": self.task_service.find_similar_tasks(task.title, exclude_id=task_id),
+                }
+            # 只保留相似度最高的前3个任务
+            similar = analysis_result["similar_tasks"][:3]
+            task.related_task_ids = [similar_id for similar_id, _ in similar]
             
             db.commit()
             
@@ -1,18 +1,61 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence, Set, Tuple
 import os
+import threading
+import time
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import column, desc, insert, literal_column, or_, select, table, text, tuple_
+from life_system.config.settings import (
+    EVENT_DRAIN_TIME_BUDGET,
+    EVENT_DRAIN_TARGET_LATENCY,
+    EVENT_DRAIN_MIN_BATCH,
+    EVENT_DRAIN_MAX_BATCH,
+    SIMILARITY_INDEX_PATH,
+    SIMILARITY_INDEX_SAVE_EVERY,
+    SIMILARITY_INDEX_SAVE_INTERVAL,
+    SIMILARITY_INDEX_STATUSES,
+    DUPLICATE_SCAN_THRESHOLD,
+    TASK_LIST_PAGE_SIZE,
+    TASK_SEARCH_LIMIT,
+)
 from life_system.core.event_bus import EventBus
 from life_system.core.models import Task, Event
 from life_system.core.db import SessionLocal
+from life_system.core.metrics import metrics
+from life_system.core.notifier import notifier
+from life_system.engines.similarity_index import SimilarityIndex
 from life_system.utils.console import console
 from life_system.utils.logger import logger
 
+# migrations v5 创建的 FTS5 外部内容表，rowid 即 tasks.id
+_tasks_fts = table("tasks_fts", column("rowid"), column("rank"))
+
+# trigram 分词至少需要 3 个字符才能走 FTS 索引，更短的词改用 LIKE
+_FTS_MIN_TERM = 3
+
+# SQLite 单条语句的绑定参数上限较低（旧版本为 999），IN 查询需要分块
+_IN_CLAUSE_CHUNK = 500
+
+def _chunked(items: Sequence, size: int = _IN_CLAUSE_CHUNK) -> Iterator[Sequence]:
+    """将序列按固定大小切块"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 class TaskService:
     def __init__(self):
         self.bus = EventBus()
         self.db_factory = SessionLocal
+        # drain 模式的自适应批大小，跨调用保留上次的测量结果
+        self._drain_batch_size = EVENT_DRAIN_MIN_BATCH
+        # 唤醒驱动的处理循环与兜底轮询可能同时触发 drain，串行执行避免重复处理
+        self._drain_lock = threading.Lock()
+        # 相似度候选索引（只收录 SIMILARITY_INDEX_STATUSES 中的任务），首次查询时才载入快照并与数据库同步
+        self._similarity_index: Optional[SimilarityIndex] = None
+        self.similarity_statuses = SIMILARITY_INDEX_STATUSES
+        self._similarity_saved_at = 0.0
+        self.similarity_index_path = SIMILARITY_INDEX_PATH
+        # 是否存在 tasks_fts 全文索引（迁移 v5），首次搜索时探测
+        self._has_fts: Optional[bool] = None
 
     def create_task_event(self, title: str) -> int:
         """从 CLI 接收命令，只负责发布事件"""
@@ -23,12 +66,213 @@ class TaskService:
             payload={"title": title}
         )
 
-    def process_events(self):
-        """处理未处理的事件，将其转换为 Task 记录"""
+    def process_events(self, batch_mode: bool = True) -> int:
+        """
+        处理未处理的事件，将其转换为 Task 记录
+
+        Args:
+            batch_mode: 是否使用集合化的批处理模式（默认开启）。
+                批处理模式下，整批事件只需常数次查询；关闭后退回逐条处理。
+
+        Returns:
+            处理的事件数量（被去重跳过的事件不计入）
+        """
         events = self.bus.get_unprocessed()
         if not events:
             return 0
-            
+
+        started = time.perf_counter()
+        if batch_mode:
+            count = self._process_events_batch(events)
+        else:
+            count = self._process_events_one_by_one(events)
+        self._record_processed(len(events), count, time.perf_counter() - started)
+        return count or 0
+
+    def drain_events(self, time_budget: Optional[float] = None) -> int:
+        """
+        持续处理积压事件，直到队列清空或时间预算耗尽
+
+        - 使用 Event.id 键集分页，每批从上一批的最后一个 id 之后继续拉取
+        - 根据实测的单批耗时自适应调整批大小，使每批耗时接近 EVENT_DRAIN_TARGET_LATENCY
+        - 预算耗尽时仍有积压则重新置位 notifier，serve 主循环随即开始下一轮
+
+        Args:
+            time_budget: 时间预算（秒），默认 EVENT_DRAIN_TIME_BUDGET
+
+        Returns:
+            处理的事件总数
+        """
+        budget = EVENT_DRAIN_TIME_BUDGET if time_budget is None else time_budget
+        with self._drain_lock:
+            return self._drain(time.monotonic() + budget)
+
+    def _drain(self, deadline: float) -> int:
+        after_id = None
+        total = 0
+
+        while True:
+            limit = self._drain_batch_size
+            events = self.bus.get_unprocessed(limit=limit, after_id=after_id)
+            if not events:
+                break
+
+            started = time.perf_counter()
+            count = self._process_events_batch(events)
+            latency = time.perf_counter() - started
+            self._record_processed(len(events), count, latency)
+            if count is None:
+                # 本批失败（已回滚），停止本轮 drain，留给下一次调度重试
+                break
+
+            total += count
+            after_id = events[-1].id
+            self._drain_batch_size = self._next_batch_size(limit, latency)
+            logger.debug(f"Drained batch of {len(events)} events in {latency * 1000:.1f} ms (next batch: {self._drain_batch_size})")
+
+            if len(events) < limit:
+                break
+            if time.monotonic() >= deadline:
+                # 预算耗尽但还有积压：重新置位唤醒信号，serve 主循环让出一次后立即继续 drain，
+                # 而不是等下一个事件或 EVENT_SAFETY_POLL_INTERVAL 的兜底轮询
+                notifier.notify()
+                break
+
+        if total:
+            logger.info(f"Drained {total} events")
+        return total
+
+    @staticmethod
+    def _record_processed(n_events: int, created: Optional[int], latency: float):
+        """记录一批事件的处理结果与耗时；created 为 None 表示整批失败"""
+        metrics.observe("tasks.process_events", latency)
+        if created is None:
+            metrics.inc("tasks.process_events", n_events, outcome="failed")
+            return
+        metrics.inc("tasks.process_events", created, outcome="converted")
+        metrics.inc("tasks.process_events", n_events - created, outcome="skipped")
+
+    @staticmethod
+    def _next_batch_size(current: int, latency: float) -> int:
+        """根据上一批的耗时计算下一批的大小（单步最多放大/缩小 2 倍）"""
+        if latency <= 0:
+            scale = 2.0
+        else:
+            scale = min(2.0, max(0.5, EVENT_DRAIN_TARGET_LATENCY / latency))
+        return int(min(EVENT_DRAIN_MAX_BATCH, max(EVENT_DRAIN_MIN_BATCH, current * scale)))
+
+    def _resolve_event_title(self, event: Event) -> Tuple[Optional[str], bool]:
+        """
+        计算事件对应的任务标题
+
+        Returns:
+            (title, needs_dedup)：title 为 None 表示该事件不产生任务；
+            needs_dedup 表示是否需要走"智能去重策略"（仅文件事件）
+        """
+        # 处理 CLI 手动任务
+        if event.type == "task.created":
+            return event.payload.get("title"), False
+
+        # 处理文件监控事件
+        if event.type.startswith("file."):
+            path = event.payload.get("path")
+            event_type = event.type.split(".")[1]  # created, modified
+            if path and any(path.endswith(ext) for ext in ['.md', '.txt', '.py']):
+                return f"[{event_type.upper()}] 审查文件: {os.path.basename(path)}", True
+
+        return None, False
+
+    def _process_events_batch(self, events: List[Event]) -> Optional[int]:
+        """
+        集合化批处理：整批事件的去重在内存中完成
+
+        Returns:
+            处理的事件数量；出错回滚时返回 None
+
+        查询次数与批大小无关：
+        1. 一次查询载入本批涉及的 PENDING 同名任务
+        2. 一次查询载入本批涉及的最近 DONE 同名任务
+        3. 一次 executemany INSERT 新任务
+        4. 一次 UPDATE ... WHERE id IN (...) 标记所有事件
+        """
+        db = self.db_factory()
+        count = 0
+        try:
+            planned = [(event, *self._resolve_event_title(event)) for event in events]
+            dedup_titles = {title for _, title, needs_dedup in planned if title and needs_dedup}
+
+            pending_titles: Set[str] = set()
+            recent_done_titles: Set[str] = set()
+            if dedup_titles:
+                cutoff_time = datetime.now() - timedelta(minutes=5)
+                for chunk in _chunked(sorted(dedup_titles)):
+                    pending_titles.update(
+                        title for (title,) in db.query(Task.title).filter(
+                            Task.status == "pending",
+                            Task.title.in_(chunk)
+                        )
+                    )
+                    recent_done_titles.update(
+                        title for (title,) in db.query(Task.title).filter(
+                            Task.status == "done",
+                            Task.updated_at > cutoff_time,
+                            Task.title.in_(chunk)
+                        )
+                    )
+
+            new_titles = []
+            for event, title, needs_dedup in planned:
+                if title and needs_dedup:
+                    # === 智能去重策略（内存版）===
+                    if title in pending_titles:
+                        logger.debug(f"Skipped duplicate task (already pending): {title}")
+                        continue
+                    if title in recent_done_titles:
+                        logger.info(f"Skipped recent done task (cool-down active): {title}")
+                        continue
+                    # 同一批次内的重复标题也只创建一次
+                    pending_titles.add(title)
+
+                if title:
+                    new_titles.append(title)
+                    if needs_dedup:
+                        console.print(f"[cyan]自动发现: {title}[/cyan]")
+                        logger.info(f"Auto-generated task from file event: {title}")
+                    else:
+                        logger.info(f"Converted event {event.id} to Task: {title}")
+                count += 1
+
+            created = []
+            if new_titles:
+                # Core executemany：一条语句插入所有新任务（列默认值仍会逐行生效）
+                created = db.execute(
+                    insert(Task).returning(Task.id, Task.title),
+                    [{"title": title, "status": "pending"} for title in new_titles]
+                ).all()
+
+            # 标记整批事件为已处理（包括被去重跳过的事件）
+            for chunk in _chunked([event.id for event in events]):
+                db.query(Event).filter(Event.id.in_(chunk)).update(
+                    {"processed": True}, synchronize_session=False
+                )
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            console.print(f"[red]处理事件时出错: {e}[/red]")
+            logger.error(f"Error processing events: {e}")
+            return None
+        finally:
+            db.close()
+
+        if created and self._similarity_index is not None and "pending" in self.similarity_statuses:
+            for task_id, title in created:
+                self._similarity_index.add(task_id, title)
+            self._maybe_save_similarity_index()
+        return count
+
+    def _process_events_one_by_one(self, events: List[Event]) -> int:
+        """逐条处理事件（每个事件两次 SELECT + 一次 UPDATE），保留用于对比和回退"""
         db = self.db_factory()
         count = 0
         try:
@@ -40,55 +284,40 @@ class TaskService:
                 # 为了防止"DetachedInstanceError"，我们直接使用 event 对象的数据（它们应该在内存中了）
                 # 状态更新则通过显式的 SQL UPDATE 语句执行，确保万无一失。
                 
-                task_created = False
-                # 处理 CLI 手动任务
-                if event.type == "task.created":
-                    title = event.payload.get("title")
-                    if title:
-                        new_task = Task(title=title, status="pending")
-                        db.add(new_task)
-                        task_created = True
-                        logger.info(f"Converted event {event.id} to Task: {title}")
-                
-                # 处理文件监控事件
-                elif event.type.startswith("file."):
-                    path = event.payload.get("path")
-                    event_type = event.type.split(".")[1] # created, modified
-                    if path:
-                        if any(path.endswith(ext) for ext in ['.md', '.txt', '.py']):
-                            title = f"[{event_type.upper()}] 审查文件: {os.path.basename(path)}"
-                            
-                            # === 智能去重策略 ===
-                            # 1. 检查是否有 PENDING 的同名任务 -> 直接跳过
-                            pending_task = db.query(Task).filter(
-                                Task.title == title, 
-                                Task.status == "pending"
-                            ).first()
-                            
-                            if pending_task:
-                                logger.debug(f"Skipped duplicate task (already pending): {title}")
-                                db.query(Event).filter(Event.id == event.id).update({"processed": True})
-                                continue
-                                
-                            # 2. 检查是否有最近完成 (DONE) 的同名任务 -> 防止"诈尸"
-                            cutoff_time = datetime.now() - timedelta(minutes=5)
-                            recent_done_task = db.query(Task).filter(
-                                Task.title == title,
-                                Task.status == "done",
-                                Task.updated_at > cutoff_time
-                            ).order_by(desc(Task.updated_at)).first()
-                            
-                            if recent_done_task:
-                                logger.info(f"Skipped recent done task (cool-down active): {title} (Done at {recent_done_task.updated_at})")
-                                db.query(Event).filter(Event.id == event.id).update({"processed": True})
-                                continue
-
-                            # 只有既没有 pending，又没有最近 done 的任务，才创建新的
-                            new_task = Task(title=title, status="pending")
-                            db.add(new_task)
-                            task_created = True
-                            console.print(f"[cyan]自动发现: {title}[/cyan]")
-                            logger.info(f"Auto-generated task from file event: {title}")
+                title, needs_dedup = self._resolve_event_title(event)
+                if title and needs_dedup:
+                    # === 智能去重策略 ===
+                    # 1. 检查是否有 PENDING 的同名任务 -> 直接跳过
+                    pending_task = db.query(Task).filter(
+                        Task.title == title, 
+                        Task.status == "pending"
+                    ).first()
+                    
+                    if pending_task:
+                        logger.debug(f"Skipped duplicate task (already pending): {title}")
+                        db.query(Event).filter(Event.id == event.id).update({"processed": True})
+                        continue
+                        
+                    # 2. 检查是否有最近完成 (DONE) 的同名任务 -> 防止"诈尸"
+                    cutoff_time = datetime.now() - timedelta(minutes=5)
+                    recent_done_task = db.query(Task).filter(
+                        Task.title == title,
+                        Task.status == "done",
+                        Task.updated_at > cutoff_time
+                    ).order_by(desc(Task.updated_at)).first()
+                    
+                    if recent_done_task:
+                        logger.info(f"Skipped recent done task (cool-down active): {title} (Done at {recent_done_task.updated_at})")
+                        db.query(Event).filter(Event.id == event.id).update({"processed": True})
+                        continue
+
+                    # 只有既没有 pending，又没有最近 done 的任务，才创建新的
+                    db.add(Task(title=title, status="pending"))
+                    console.print(f"[cyan]自动发现: {title}[/cyan]")
+                    logger.info(f"Auto-generated task from file event: {title}")
+                elif title:
+                    db.add(Task(title=title, status="pending"))
+                    logger.info(f"Converted event {event.id} to Task: {title}")
 
                 # 标记事件为已处理 (使用显式 UPDATE)
                 db.query(Event).filter(Event.id == event.id).update({"processed": True})
@@ -104,27 +333,253 @@ class TaskService:
         finally:
             db.close()
 
-    def list_tasks(self, status: Optional[str] = None) -> List[Task]:
+    def list_tasks(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+        descending: bool = False,
+        page_size: int = TASK_LIST_PAGE_SIZE
+    ) -> Iterator[Tuple[int, str, str, datetime]]:
+        """
+        按 (created_at, id) 顺序逐页读取任务
+
+        每页一个短查询，以上一页最后一行的 (created_at, id) 为游标继续（键集分页），
+        翻到第几页都只需一次索引范围扫描；调用方停止迭代后不再读取后续页。
+
+        Args:
+            status: 只列出该状态的任务
+            limit: 最多返回的行数，None 表示不限
+            after_id: 从该任务之后（按排序方向）开始列出
+            descending: 是否按创建时间从新到旧排列
+            page_size: 每次查询读取的行数
+
+        Yields:
+            (id, title, status, created_at) 行元组，也可按属性名访问
+        """
+        columns = (Task.created_at, Task.id)
+        cursor = None
+        if after_id is not None:
+            db = self.db_factory()
+            try:
+                cursor = db.execute(select(*columns).where(Task.id == after_id)).first()
+            finally:
+                db.close()
+            if cursor is None:
+                return
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            query = select(Task.id, Task.title, Task.status, Task.created_at)
+            if status:
+                query = query.where(Task.status == status)
+            if cursor is not None:
+                keyset = tuple_(*columns)
+                query = query.where(keyset < tuple_(*cursor) if descending else keyset > tuple_(*cursor))
+            order = [desc(column) for column in columns] if descending else list(columns)
+            n = page_size if remaining is None else min(page_size, remaining)
+
+            db = self.db_factory()
+            try:
+                rows = db.execute(query.order_by(*order).limit(n)).all()
+            finally:
+                db.close()
+
+            yield from rows
+            if len(rows) < n:
+                return
+            cursor = (rows[-1].created_at, rows[-1].id)
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def search_tasks(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = TASK_SEARCH_LIMIT
+    ) -> List[Tuple[int, str, str, datetime]]:
+        """
+        按标题全文搜索任务
+
+        查询按空白拆成多个词，所有词都须作为子串出现在标题中（不区分大小写）。
+        不少于 3 个字符的词经 tasks_fts 的 trigram 索引匹配并按 bm25 相关度排序；
+        更短的词（如两个字的中文词）以及没有 tasks_fts 的数据库使用 LIKE 过滤，
+        此时按创建时间从新到旧排列。
+
+        Args:
+            query: 搜索词
+            status: 只搜索该状态的任务
+            limit: 最多返回的行数
+
+        Returns:
+            (id, title, status, created_at) 行元组，也可按属性名访问
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        use_fts = self._fts_available()
+        indexed = [t for t in terms if use_fts and len(t) >= _FTS_MIN_TERM]
+        scanned = [t for t in terms if t not in indexed]
+
+        stmt = select(Task.id, Task.title, Task.status, Task.created_at)
+        if indexed:
+            # 每个词作为 FTS5 字符串（双引号转义），空格连接即 AND
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in indexed)
+            stmt = (stmt.join(_tasks_fts, _tasks_fts.c.rowid == Task.id)
+                    .where(literal_column("tasks_fts").op("MATCH")(match))
+                    .order_by(_tasks_fts.c.rank))
+        else:
+            stmt = stmt.order_by(desc(Task.created_at), desc(Task.id))
+        for term in scanned:
+            stmt = stmt.where(Task.title.contains(term, autoescape=True))
+        if status:
+            stmt = stmt.where(Task.status == status)
+
+        started = time.perf_counter()
         db = self.db_factory()
         try:
-            query = db.query(Task)
-            if status:
-                query = query.filter(Task.status == status)
-            return query.all()
+            rows = db.execute(stmt.limit(limit)).all()
         finally:
             db.close()
+        metrics.observe("tasks.search", time.perf_counter() - started, mode="fts" if indexed else "like")
+        return rows
+
+    def _fts_available(self) -> bool:
+        """tasks_fts 是否已由迁移创建（结果缓存在实例上）"""
+        if self._has_fts is None:
+            db = self.db_factory()
+            try:
+                self._has_fts = db.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+                ).first() is not None
+            finally:
+                db.close()
+        return self._has_fts
 
     def update_status(self, task_id: int, new_status: str) -> bool:
         db = self.db_factory()
         try:
             task = db.query(Task).filter(Task.id == task_id).first()
-            if task:
-                task.status = new_status
-                db.commit()
-                # 记录状态变更日志
-                logger.info(f"Task {task_id} status updated to {new_status}")
-                return True
-            logger.warning(f"Task {task_id} not found when updating status to {new_status}")
-            return False
+            if not task:
+                logger.warning(f"Task {task_id} not found when updating status to {new_status}")
+                return False
+            task.status = new_status
+            title = task.title
+            db.commit()
+            # 记录状态变更日志
+            logger.info(f"Task {task_id} status updated to {new_status}")
+        finally:
+            db.close()
+
+        if self._similarity_index is not None:
+            if new_status in self.similarity_statuses:
+                self._similarity_index.add(task_id, title)
+            else:
+                self._similarity_index.remove(task_id)
+            self._maybe_save_similarity_index()
+        return True
+
+    def rename_task(self, task_id: int, title: str) -> bool:
+        """修改任务标题，并同步更新相似度索引"""
+        db = self.db_factory()
+        try:
+            task = db.query(Task).filter(Task.id == task_id).first()
+            if not task:
+                logger.warning(f"Task {task_id} not found when renaming")
+                return False
+            task.title = title
+            indexed = task.status in self.similarity_statuses
+            db.commit()
+            logger.info(f"Task {task_id} renamed to {title}")
         finally:
             db.close()
+
+        if self._similarity_index is not None and indexed:
+            self._similarity_index.update(task_id, title)
+            self._maybe_save_similarity_index()
+        return True
+
+    def find_similar_tasks(self, title: str, threshold: float = 0.6, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        查找与标题相似的已有任务（n-gram 索引筛候选 + SequenceMatcher 重排）
+
+        只在 similarity_statuses（默认 SIMILARITY_INDEX_STATUSES，即 pending）的任务中查找。
+
+        Returns:
+            [(task_id, similarity_score), ...]，按相似度降序排列
+        """
+        return self._get_similarity_index().find_similar(title, threshold, exclude_id=exclude_id)
+
+    def find_duplicate_pairs(self, status: str = "pending", threshold: float = DUPLICATE_SCAN_THRESHOLD) -> List[Tuple[int, int, float]]:
+        """
+        全量查重：找出指定状态的任务中所有近似重复的任务对
+
+        Returns:
+            [(task_id_a, task_id_b, similarity_score), ...]，按相似度降序排列
+        """
+        db = self.db_factory()
+        try:
+            tasks = db.query(Task.id, Task.title).filter(Task.status == status).order_by(Task.id).all()
+        finally:
+            db.close()
+
+        # 延迟导入：numpy/scipy 只在全量查重时加载
+        from life_system.engines.batch_similarity import BatchSimilarityEngine
+        started = time.perf_counter()
+        pairs = BatchSimilarityEngine().find_duplicate_pairs(tasks, threshold)
+        logger.info(f"Duplicate scan over {len(tasks)} {status} tasks found {len(pairs)} pairs in {time.perf_counter() - started:.2f} s")
+        return pairs
+
+    def _get_similarity_index(self) -> SimilarityIndex:
+        """返回与数据库同步后的相似度索引（首次调用时载入快照）"""
+        if self._similarity_index is None:
+            scope = ",".join(sorted(self.similarity_statuses))
+            index = SimilarityIndex.load(self.similarity_index_path)
+            if index is None or index.scope != scope:
+                # 没有快照，或快照收录的状态与当前配置不同：从数据库重建
+                index = SimilarityIndex(scope=scope)
+            else:
+                logger.info(f"Loaded similarity index with {len(index)} tasks")
+            self._similarity_index = index
+            self._similarity_saved_at = time.monotonic()
+        self._sync_similarity_index(self._similarity_index)
+        self._maybe_save_similarity_index()
+        return self._similarity_index
+
+    def _sync_similarity_index(self, index: SimilarityIndex):
+        """
+        补齐快照之后（或其他进程）新建、改名、变更状态的任务
+
+        只读取 id 或 updated_at 超过索引水位的行，常规情况下是空结果；
+        状态不在 similarity_statuses 中的任务从索引中移除。
+        """
+        db = self.db_factory()
+        try:
+            condition = Task.id > index.synced_id
+            if index.synced_at:
+                condition = or_(condition, Task.updated_at > datetime.fromisoformat(index.synced_at))
+            rows = db.query(Task.id, Task.title, Task.status, Task.updated_at).filter(condition).all()
+        finally:
+            db.close()
+
+        for task_id, title, status, updated_at in rows:
+            if status in self.similarity_statuses:
+                index.add(task_id, title)
+            else:
+                index.remove(task_id)
+            index.synced_id = max(index.synced_id, task_id)
+            if updated_at and (index.synced_at is None or updated_at.isoformat() > index.synced_at):
+                index.synced_at = updated_at.isoformat()
+
+    def _maybe_save_similarity_index(self):
+        """变更累计足够多或距上次保存超过间隔时写入快照"""
+        index = self._similarity_index
+        if index is None or not index.dirty:
+            return
+        if (index.dirty >= SIMILARITY_INDEX_SAVE_EVERY
+                or time.monotonic() - self._similarity_saved_at >= SIMILARITY_INDEX_SAVE_INTERVAL):
+            try:
+                index.save(self.similarity_index_path)
+            except OSError as e:
+                logger.error(f"Failed to save similarity index: {e}")
+            self._similarity_saved_at = time.monotonic()
@@ -13,6 +13,13 @@ setup(
         "watchdog",
         "apscheduler"
     ],
+    extras_require={
+        # 向量化的批量相似度计算（BatchSimilarityEngine）与更快的文件内容指纹（ContentHasher），
+        # 未安装时分别使用纯 Python 实现和 zlib
+        "fast": ["numpy", "scipy", "xxhash"],
+        # 事件归档段使用 zstd 压缩，未安装时使用 gzip
+        "archive": ["zstandard"],
+    },
     entry_points={
         "console_scripts": [
             "life=life_system.interfaces.cli:app",